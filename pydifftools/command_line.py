@@ -29,7 +29,7 @@ from .searchacro import replace_acros
 from .rearrange_tex import run as rearrange_tex_run
 from .git_gd import gd  # registers git difftool review command
 from .flowchart.watch_graph import wgrph
-from .flowchart.graph import load_graph_yaml
+from .flowchart.graph import TaskIndex
 from .notebook.tex_to_qmd import tex2qmd
 from .notebook.fast_build import (
     qmdb,
@@ -90,29 +90,22 @@ def wgrph_task_completer(prefix, parsed_args, **kwargs):
     if parsed_args is None or not hasattr(parsed_args, "yaml"):
         return []
     yaml_path = Path(parsed_args.yaml)
-    if not yaml_path.exists():
+    if not yaml_path.is_file():
         return []
     try:
-        data = load_graph_yaml(str(yaml_path))
+        # Reads the names wgrph (or an earlier completion) saved, so the
+        # YAML is only parsed again after it changes.
+        index = TaskIndex.for_yaml(yaml_path)
     except Exception:
         return []
-    if "nodes" not in data:
-        return []
-    prefix_lower = prefix.lower()
     matches = []
-    for name in data["nodes"]:
-        if (
-            "style" in data["nodes"][name]
-            and data["nodes"][name]["style"] == "completed"
-        ):
-            continue
-        if name.lower().startswith(prefix_lower):
-            # Preserve case-insensitive matches even when the typed prefix
-            # doesn't match case so argcomplete still accepts the suggestion.
-            if name.startswith(prefix):
-                matches.append(name)
-            else:
-                matches.append(prefix + name[len(prefix) :])
+    for name in index.complete(prefix):
+        # Preserve case-insensitive matches even when the typed prefix
+        # doesn't match case so argcomplete still accepts the suggestion.
+        if name.startswith(prefix):
+            matches.append(name)
+        else:
+            matches.append(prefix + name[len(prefix) :])
     return matches
 
 
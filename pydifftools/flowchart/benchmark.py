@@ -0,0 +1,370 @@
+"""Timing helpers for the wgrph rendering pipeline.
+
+``python -m pydifftools.flowchart.benchmark`` times
+
+* each stage of a build on a random plan from :func:`random_plan`
+  (``load_graph_yaml``, ``write_dot_from_yaml``, ``yaml_to_dot``,
+  ``endpoint_projects`` and ``build_graph``, with Graphviz replaced by an
+  instant synthetic layout unless ``--graphviz`` is given),
+* the SVG post-processing pass of
+  :func:`~pydifftools.flowchart.watch_graph.build_graph` (task links,
+  project colours and canvas padding) on a synthetic Graphviz-like SVG,
+* graph YAML loading and saving with and without libyaml,
+
+and prints the results as JSON, or writes them to ``--output``.
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import random
+import re
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from datetime import date, timedelta
+from pathlib import Path
+
+import yaml
+
+from . import watch_graph
+from .graph import (
+    IndentDumper,
+    _CSafeDumper,
+    _SafeLoader,
+    _dump_graph_yaml,
+    endpoint_projects,
+    load_graph_yaml,
+    save_graph_yaml,
+    write_dot_from_yaml,
+    yaml_to_dot,
+)
+from .watch_graph import _postprocess_svg
+
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+
+
+_WORDS = (
+    "measure calibrate order build align check sample magnet probe coil"
+    " amplifier cable draft review write plot fit spectrum field sweep"
+    " tune shim cryostat pump vacuum leak test run data analysis"
+).split()
+
+
+def random_plan(
+    node_count,
+    fan_out=2,
+    fan_in=3,
+    date_density=0.3,
+    endpoint_count=10,
+    text_length=40,
+    seed=0,
+    window=20,
+):
+    """Return graph data for a random DAG plan, laid out like a wgrph YAML.
+
+    Nodes are numbered in dependency order. Each one gets up to ``fan_out``
+    children among the next ``window`` nodes, skipping children that
+    already have ``fan_in`` parents. A ``date_density`` share of the nodes
+    has a due date, later for later nodes so no date conflicts arise;
+    ``endpoint_count`` evenly spaced nodes are endpoints; and each text is
+    about ``text_length`` characters of random words.
+    """
+    rng = random.Random(seed)
+    names = [f"task{index}" for index in range(node_count)]
+    nodes = {}
+    start = date(2025, 1, 1)
+    for index, name in enumerate(names):
+        words = []
+        while len(" ".join(words)) < text_length:
+            words.append(rng.choice(_WORDS))
+        node = {"children": [], "parents": [], "text": " ".join(words)}
+        if rng.random() < date_density:
+            node["due"] = start + timedelta(days=index)
+        nodes[name] = node
+    for index, name in enumerate(names[:-1]):
+        last = min(index + window, node_count - 1)
+        for _ in range(fan_out):
+            child = names[rng.randint(index + 1, last)]
+            if (
+                child in nodes[name]["children"]
+                or len(nodes[child]["parents"]) >= fan_in
+            ):
+                continue
+            nodes[name]["children"].append(child)
+            nodes[child]["parents"].append(name)
+    if endpoint_count:
+        step = max(1, node_count // endpoint_count)
+        for name in names[step - 1 :: step][:endpoint_count]:
+            nodes[name]["style"] = "endpoint"
+    return {
+        "styles": {"endpoint": {"attrs": {"node": {"shape": "box"}}}},
+        "nodes": nodes,
+    }
+
+
+def synthetic_svg(data):
+    """Return SVG text shaped like Graphviz output for ``data``."""
+    parts = [
+        f'<svg xmlns="{SVG_NAMESPACE}" width="800pt" height="600pt"'
+        ' viewBox="0.00 0.00 800.00 600.00">',
+        '<g id="graph0" class="graph" transform="translate(4 596)">',
+    ]
+    edge_count = 0
+    for index, name in enumerate(data["nodes"]):
+        x = 10.0 + 40.0 * (index % 100)
+        y = -10.0 - 30.0 * (index // 100)
+        parts.append(
+            f'<g id="node{index + 1}" class="node"><title>{name}</title>'
+            f'<polygon fill="none" stroke="black" points="{x},{y}'
+            f' {x + 30},{y} {x + 30},{y - 20} {x},{y - 20} {x},{y}"/>'
+            f"<text>__WGRPH_TASK_LINK__:{name}</text><text>{name}</text></g>"
+        )
+    for name, node in data["nodes"].items():
+        for parent in node["parents"]:
+            edge_count += 1
+            parts.append(
+                f'<g id="edge{edge_count}" class="edge">'
+                f"<title>{parent}&#45;&gt;{name}</title>"
+                '<path fill="none" stroke="black" d="M0,0C1,1 2,2 3,3"/>'
+                '<polygon fill="black" stroke="black"'
+                ' points="3,3 4,4 5,3"/></g>'
+            )
+    parts.append("</g></svg>")
+    return "\n".join(parts), edge_count
+
+
+def bench_svg_postprocess(
+    node_count=3000, endpoint_count=40, repeat=5, seed=0
+):
+    """Time the SVG post-processing pass; parsing is not included."""
+    data = random_plan(node_count, endpoint_count=endpoint_count, seed=seed)
+    projects = endpoint_projects(data)
+    svg_text, edge_count = synthetic_svg(data)
+    timings = []
+    for _ in range(repeat):
+        svg_root = ET.fromstring(svg_text)
+        start = time.perf_counter()
+        _postprocess_svg(svg_root, f"{{{SVG_NAMESPACE}}}", projects, False)
+        timings.append(time.perf_counter() - start)
+    return {
+        "benchmark": "svg_postprocess",
+        "nodes": node_count,
+        "edges": edge_count,
+        "endpoints": len(projects),
+        "repeat": repeat,
+        "best_seconds": min(timings),
+        "mean_seconds": sum(timings) / len(timings),
+    }
+
+
+def _time_calls(function, repeat):
+    """Call ``function`` ``repeat`` times and summarise the wall times."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    # Later calls reuse the label and due-date caches the first one filled.
+    return {
+        "first_seconds": timings[0],
+        "best_seconds": min(timings),
+        "mean_seconds": sum(timings) / len(timings),
+    }
+
+
+def bench_yaml_io(node_count=5000, endpoint_count=50, repeat=3, seed=0):
+    """Time graph YAML loading and dumping, pure Python against libyaml.
+
+    Due dates are written as ``mm/dd/yy`` strings and some texts get
+    multi-line notes, so the dump exercises the same block scalars and
+    sequences as a real one.
+    """
+    data = random_plan(node_count, endpoint_count=endpoint_count, seed=seed)
+    for index, (name, node) in enumerate(data["nodes"].items()):
+        if "due" in node:
+            node["due"] = node["due"].strftime("%m/%d/%y")
+        if index % 5 == 0:
+            node["text"] = f"{name}\nNotes:\n- first step\n- second step"
+    dump_python = functools.partial(
+        yaml.dump,
+        data,
+        Dumper=IndentDumper,
+        default_flow_style=False,
+        sort_keys=True,
+        allow_unicode=True,
+        indent=2,
+    )
+    python_text = dump_python()
+
+    def best(function):
+        return _time_calls(function, repeat)["best_seconds"]
+
+    return {
+        "benchmark": "yaml_io",
+        "nodes": node_count,
+        "libyaml": _CSafeDumper is not None,
+        "identical_output": _dump_graph_yaml(data) == python_text,
+        "repeat": repeat,
+        "load_python_seconds": best(
+            lambda: yaml.load(python_text, Loader=yaml.SafeLoader)
+        ),
+        "load_libyaml_seconds": best(
+            lambda: yaml.load(python_text, Loader=_SafeLoader)
+        ),
+        "dump_python_seconds": best(dump_python),
+        "dump_libyaml_seconds": best(lambda: _dump_graph_yaml(data)),
+    }
+
+
+def _synthetic_render_dot_svg(dot_text, prog="dot", args=()):
+    """Stand-in for Graphviz that lays nodes out on a grid at once."""
+    nodes = {}
+    for name in re.findall(r"^\s*(\w+) \[", dot_text, re.MULTILINE):
+        if name not in ("graph", "node", "edge"):
+            nodes.setdefault(name, {"parents": []})
+    for parent, child in re.findall(
+        r"^\s*(\w+) -> (\w+)", dot_text, re.MULTILINE
+    ):
+        if child in nodes:
+            nodes[child]["parents"].append(parent)
+    return synthetic_svg({"nodes": nodes})[0].encode("utf-8")
+
+
+@contextlib.contextmanager
+def stub_graphviz():
+    """Make ``build_graph`` use a synthetic layout instead of Graphviz."""
+    saved = watch_graph._graphviz_available, watch_graph._render_dot_svg
+    watch_graph._graphviz_available = lambda: True
+    watch_graph._render_dot_svg = _synthetic_render_dot_svg
+    try:
+        yield
+    finally:
+        watch_graph._graphviz_available, watch_graph._render_dot_svg = saved
+
+
+def bench_build(
+    node_count=2000,
+    fan_out=2,
+    fan_in=3,
+    date_density=0.3,
+    endpoint_count=20,
+    text_length=40,
+    repeat=3,
+    seed=0,
+    graphviz=False,
+):
+    """Time each stage of a wgrph build on a :func:`random_plan`.
+
+    Stages run in the order of the returned ``stages``. ``yaml_to_dot`` is
+    the first to format labels, so its ``first_seconds`` is the cold-cache
+    time. The plan is saved to a temporary directory first, so the timed
+    ``write_dot_from_yaml`` and ``build_graph`` calls find it normalised
+    and skip rewriting it, as they do on most rebuilds while watching.
+    Unless ``graphviz`` is set, Graphviz is replaced by
+    :func:`stub_graphviz` so the timings cover only Python code.
+    """
+    data = random_plan(
+        node_count,
+        fan_out=fan_out,
+        fan_in=fan_in,
+        date_density=date_density,
+        endpoint_count=endpoint_count,
+        text_length=text_length,
+        seed=seed,
+    )
+    edge_count = sum(len(node["children"]) for node in data["nodes"].values())
+    stages = {}
+    with tempfile.TemporaryDirectory(prefix="wgrph-bench-") as workdir:
+        yaml_file = Path(workdir) / "plan.yaml"
+        dot_file = Path(workdir) / "plan.dot"
+        svg_file = Path(workdir) / "plan.svg"
+        save_graph_yaml(str(yaml_file), data)
+        loaded = load_graph_yaml(str(yaml_file))
+        stages["load_graph_yaml"] = _time_calls(
+            lambda: load_graph_yaml(str(yaml_file)), repeat
+        )
+        stages["yaml_to_dot"] = _time_calls(
+            lambda: yaml_to_dot(loaded), repeat
+        )
+        stages["endpoint_projects"] = _time_calls(
+            lambda: endpoint_projects(loaded), repeat
+        )
+        stages["write_dot_from_yaml"] = _time_calls(
+            lambda: write_dot_from_yaml(
+                str(yaml_file), str(dot_file), validate_due_dates=True
+            ),
+            repeat,
+        )
+        stub = contextlib.nullcontext() if graphviz else stub_graphviz()
+        with stub:
+            stages["build_graph"] = _time_calls(
+                lambda: watch_graph.build_graph(
+                    yaml_file, dot_file, svg_file, 55
+                ),
+                repeat,
+            )
+    return {
+        "benchmark": "build",
+        "nodes": node_count,
+        "edges": edge_count,
+        "fan_out": fan_out,
+        "fan_in": fan_in,
+        "date_density": date_density,
+        "endpoints": endpoint_count,
+        "text_length": text_length,
+        "graphviz": graphviz,
+        "repeat": repeat,
+        "stages": stages,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time the wgrph flowchart pipeline on synthetic plans"
+    )
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--fan-out", type=int, default=2)
+    parser.add_argument("--fan-in", type=int, default=3)
+    parser.add_argument("--date-density", type=float, default=0.3)
+    parser.add_argument("--endpoints", type=int, default=20)
+    parser.add_argument("--text-length", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--graphviz",
+        action="store_true",
+        help="Run Graphviz in the build_graph stage instead of a stub",
+    )
+    parser.add_argument(
+        "--build-only",
+        action="store_true",
+        help="Skip the SVG post-processing and YAML benchmarks",
+    )
+    parser.add_argument("--output", help="Write the JSON results here")
+    args = parser.parse_args(argv)
+    results = [
+        bench_build(
+            node_count=args.nodes,
+            fan_out=args.fan_out,
+            fan_in=args.fan_in,
+            date_density=args.date_density,
+            endpoint_count=args.endpoints,
+            text_length=args.text_length,
+            repeat=args.repeat,
+            seed=args.seed,
+            graphviz=args.graphviz,
+        )
+    ]
+    if not args.build_only:
+        results += [bench_svg_postprocess(), bench_yaml_io()]
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,196 @@
+"""Convert a Graphviz DOT flowchart back into wgrph YAML.
+
+:func:`dot_to_yaml` reads the file with a small tokenizer for the DOT
+that :func:`~pydifftools.flowchart.graph.yaml_to_dot` writes (statements,
+subgraphs, quoted and HTML strings, comments) and streams each node and
+edge statement straight into the YAML structure. Files using DOT syntax
+beyond that are handed to pydot, which is much slower on big graphs.
+"""
+
 import sys
 import re
-import yaml
-import pydot
 
-from .graph import IndentDumper
+from .graph import _dump_graph_yaml
+
+
+class DotSyntaxError(ValueError):
+    """The DOT text uses syntax the streaming reader does not handle."""
+
+
+_dot_token_re = re.compile(
+    r"(?:\s+|//[^\n]*|/\*.*?\*/|#[^\n]*)"
+    r"|(?P<id>[^\W\d]\w*|-?(?:\.\d+|\d+(?:\.\d*)?))"
+    r'|(?P<quoted>"(?:[^"\\]|\\.)*")'
+    r"|(?P<op>->|--|[{}\[\];,=:])"
+    r"|(?P<html><)",
+    re.S,
+)
+_angle_re = re.compile(r"[<>]")
+
+
+def _html_end(text, start):
+    depth = 0
+    for match in _angle_re.finditer(text, start):
+        depth += 1 if match.group() == "<" else -1
+        if not depth:
+            return match.end()
+    raise DotSyntaxError("unterminated HTML string")
+
+
+def _dot_tokens(text):
+    """Yield ``(kind, text)`` for each token, skipping space and comments."""
+    position = 0
+    end = len(text)
+    match_token = _dot_token_re.match
+    while position < end:
+        match = match_token(text, position)
+        if match is None:
+            line = text.count("\n", 0, position) + 1
+            raise DotSyntaxError(
+                f"unexpected {text[position]!r} on line {line}"
+            )
+        kind = match.lastgroup
+        if kind is None:
+            position = match.end()
+        elif kind == "html":
+            stop = _html_end(text, position)
+            yield "id", text[position:stop]
+            position = stop
+        else:
+            yield ("id" if kind == "quoted" else kind), match.group(kind)
+            position = match.end()
+    yield "end", None
+
+
+def _unquote(value):
+    if value.startswith('"') and value.endswith('"'):
+        return value[1:-1].replace('\\"', '"')
+    return value
+
+
+def iter_dot_statements(text):
+    """Yield the node, edge and style statements of DOT ``text`` in order.
+
+    Items are ``('node', name, attrs, style)``, ``('edge', source,
+    target)`` and ``('style', name, node_attrs)``, where ``style`` is the
+    innermost named subgraph around the node (or None) and ``node_attrs``
+    are the defaults of one ``node [...]`` statement inside subgraph
+    ``name``. Attribute values keep their quotes, as pydot reports them.
+    """
+    tokens = _dot_tokens(text)
+    kind, value = next(tokens)
+
+    def advance():
+        nonlocal kind, value
+        kind, value = next(tokens)
+
+    def expect(op):
+        if kind != "op" or value != op:
+            raise DotSyntaxError(f"expected {op!r}, found {value!r}")
+        advance()
+
+    def attr_list():
+        attrs = {}
+        while kind == "op" and value == "[":
+            advance()
+            while not (kind == "op" and value == "]"):
+                if kind != "id":
+                    raise DotSyntaxError(f"bad attribute name {value!r}")
+                key = value
+                advance()
+                expect("=")
+                if kind != "id":
+                    raise DotSyntaxError(f"bad value for {key}: {value!r}")
+                attrs[key] = value
+                advance()
+                if kind == "op" and value in (",", ";"):
+                    advance()
+            advance()
+        return attrs
+
+    def node_id():
+        if kind != "id":
+            raise DotSyntaxError(f"expected a node name, found {value!r}")
+        name = _unquote(value)
+        advance()
+        if kind == "op" and value == ":":
+            raise DotSyntaxError("node ports are not supported")
+        return name
+
+    # Names of the enclosing subgraphs, None for anonymous { ... } blocks.
+    styles = []
+
+    def current_style():
+        for name in reversed(styles):
+            if name is not None:
+                return name
+        return None
+
+    if kind == "id" and value.lower() == "strict":
+        advance()
+    if kind != "id" or value.lower() not in ("digraph", "graph"):
+        raise DotSyntaxError("expected digraph")
+    advance()
+    if kind == "id":
+        advance()
+    expect("{")
+    depth = 1
+    while depth:
+        if kind == "end":
+            raise DotSyntaxError("unexpected end of file")
+        if kind == "op" and value == ";":
+            advance()
+        elif kind == "op" and value == "}":
+            advance()
+            depth -= 1
+            if styles:
+                styles.pop()
+        elif kind == "op" and value == "{":
+            advance()
+            depth += 1
+            styles.append(None)
+        elif kind == "id" and value.lower() == "subgraph":
+            advance()
+            name = None
+            if kind == "id":
+                name = _unquote(value)
+                advance()
+            expect("{")
+            depth += 1
+            styles.append(name)
+        elif kind == "id" and value.lower() in ("graph", "node", "edge"):
+            scope = value.lower()
+            advance()
+            attrs = attr_list()
+            if scope == "node" and styles and styles[-1] is not None:
+                yield ("style", styles[-1], attrs)
+        elif kind == "id":
+            name = node_id()
+            if kind == "op" and value == "=":
+                # A graph attribute such as rank=same.
+                advance()
+                if kind != "id":
+                    raise DotSyntaxError(f"bad value for {name}: {value!r}")
+                advance()
+                continue
+            if kind == "op" and value in ("->", "--"):
+                chain = [name]
+                while kind == "op" and value in ("->", "--"):
+                    advance()
+                    if (kind == "op" and value == "{") or (
+                        kind == "id" and value.lower() == "subgraph"
+                    ):
+                        raise DotSyntaxError("edges to subgraphs")
+                    chain.append(node_id())
+                attr_list()
+                for source, target in zip(chain, chain[1:]):
+                    yield ("edge", source, target)
+                continue
+            yield ("node", name, attr_list(), current_style())
+        else:
+            raise DotSyntaxError(f"unexpected {value!r}")
+    if kind != "end":
+        raise DotSyntaxError("text after the end of the graph")
 
 
 def _label_to_text(label: str) -> str:
@@ -50,7 +237,41 @@ def _label_to_text(label: str) -> str:
     return '\n'.join(out_lines)
 
 
-def dot_to_yaml(dot_path, yaml_path):
+def _new_node(text=None):
+    return {"text": text, "children": [], "parents": []}
+
+
+def _dot_data_streaming(dot_text):
+    nodes = {}
+    styles = {}
+    for statement in iter_dot_statements(dot_text):
+        if statement[0] == "edge":
+            _, src, dst = statement
+            if src not in nodes:
+                nodes[src] = _new_node()
+            if dst not in nodes:
+                nodes[dst] = _new_node()
+            nodes[src]["children"].append(dst)
+            nodes[dst]["parents"].append(src)
+        elif statement[0] == "node":
+            _, name, attrs, style = statement
+            if name not in nodes:
+                nodes[name] = _new_node()
+            if "label" in attrs:
+                nodes[name]["text"] = _label_to_text(_unquote(attrs["label"]))
+            if style is not None:
+                styles.setdefault(style, {"attrs": {}})
+                nodes[name]["style"] = style
+        else:
+            _, name, attrs = statement
+            style = styles.setdefault(name, {"attrs": {}})
+            style["attrs"].setdefault("node", []).append(attrs)
+    return {"styles": styles, "nodes": nodes}
+
+
+def _dot_data_pydot(dot_path):
+    import pydot
+
     graphs = pydot.graph_from_dot_file(dot_path)
     if not graphs:
         raise ValueError("No graph found in dot file")
@@ -94,17 +315,18 @@ def dot_to_yaml(dot_path, yaml_path):
         nodes.setdefault(dst, {'text': None, 'children': [], 'parents': []})
         nodes[src]['children'].append(dst)
         nodes[dst]['parents'].append(src)
-    data = {'styles': styles, 'nodes': nodes}
+    return {"styles": styles, "nodes": nodes}
+
+
+def dot_to_yaml(dot_path, yaml_path):
+    with open(dot_path, encoding="utf-8") as f:
+        dot_text = f.read()
+    try:
+        data = _dot_data_streaming(dot_text)
+    except DotSyntaxError:
+        data = _dot_data_pydot(dot_path)
     with open(yaml_path, 'w') as f:
-        yaml.dump(
-            data,
-            f,
-            Dumper=IndentDumper,
-            default_flow_style=False,
-            sort_keys=True,
-            allow_unicode=True,
-            indent=2,
-        )
+        f.write(_dump_graph_yaml(data))
 
 
 if __name__ == '__main__':
@@ -1,14 +1,31 @@
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import date, datetime
+import bisect
+import functools
+import hashlib
+import heapq
+import json
+import os
+import shutil
+import tempfile
+import threading
 import time
 
 import textwrap
 import re
 import yaml
-from dateutil.parser import parse as parse_due_string
+from dateutil.parser import parse as parse_due_string, parserinfo
 from yaml.emitter import ScalarAnalysis
 
+# {{{ changeable parameters: how many formatted node labels are remembered
+#     between rebuilds (a few per node covers edits and view switches)
+LABEL_CACHE_ENTRIES = 20000
+# how many distinct due-date strings keep their parsed date
+DUE_DATE_CACHE_ENTRIES = 20000
+# }}}
+
 
 class IndentDumper(yaml.SafeDumper):
     """YAML dumper that always indents nested lists."""
@@ -32,6 +49,124 @@ class IndentDumper(yaml.SafeDumper):
         return analysis
 
 
+# libyaml's loader and emitter when PyYAML was built with them. The C emitter
+# cannot be told to indent sequences or to force block style, so
+# _dump_graph_yaml only uses it for data where _c_dump_matches says the
+# output can be patched to match IndentDumper exactly.
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_CSafeDumper = getattr(yaml, "CSafeDumper", None)
+_plain_key_re = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_.-]*")
+_block_probe = yaml.emitter.Emitter(None, allow_unicode=True)
+_unusual_char_re = re.compile(
+    "[\x00-\x09\x0b-\x1f\x7f-\x9f\u2028\u2029\ud800-\udfff\ufeff"
+    "\U00010000-\U0010ffff]"
+)
+_key_resolver = yaml.resolver.Resolver()
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_plain_key(key):
+    return (
+        isinstance(key, str)
+        and len(key) < 100
+        and _plain_key_re.fullmatch(key) is not None
+        and _key_resolver.resolve(yaml.ScalarNode, key, (True, False))
+        == "tag:yaml.org,2002:str"
+    )
+
+
+def _c_dump_matches(value, depth=0):
+    """Whether the C emitter plus :func:`_indent_sequences` reproduces
+    IndentDumper's output for ``value``."""
+    if isinstance(value, dict):
+        return all(
+            _is_plain_key(key) and _c_dump_matches(item, depth + 1)
+            for key, item in value.items()
+        )
+    if isinstance(value, list):
+        # Items must stay on one line: the sequences move two columns right
+        # afterwards, which would change where long scalars get folded.
+        for item in value:
+            if isinstance(item, (dict, list)):
+                return False
+            if isinstance(item, str) and (
+                "\n" in item or 2 * depth + len(item) > 60
+            ):
+                return False
+        return all(_c_dump_matches(item, depth + 1) for item in value)
+    if isinstance(value, str):
+        # The emitters disagree on escaping and breaking around these, and
+        # without them a one-line string never needs double quotes (which
+        # the two emitters fold differently).
+        if _unusual_char_re.search(value):
+            return False
+        if "\n" in value:
+            return _block_probe.analyze_scalar(value).allow_block
+        return True
+    return value is None or isinstance(value, (int, float, date))
+
+
+def _ends_keep_scalar(value):
+    """Whether the last scalar dumped for ``value`` is a ``|+`` block."""
+    while isinstance(value, (dict, list)) and value:
+        value = value[max(value)] if isinstance(value, dict) else value[-1]
+    return (
+        isinstance(value, str)
+        and "\n" in value
+        and value.endswith("\n")
+        and (len(value) == 1 or value[-2] in "\n\x85\u2028\u2029")
+    )
+
+
+def _indent_sequences(text):
+    """Indent the sequences in C-emitted YAML the way IndentDumper does.
+
+    libyaml writes a sequence that is a mapping value at the key's own
+    indentation. Only lists of one-line scalars get here, so each such
+    sequence is a run of ``- item`` lines, plus the lines of any scalar that
+    continues below an item, which all move two columns right.
+    """
+    lines = text.split("\n")
+    out = []
+    scalar_indent = -1
+    key_indent = None
+    sequence_indent = None
+    for line in lines:
+        stripped = line.lstrip(" ")
+        indent = len(line) - len(stripped)
+        if stripped and indent > scalar_indent >= 0:
+            # Continuation of a scalar that started on an earlier line.
+            if sequence_indent is not None:
+                line = "  " + line
+            out.append(line)
+            continue
+        if not stripped:
+            out.append(line)
+            continue
+        scalar_indent = -1
+        if sequence_indent is not None and not (
+            indent == sequence_indent and stripped.startswith("- ")
+        ):
+            sequence_indent = None
+        if (
+            key_indent is not None
+            and indent == key_indent
+            and stripped.startswith("- ")
+        ):
+            sequence_indent = indent
+        key_indent = None
+        if sequence_indent is not None:
+            out.append("  " + line)
+            scalar_indent = indent
+        elif stripped.endswith(":") and _plain_key_re.fullmatch(stripped[:-1]):
+            key_indent = indent
+            out.append(line)
+        else:
+            scalar_indent = indent
+            out.append(line)
+    return "\n".join(out)
+
+
 def _str_presenter(dumper, data: str):
     if "\n" in data:
         return dumper.represent_scalar(
@@ -45,8 +180,11 @@ def _str_presenter(dumper, data: str):
 def _register_block_str_presenter() -> None:
     """Register the multiline string presenter on all dumpers we use."""
 
-    for dumper in (yaml.Dumper, yaml.SafeDumper, IndentDumper):
-        if getattr(dumper, "yaml_representers", None) is not None:
+    for dumper in (yaml.Dumper, yaml.SafeDumper, IndentDumper, _CSafeDumper):
+        if (
+            dumper is not None
+            and getattr(dumper, "yaml_representers", None) is not None
+        ):
             dumper.add_representer(str, _str_presenter)
 
 
@@ -57,6 +195,75 @@ class EmptyGraphYamlError(ValueError):
     pass
 
 
+class _Adjacency:
+    """Parent/child links of a loaded graph, indexed for cheap updates.
+
+    ``children[name]`` and ``parents[name]`` are dicts used as ordered sets,
+    so membership tests and removals are O(1) while the YAML lists keep their
+    order. ``listed_as_child[name]`` and ``listed_as_parent[name]`` are the
+    reverse indexes (which nodes list ``name`` in their ``children`` or
+    ``parents``), so dropping a node only touches the nodes that mention it.
+    """
+
+    def __init__(self, nodes):
+        self.children = {}
+        self.parents = {}
+        self.listed_as_child = {}
+        self.listed_as_parent = {}
+        for name, node in nodes.items():
+            self.add_node(name)
+            for child in node.get("children", []):
+                self._add_child_entry(name, child)
+            for parent in node.get("parents", []):
+                self._add_parent_entry(name, parent)
+
+    def add_node(self, name):
+        self.children.setdefault(name, {})
+        self.parents.setdefault(name, {})
+        self.listed_as_child.setdefault(name, set())
+        self.listed_as_parent.setdefault(name, set())
+
+    def _add_child_entry(self, name, child):
+        self.add_node(child)
+        self.children[name][child] = None
+        self.listed_as_child[child].add(name)
+
+    def _add_parent_entry(self, name, parent):
+        self.add_node(parent)
+        self.parents[name][parent] = None
+        self.listed_as_parent[parent].add(name)
+
+    def link(self, parent, child):
+        self.add_node(parent)
+        self._add_child_entry(parent, child)
+        self._add_parent_entry(child, parent)
+
+    def unlink(self, parent, child):
+        if child in self.children.get(parent, {}):
+            del self.children[parent][child]
+            self.listed_as_child[child].discard(parent)
+        if parent in self.parents.get(child, {}):
+            del self.parents[child][parent]
+            self.listed_as_parent[parent].discard(child)
+
+    def remove_node(self, name):
+        for other in self.listed_as_child.pop(name, ()):
+            self.children[other].pop(name, None)
+        for other in self.listed_as_parent.pop(name, ()):
+            self.parents[other].pop(name, None)
+        for child in self.children.pop(name, {}):
+            self.listed_as_child[child].discard(name)
+        for parent in self.parents.pop(name, {}):
+            self.listed_as_parent[parent].discard(name)
+
+    def write_lists(self, nodes):
+        """Store the links back on ``nodes`` as the YAML-facing lists."""
+        for name in self.children:
+            node = nodes.setdefault(name, {})
+            node["children"] = list(self.children[name])
+            node["parents"] = list(self.parents[name])
+
+
 def load_graph_yaml(
     path: str, old_data: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
@@ -74,7 +281,7 @@ def load_graph_yaml(
         except OSError:
             size = None
         with open(path) as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=_SafeLoader)
         if data is not None:
             break
         if size == 0 and attempt < 2:
@@ -94,70 +301,59 @@ def load_graph_yaml(
     for name, node in list(nodes.items()):
         node.setdefault("children", [])
         node.setdefault("parents", [])
-        node["children"] = list(dict.fromkeys(node["children"]))
-        node["parents"] = list(dict.fromkeys(node["parents"]))
         if "subgraph" in node and "style" not in node:
             node["style"] = node.pop("subgraph")
         for child in node["children"]:
             nodes.setdefault(child, {}).setdefault("children", [])
-
     if old_data is None:
-        # Rebuild parent lists solely from children
+        # Parent lists are rebuilt solely from children, so names listed
+        # only as parents must not be indexed as nodes.
         for node in nodes.values():
             node["parents"] = []
-        for parent, node in nodes.items():
-            for child in node.get("children", []):
-                nodes[child]["parents"].append(parent)
+    links = _Adjacency(nodes)
+
+    if old_data is None:
+        for parent in list(links.children):
+            for child in list(links.children[parent]):
+                links.link(parent, child)
+        links.write_lists(nodes)
         return data
 
     old_nodes = old_data.get("nodes", {})
 
     removed_nodes = set(old_nodes) - defined_nodes
-    if removed_nodes:
-        for removed in removed_nodes:
-            for node in nodes.values():
-                if removed in node.get("children", []):
-                    node["children"].remove(removed)
-                if removed in node.get("parents", []):
-                    node["parents"].remove(removed)
-            nodes.pop(removed, None)
-
-    for name, node in nodes.items():
+    for removed in removed_nodes:
+        links.remove_node(removed)
+        nodes.pop(removed, None)
+
+    # Each node is compared with the lists as they stand once the earlier
+    # nodes were synced, so editing one side of a link updates the other.
+    for name in list(nodes):
         old_node = old_nodes.get(name, {})
         old_children = set(old_node.get("children", []))
-        new_children = set(node.get("children", []))
         old_parents = set(old_node.get("parents", []))
-        new_parents = set(node.get("parents", []))
+        new_children = links.children[name]
+        new_parents = links.parents[name]
 
         # Children added or removed on this node
-        for child in new_children - old_children:
-            nodes.setdefault(child, {}).setdefault("parents", [])
-            if name not in nodes[child]["parents"]:
-                nodes[child]["parents"].append(name)
-        for child in old_children - new_children:
-            if child in removed_nodes:
+        for child in list(new_children):
+            if child not in old_children:
+                links.link(name, child)
+        for child in old_children:
+            if child in removed_nodes or child in new_children:
                 continue
-            nodes.setdefault(child, {}).setdefault("parents", [])
-            if name in nodes[child]["parents"]:
-                nodes[child]["parents"].remove(name)
+            links.unlink(name, child)
 
         # Parents added or removed on this node
-        for parent in new_parents - old_parents:
-            nodes.setdefault(parent, {}).setdefault("children", [])
-            if name not in nodes[parent]["children"]:
-                nodes[parent]["children"].append(name)
-        for parent in old_parents - new_parents:
-            if parent in removed_nodes:
+        for parent in list(new_parents):
+            if parent not in old_parents:
+                links.link(parent, name)
+        for parent in old_parents:
+            if parent in removed_nodes or parent in new_parents:
                 continue
-            nodes.setdefault(parent, {}).setdefault("children", [])
-            if name in nodes[parent]["children"]:
-                nodes[parent]["children"].remove(name)
-
-    # Deduplicate lists
-    for node in nodes.values():
-        node["children"] = list(dict.fromkeys(node.get("children", [])))
-        node["parents"] = list(dict.fromkeys(node.get("parents", [])))
+            links.unlink(parent, name)
 
+    links.write_lists(nodes)
     return data
 
 
@@ -295,6 +491,48 @@ def _format_label(text: str, wrap_width: int = 55) -> str:
     return "<" + body + ">"
 
 
+# Same two-digit year rule as dateutil's default parser, so the fast path
+# below agrees with it.
+_due_year_info = parserinfo()
+_canonical_due_re = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{2})")
+
+
+@functools.lru_cache(maxsize=DUE_DATE_CACHE_ENTRIES)
+def _parse_canonical_due(text):
+    # mm/dd/yy is what save_graph_yaml writes, so nearly every due date
+    # after the first save takes this path instead of dateutil's parser.
+    match = _canonical_due_re.fullmatch(text)
+    if match is None:
+        return None
+    month, day, year = (int(part) for part in match.groups())
+    try:
+        return datetime(_due_year_info.convertyear(year), month, day).date()
+    except ValueError:
+        # Leave day-first and other ambiguous dates to dateutil.
+        return None
+
+
+@functools.lru_cache(maxsize=DUE_DATE_CACHE_ENTRIES)
+def _parse_due_text(text, default):
+    return parse_due_string(text, default=default).date()
+
+
+def parse_due_date(text, default=None):
+    """Return the date of a YAML due string.
+
+    ``default`` fills in fields missing from the text, as for dateutil's
+    ``parse``, and defaults to today. Results are cached, so each distinct
+    string is only parsed once however often a build asks for it.
+    """
+    text = str(text).strip()
+    parsed = _parse_canonical_due(text)
+    if parsed is not None:
+        return parsed
+    if default is None:
+        default = datetime.combine(date.today(), datetime.min.time())
+    return _parse_due_text(text, default)
+
+
 def _node_text_with_due(node, depends_on_undated_parent=False):
     """Return node text with due date appended when present."""
     if "due" not in node or node["due"] is None:
@@ -308,9 +546,9 @@ def _node_text_with_due(node, depends_on_undated_parent=False):
             return node["text"]
         return None
 
-    # ``parse_due_string`` accepts numerous human readable date formats so
+    # ``parse_due_date`` accepts numerous human readable date formats so
     # writers can use whatever is most convenient in the YAML file.
-    due_date = parse_due_string(due_text).date()
+    due_date = parse_due_date(due_text)
     today_date = date.today()
 
     # Render the actual due date in orange, optionally showing an original date
@@ -338,9 +576,7 @@ def _node_text_with_due(node, depends_on_undated_parent=False):
     else:
         formatted = date_formatter(due_date)
     if "orig_due" in node and node["orig_due"] is not None:
-        orig_str = date_formatter(
-            parse_due_string(str(node["orig_due"]).strip())
-        )
+        orig_str = date_formatter(parse_due_date(node["orig_due"]))
         formatted = f"<i>{orig_str}</i>→{formatted}"
     # Completed tasks should show a green due date so the status is obvious at
     # a glance. Upcoming deadlines within the next week are orange to match the
@@ -409,31 +645,599 @@ def trace_ancestors(
     return ancestors
 
 
+class ReachabilityIndex:
+    """Integer-indexed parent/child links for ancestor queries.
+
+    Nodes are numbered in data order and ``parents[i]``/``children[i]`` hold
+    positions, so a query is a walk over small lists of ints. Membership of
+    many sources at once is carried as an int bitmask per node, which lets
+    :meth:`endpoint_memberships` settle every project in one sweep instead of
+    one ancestor walk per endpoint.
+    """
+
+    def __init__(self, data):
+        nodes = data.get("nodes", {})
+        self.names = list(nodes)
+        self.index = {name: position for position, name in enumerate(nodes)}
+        self.parents = []
+        self.children = [[] for _ in self.names]
+        for position, name in enumerate(self.names):
+            parents = [
+                self.index[parent]
+                for parent in nodes[name].get("parents", [])
+                if parent in self.index
+            ]
+            self.parents.append(parents)
+            for parent in parents:
+                self.children[parent].append(position)
+
+    def flags(self, names):
+        flags = bytearray(len(self.names))
+        for name in names:
+            if name in self.index:
+                flags[self.index[name]] = 1
+        return flags
+
+    def names_of(self, flags):
+        return [name for name, flag in zip(self.names, flags) if flag]
+
+    def ancestors(self, starts, stop=()):
+        """Flag every node reachable from ``starts`` through parent links.
+
+        Like :func:`trace_ancestors`, the starts themselves are not flagged
+        and nodes named in ``stop`` are flagged but not walked past.
+        """
+        stop_flags = self.flags(stop)
+        seen = self.flags(starts)
+        found = bytearray(len(self.names))
+        pending = [position for position, flag in enumerate(seen) if flag]
+        while pending:
+            for parent in self.parents[pending.pop()]:
+                if seen[parent]:
+                    continue
+                seen[parent] = 1
+                found[parent] = 1
+                if not stop_flags[parent]:
+                    pending.append(parent)
+        return found
+
+    def endpoint_memberships(self, endpoints):
+        """Bitmask per node of the ``endpoints`` whose project holds it.
+
+        Bit ``k`` stands for ``endpoints[k]``. An endpoint belongs only to
+        its own project and shields its ancestors from the projects below
+        it, so each node ORs together what its children pass up.
+        """
+        bits = {}
+        for bit, endpoint in enumerate(endpoints):
+            if endpoint in self.index:
+                bits[self.index[endpoint]] = 1 << bit
+        masks = [0] * len(self.names)
+
+        def settle(position):
+            if position in bits:
+                return bits[position]
+            mask = 0
+            for child in self.children[position]:
+                mask |= masks[child]
+            return mask
+
+        # Sweep from the leaves up so each node sees its children settled.
+        waiting = [len(children) for children in self.children]
+        ready = [
+            position for position, count in enumerate(waiting) if not count
+        ]
+        while ready:
+            position = ready.pop()
+            masks[position] = settle(position)
+            for parent in self.parents[position]:
+                waiting[parent] -= 1
+                if not waiting[parent]:
+                    ready.append(parent)
+        # Nodes on or above a cycle never became ready; iterate them to a
+        # fixed point, which terminates because masks only gain bits.
+        cyclic = [position for position, count in enumerate(waiting) if count]
+        changed = True
+        while cyclic and changed:
+            changed = False
+            for position in cyclic:
+                mask = settle(position)
+                if mask != masks[position]:
+                    masks[position] = mask
+                    changed = True
+        return masks
+
+
+def task_index_path(yaml_path):
+    """Where :meth:`TaskIndex.save` keeps the task names of ``yaml_path``.
+
+    The index lives in the user's cache directory (``$XDG_CACHE_HOME`` or
+    ``~/.cache``), named by a hash of the YAML's absolute path, so nothing
+    is written next to the YAML itself.
+    """
+    yaml_path = Path(yaml_path).resolve()
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    digest = hashlib.sha1(str(yaml_path).encode("utf-8")).hexdigest()
+    return (
+        Path(cache_home)
+        / "pydifftools"
+        / "tasks"
+        / f"{yaml_path.stem}-{digest[:16]}.json"
+    )
+
+
+def _yaml_stamp(yaml_path):
+    stat = Path(yaml_path).stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class TaskIndex:
+    """Task names, flags and ancestor sets kept up to date across rebuilds.
+
+    :meth:`update` compares each node's parents and style with the last
+    call and only redoes the parts that changed: the lowercased name map
+    follows added and removed tasks, and a cached ancestor set is dropped
+    only when a task in it (or the task itself) changed its parents. Name
+    lookups, prefix completion and repeated ancestor queries then cost
+    about as much as the size of their answer.
+
+    :meth:`save` stores the names and flags in the user's cache directory
+    (see :func:`task_index_path`), so shell completion can read them with
+    :meth:`load` instead of parsing the YAML on every key press. A loaded
+    index has no links, so it answers name queries only.
+    """
+
+    version = 1
+
+    def __init__(self, data=None):
+        self.lock = threading.RLock()
+        self.order = []
+        self.position = {}
+        self.parents = {}
+        self.styles = {}
+        self.lower = {}
+        self.sorted_lower = []
+        self.completed = set()
+        self.endpoints = set()
+        self.closures = {}
+        self.dirty = False
+        self.saved_stamp = None
+        if data is not None:
+            self.update(data)
+
+    def update(self, data):
+        """Bring the index in line with the nodes of ``data``."""
+        nodes = data.get("nodes", {})
+        with self.lock:
+            changed = set()
+            for name, node in nodes.items():
+                parents = tuple(node.get("parents", ()))
+                style = str(node.get("style", ""))
+                if name not in self.styles:
+                    folded = name.lower()
+                    if folded not in self.lower:
+                        self.lower[folded] = []
+                        bisect.insort(self.sorted_lower, folded)
+                    self.lower[folded].append(name)
+                if self.parents.get(name) != parents:
+                    self.parents[name] = parents
+                    changed.add(name)
+                if self.styles.get(name) != style:
+                    self.styles[name] = style
+                    self.completed.discard(name)
+                    self.endpoints.discard(name)
+                    if node_is_completed(node):
+                        self.completed.add(name)
+                    if node_is_endpoint(node):
+                        self.endpoints.add(name)
+                    self.dirty = True
+            if len(self.styles) != len(nodes):
+                removed = [name for name in self.styles if name not in nodes]
+                for name in removed:
+                    del self.parents[name]
+                    del self.styles[name]
+                    self.completed.discard(name)
+                    self.endpoints.discard(name)
+                    folded = name.lower()
+                    self.lower[folded].remove(name)
+                    if not self.lower[folded]:
+                        del self.lower[folded]
+                        del self.sorted_lower[
+                            bisect.bisect_left(self.sorted_lower, folded)
+                        ]
+                changed.update(removed)
+            if changed:
+                self.dirty = True
+                self.closures = {
+                    name: closure
+                    for name, closure in self.closures.items()
+                    if name not in changed and changed.isdisjoint(closure)
+                }
+            if self.order != list(nodes):
+                self.order = list(nodes)
+                self.position = {
+                    name: position for position, name in enumerate(nodes)
+                }
+
+    def matches(self, name):
+        """Task names equal to ``name`` when compared case-insensitively."""
+        with self.lock:
+            return list(self.lower.get(str(name).lower(), ()))
+
+    def complete(self, prefix, include_completed=False):
+        """Task names starting with ``prefix``, ignoring case."""
+        folded = prefix.lower()
+        found = []
+        with self.lock:
+            start = bisect.bisect_left(self.sorted_lower, folded)
+            for key in self.sorted_lower[start:]:
+                if not key.startswith(folded):
+                    break
+                found.extend(
+                    name
+                    for name in self.lower[key]
+                    if include_completed or name not in self.completed
+                )
+        return found
+
+    def ancestors(self, name, include_self=False):
+        """Every task reachable from ``name`` through parent links.
+
+        Like :meth:`ReachabilityIndex.ancestors`, ``name`` itself is left
+        out unless ``include_self`` is set. The names come back in data
+        order.
+        """
+        with self.lock:
+            found = [
+                ancestor
+                for ancestor in self._closure(name)
+                if ancestor in self.position
+            ]
+            if include_self and name in self.position:
+                found.append(name)
+            return sorted(found, key=self.position.__getitem__)
+
+    def _closure(self, name):
+        if name in self.closures:
+            return self.closures[name]
+        found = set()
+        pending = [name]
+        while pending:
+            for parent in self.parents.get(pending.pop(), ()):
+                if parent == name or parent in found:
+                    continue
+                # Links to missing tasks are kept so the closure is dropped
+                # once such a task is added.
+                found.add(parent)
+                if parent in self.closures:
+                    found.update(self.closures[parent])
+                    found.discard(name)
+                else:
+                    pending.append(parent)
+        closure = frozenset(found)
+        self.closures[name] = closure
+        return closure
+
+    def save(self, yaml_path):
+        """Record the names for ``yaml_path`` as it is on disk now.
+
+        Nothing is written when neither the index nor the YAML changed
+        since the last save; failures to write are ignored since the file
+        is only a cache.
+        """
+        with self.lock:
+            try:
+                stamp = _yaml_stamp(yaml_path)
+            except OSError:
+                return
+            if not self.dirty and stamp == self.saved_stamp:
+                return
+            payload = {
+                "version": self.version,
+                "stamp": stamp,
+                "names": self.order,
+                "completed": sorted(self.completed),
+                "endpoints": sorted(self.endpoints),
+            }
+            target = task_index_path(yaml_path)
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_name = tempfile.mkstemp(
+                    dir=str(target.parent), prefix=f".{target.name}."
+                )
+                with os.fdopen(fd, "w") as fp:
+                    json.dump(payload, fp)
+                os.replace(tmp_name, target)
+            except OSError:
+                return
+            self.dirty = False
+            self.saved_stamp = stamp
+
+    @classmethod
+    def load(cls, yaml_path):
+        """The saved index of ``yaml_path``, or None if missing or stale."""
+        try:
+            stamp = _yaml_stamp(yaml_path)
+            with open(task_index_path(yaml_path)) as fp:
+                payload = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        if (
+            not isinstance(payload, dict)
+            or payload.get("version") != cls.version
+            or payload.get("stamp") != stamp
+        ):
+            return None
+        completed = set(payload["completed"])
+        endpoints = set(payload["endpoints"])
+        nodes = {}
+        for name in payload["names"]:
+            style = []
+            if name in completed:
+                style.append("completed")
+            if name in endpoints:
+                style.append("endpoint")
+            nodes[name] = {"style": ",".join(style)}
+        index = cls({"nodes": nodes})
+        index.dirty = False
+        index.saved_stamp = stamp
+        return index
+
+    @classmethod
+    def for_yaml(cls, yaml_path):
+        """The saved index of ``yaml_path``, rebuilt and saved if stale."""
+        index = cls.load(yaml_path)
+        if index is None:
+            index = cls(load_graph_yaml(str(yaml_path)))
+            index.save(yaml_path)
+        return index
+
+
 def endpoint_projects(data):
-    endpoints = set()
-    for name, node_data in data.get("nodes", {}).items():
-        if node_is_endpoint(node_data):
-            endpoints.add(name)
-
-    projects = {}
-    for endpoint in sorted(endpoints):
-        projects[endpoint] = [endpoint]
-        projects[endpoint].extend(
-            trace_ancestors(
-                data,
-                endpoint,
-                stop_at=lambda name, _node: name in endpoints,
-            )
-        )
+    endpoints = sorted(
+        name
+        for name, node_data in data.get("nodes", {}).items()
+        if node_is_endpoint(node_data)
+    )
+    index = ReachabilityIndex(data)
+    projects = {endpoint: [endpoint] for endpoint in endpoints}
+    for name, mask in zip(index.names, index.endpoint_memberships(endpoints)):
+        while mask:
+            lowest = mask & -mask
+            endpoint = endpoints[lowest.bit_length() - 1]
+            if endpoint != name:
+                projects[endpoint].append(name)
+            mask ^= lowest
     return projects
 
 
+def _project_summary_node(data, endpoint, members):
+    nodes = data["nodes"]
+    node = dict(nodes[endpoint])
+    open_count = sum(
+        1 for name in members if not node_is_completed(nodes[name])
+    )
+    text = node.get("text") or endpoint
+    node["text"] = f"{text}\n({len(members)} tasks, {open_count} open)"
+    node["children"] = []
+    node["parents"] = []
+    return node
+
+
+def _with_nodes(data, nodes):
+    detail = {key: value for key, value in data.items() if key != "nodes"}
+    detail["nodes"] = nodes
+    return detail
+
+
+def summarize_projects(data, projects=None):
+    """Return graph data with each endpoint project collapsed to one node.
+
+    The summary node keeps the endpoint's name, style and due date and counts
+    the project's tasks. One project links to another when its endpoint is a
+    parent of one of the other's tasks; tasks outside every project stay as
+    they are.
+    """
+    nodes = data.get("nodes", {})
+    if projects is None:
+        projects = endpoint_projects(data)
+    owners = {}
+    for endpoint, members in projects.items():
+        for name in members[1:]:
+            owners.setdefault(name, []).append(endpoint)
+
+    def collapsed(name):
+        if name in projects or name not in owners:
+            return [name]
+        return owners[name]
+
+    summary = {}
+    for name in nodes:
+        if name in projects:
+            summary[name] = _project_summary_node(data, name, projects[name])
+        elif name not in owners:
+            summary[name] = dict(nodes[name], children=[], parents=[])
+    for parent in nodes:
+        for child in nodes[parent].get("children", []):
+            if child not in nodes:
+                continue
+            # Links between tasks, or from a task to its endpoint, are
+            # inside the projects being collapsed.
+            if parent in owners and (child in owners or child in projects):
+                continue
+            for source in collapsed(parent):
+                for target in collapsed(child):
+                    if source == target:
+                        continue
+                    if target not in summary[source]["children"]:
+                        summary[source]["children"].append(target)
+                        summary[target]["parents"].append(source)
+    return _with_nodes(data, summary)
+
+
+def project_detail(data, endpoint, projects=None):
+    """Return graph data for the tasks of one endpoint project.
+
+    Other projects whose endpoints feed into it are included as collapsed
+    summary nodes, so the view still shows what the project waits for.
+    """
+    nodes = data["nodes"]
+    if projects is None:
+        projects = endpoint_projects(data)
+    members = set(projects[endpoint])
+    upstream = {}
+    for name in projects[endpoint]:
+        for parent in nodes[name].get("parents", []):
+            if parent in projects and parent not in members:
+                upstream[parent] = True
+    detail = {}
+    for name in nodes:
+        if name in members:
+            node = dict(nodes[name])
+            node["children"] = [
+                child for child in node.get("children", []) if child in members
+            ]
+            node["parents"] = [
+                parent
+                for parent in node.get("parents", [])
+                if parent in members or parent in upstream
+            ]
+            detail[name] = node
+        elif name in upstream:
+            node = _project_summary_node(data, name, projects[name])
+            node["children"] = [
+                child for child in nodes[name]["children"] if child in members
+            ]
+            detail[name] = node
+    return _with_nodes(data, detail)
+
+
 def _node_label(text, wrap_width=55):
     if text is None:
         return ""
     return _format_label(text, wrap_width)
 
 
+class LabelCache:
+    """Formatted DOT labels keyed by everything that goes into them.
+
+    A label depends on the node text, its ``due``/``orig_due`` values, whether
+    it is completed, the undated-parent warning, the wrap width and today's
+    date (for TODAY/OVERDUE notices), so a rebuild after a typical edit only
+    re-formats the nodes that changed. The module keeps one shared instance,
+    :data:`label_cache`, which therefore persists across watcher rebuilds.
+    """
+
+    def __init__(self, max_entries=LABEL_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(node, depends_on_undated_parent=False, wrap_width=55):
+        due = node.get("due")
+        today = None
+        if due is not None and str(due).strip():
+            # Only dated labels change with the day (TODAY/OVERDUE notices).
+            today = date.today()
+        return (
+            node.get("text"),
+            due,
+            node.get("orig_due"),
+            node_is_completed(node),
+            depends_on_undated_parent,
+            wrap_width,
+            today,
+        )
+
+    def label(self, node, depends_on_undated_parent=False, wrap_width=55):
+        key = self.key(node, depends_on_undated_parent, wrap_width)
+        with self.lock:
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            self.misses += 1
+        label = _node_label(
+            _node_text_with_due(node, depends_on_undated_parent), wrap_width
+        )
+        with self.lock:
+            self.entries[key] = label
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return label
+
+    def stats(self):
+        """Return ``(hits, misses)`` so callers can diff around a build."""
+        with self.lock:
+            return self.hits, self.misses
+
+
+label_cache = LabelCache()
+
+
+class DotFragments:
+    """DOT text of every node and of its out-edges from the previous build.
+
+    Passed to :func:`yaml_to_dot`, it reuses a node's line when the inputs
+    of that line (label key, subgraph indent and date sort value) are
+    unchanged and a node's edge lines when its children are, so only edited
+    nodes are regenerated. After each build ``changed`` names the nodes whose
+    line or edges were regenerated (edge changes also mark the children that
+    were linked or unlinked), ``removed`` the nodes that disappeared, for
+    later stages that work incrementally, and ``reused`` counts the node lines
+    taken as-is (their labels never reach :data:`label_cache`). Keep one
+    instance per view.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self.edges = {}
+        self.changed = set()
+        self.removed = set()
+        self.reused = 0
+        self.lock = threading.Lock()
+        self._seen = set()
+
+    def start(self):
+        self.changed = set()
+        self.reused = 0
+        self._seen = set()
+
+    def node_line(self, name, key, make_line):
+        self._seen.add(name)
+        if name in self.nodes and self.nodes[name][0] == key:
+            self.reused += 1
+            return self.nodes[name][1]
+        line = make_line()
+        self.nodes[name] = (key, line)
+        self.changed.add(name)
+        return line
+
+    def edge_lines(self, name, children):
+        children = tuple(children)
+        if name in self.edges and self.edges[name][0] == children:
+            return self.edges[name][1]
+        lines = [f"    {name} -> {child};" for child in children]
+        old_children = ()
+        if name in self.edges:
+            old_children = self.edges[name][0]
+        self.edges[name] = (children, lines)
+        self.changed.add(name)
+        self.changed.update(set(children) ^ set(old_children))
+        return lines
+
+    def finish(self):
+        self.removed = set(self.nodes) - self._seen
+        for name in self.removed:
+            del self.nodes[name]
+        for name in set(self.edges) - self._seen:
+            del self.edges[name]
+        self.changed -= self.removed
+
+
 def _normalize_graph_dates(data):
     # Normalize due dates to mm/dd/yy so the YAML is consistent across years.
     if "nodes" not in data:
@@ -445,27 +1249,30 @@ def _normalize_graph_dates(data):
             and data["nodes"][name]["due"] is not None
         ):
             if str(data["nodes"][name]["due"]).strip():
-                parsed = parse_due_string(
-                    str(data["nodes"][name]["due"]).strip(),
-                    default=default_date,
+                parsed = parse_due_date(
+                    data["nodes"][name]["due"], default=default_date
                 )
-                data["nodes"][name]["due"] = parsed.date().strftime("%m/%d/%y")
+                data["nodes"][name]["due"] = parsed.strftime("%m/%d/%y")
         if (
             "orig_due" in data["nodes"][name]
             and data["nodes"][name]["orig_due"] is not None
         ):
             if str(data["nodes"][name]["orig_due"]).strip():
-                parsed = parse_due_string(
-                    str(data["nodes"][name]["orig_due"]).strip(),
-                    default=default_date,
-                )
-                data["nodes"][name]["orig_due"] = parsed.date().strftime(
-                    "%m/%d/%y"
+                parsed = parse_due_date(
+                    data["nodes"][name]["orig_due"], default=default_date
                 )
+                data["nodes"][name]["orig_due"] = parsed.strftime("%m/%d/%y")
 
 
 def _append_node(
-    lines, indent, node_name, data, wrap_width, order_by_date, sort_order
+    lines,
+    indent,
+    node_name,
+    data,
+    wrap_width,
+    order_by_date,
+    sort_order,
+    fragments=None,
 ):
     # Every rendered DOT node corresponds to a real YAML node, so build the
     # label directly from that node and prepend the task-link marker line.
@@ -482,9 +1289,48 @@ def _append_node(
             if parent_due is None or not str(parent_due).strip():
                 depends_on_undated_parent = True
                 break
-    label = _node_label(
-        _node_text_with_due(node, depends_on_undated_parent), wrap_width
+    if fragments is not None:
+        key = (indent, sort_order[node_name] if order_by_date else None)
+        key += LabelCache.key(node, depends_on_undated_parent, wrap_width)
+        lines.append(
+            fragments.node_line(
+                node_name,
+                key,
+                lambda: _node_line(
+                    indent,
+                    node_name,
+                    node,
+                    depends_on_undated_parent,
+                    wrap_width,
+                    order_by_date,
+                    sort_order,
+                ),
+            )
+        )
+        return
+    lines.append(
+        _node_line(
+            indent,
+            node_name,
+            node,
+            depends_on_undated_parent,
+            wrap_width,
+            order_by_date,
+            sort_order,
+        )
     )
+
+
+def _node_line(
+    indent,
+    node_name,
+    node,
+    depends_on_undated_parent,
+    wrap_width,
+    order_by_date,
+    sort_order,
+):
+    label = label_cache.label(node, depends_on_undated_parent, wrap_width)
     task_link_line = (
         f'<font point-size="9">__WGRPH_TASK_LINK__:{node_name}</font>'
     )
@@ -494,15 +1340,24 @@ def _append_node(
         label = "<" + task_link_line + '<br align="left"/>' + ">"
 
     if order_by_date:
-        lines.append(
+        return (
             f"{indent}{node_name} [label={label},"
             f" sortv={sort_order[node_name]}];"
         )
-    else:
-        lines.append(f"{indent}{node_name} [label={label}];")
+    return f"{indent}{node_name} [label={label}];"
+
+
+def yaml_to_dot(data, wrap_width=55, order_by_date=False, fragments=None):
+    if fragments is None:
+        return _yaml_to_dot(data, wrap_width, order_by_date)
+    with fragments.lock:
+        fragments.start()
+        dot_str = _yaml_to_dot(data, wrap_width, order_by_date, fragments)
+        fragments.finish()
+    return dot_str
 
 
-def yaml_to_dot(data, wrap_width=55, order_by_date=False):
+def _yaml_to_dot(data, wrap_width, order_by_date, fragments=None):
     def _attrs_to_dot_str(attrs):
         if isinstance(attrs, list):
             if not attrs:
@@ -552,9 +1407,7 @@ def yaml_to_dot(data, wrap_width=55, order_by_date=False):
                 and data["nodes"][name]["due"] is not None
             ):
                 if str(data["nodes"][name]["due"]).strip():
-                    due_date = parse_due_string(
-                        str(data["nodes"][name]["due"]).strip()
-                    ).date()
+                    due_date = parse_due_date(data["nodes"][name]["due"])
                     order_pairs.append((due_date, name))
         # Capture a stable order and use sort values so Graphviz keeps it.
         ordered_names = [
@@ -601,6 +1454,7 @@ def yaml_to_dot(data, wrap_width=55, order_by_date=False):
                 wrap_width,
                 order_by_date,
                 sort_order,
+                fragments,
             )
             handled.add(node_name)
         lines.append("    };")
@@ -618,6 +1472,7 @@ def yaml_to_dot(data, wrap_width=55, order_by_date=False):
             wrap_width,
             order_by_date,
             sort_order,
+            fragments,
         )
     if order_by_date:
         # Arrange nodes in a grid while preserving style subgraphs.
@@ -642,9 +1497,15 @@ def yaml_to_dot(data, wrap_width=55, order_by_date=False):
     else:
         # Edges are omitted when ordering by date so boxes stand alone.
         for name in data["nodes"]:
-            if "children" in data["nodes"][name]:
-                for child in data["nodes"][name]["children"]:
-                    lines.append(f"    {name} -> {child};")
+            if "children" not in data["nodes"][name]:
+                continue
+            if fragments is not None:
+                lines.extend(
+                    fragments.edge_lines(name, data["nodes"][name]["children"])
+                )
+                continue
+            for child in data["nodes"][name]["children"]:
+                lines.append(f"    {name} -> {child};")
     lines.append("}")
     return "\n".join(lines)
 
@@ -669,23 +1530,16 @@ def _filter_nodes_for_dot(
         include_node(name)
 
     if include_completed_endpoint_ancestors:
-        for name in list(included):
-            completed_endpoint_ancestors = trace_ancestors(
-                data,
-                name,
-                stop_at=lambda _name, node: node_is_endpoint(node),
-                include_stopped=True,
-                skip_over=lambda _name, node: (
-                    node_is_completed(node) and not node_is_endpoint(node)
-                ),
-            )
-            for ancestor in completed_endpoint_ancestors:
-                if ancestor not in nodes:
-                    continue
-                if node_is_completed(nodes[ancestor]) and node_is_endpoint(
-                    nodes[ancestor]
-                ):
-                    include_node(ancestor)
+        # Completed endpoints directly above the kept tasks (walking through
+        # any non-endpoint ancestors) stay visible as project anchors.
+        index = ReachabilityIndex(data)
+        endpoints = [name for name in nodes if node_is_endpoint(nodes[name])]
+        found = index.ancestors(included, stop=endpoints)
+        for ancestor in index.names_of(found):
+            if node_is_completed(nodes[ancestor]) and node_is_endpoint(
+                nodes[ancestor]
+            ):
+                include_node(ancestor)
 
     data_for_dot = {"nodes": {}, "styles": {}}
     if "styles" in data:
@@ -708,153 +1562,300 @@ def _filter_nodes_for_dot(
     return data_for_dot
 
 
-def save_graph_yaml(path, data):
+def _dump_yaml(data, use_c=None):
+    """Dump ``data`` like IndentDumper, through libyaml when that matches.
+
+    ``use_c`` is the result of :func:`_c_dump_matches` if already known.
+    """
+    options = dict(
+        default_flow_style=False,
+        sort_keys=True,
+        allow_unicode=True,
+        indent=2,
+    )
+    if use_c is None:
+        use_c = _CSafeDumper is not None and _c_dump_matches(data)
+    if use_c:
+        text = yaml.dump(data, Dumper=_CSafeDumper, **options)
+        if text.endswith("\n...\n") and not _ends_keep_scalar(data):
+            # libyaml still ends the document with "..." after any
+            # keep-chomped block scalar; PyYAML only when it is the last.
+            text = text[: -len("...\n")]
+        return _indent_sequences(text)
+    return yaml.dump(data, Dumper=IndentDumper, **options)
+
+
+def _dump_graph_yaml(data):
+    """Return the canonical YAML text that :func:`save_graph_yaml` writes."""
     # Ensure stored dates are normalized before writing.
     _normalize_graph_dates(data)
-    with open(path, "w") as f:
-        yaml.dump(
-            data,
-            f,
-            Dumper=IndentDumper,
-            default_flow_style=False,
-            sort_keys=True,
-            allow_unicode=True,
-            indent=2,
+    if _CSafeDumper is None or not all(_is_plain_key(key) for key in data):
+        return _dump_yaml(data)
+    # A block mapping dumps as the concatenation of its entries, so each
+    # section (and each run of nodes) can take the C emitter on its own and
+    # one node it cannot reproduce does not slow down the rest of the plan.
+    parts = []
+    for key in sorted(data):
+        value = data[key]
+        if (
+            not isinstance(value, dict)
+            or not value
+            or not all(isinstance(name, str) for name in value)
+        ):
+            parts.append(_dump_yaml({key: value}))
+            continue
+        header = f"{key}:\n"
+        parts.append(header)
+        run = {}
+        run_matches = None
+        for name in sorted(value):
+            matches = _c_dump_matches({key: {name: value[name]}})
+            if run and matches != run_matches:
+                parts.append(
+                    _dump_yaml({key: run}, run_matches)[len(header) :]
+                )
+                run = {}
+            run[name] = value[name]
+            run_matches = matches
+        parts.append(_dump_yaml({key: run}, run_matches)[len(header) :])
+    # Only the end of the whole document keeps the "..." marker emitted
+    # after a trailing keep-chomped block scalar.
+    for index, part in enumerate(parts[:-1]):
+        if part.endswith("...\n") and part[-5:-4] in "\n\x85\u2028\u2029":
+            parts[index] = part[: -len("...\n")]
+    return "".join(parts)
+
+
+def save_graph_yaml(path, data):
+    """Write ``data`` to ``path`` unless the file already holds it.
+
+    Returns True when the file was rewritten. The new text goes to a
+    temporary file in the same directory that then replaces ``path``, so
+    watchers never see a half-written graph.
+    """
+    text = _dump_graph_yaml(data)
+    path = Path(path)
+    try:
+        if path.read_text() == text:
+            return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+    fd, tmp_name = tempfile.mkstemp(
+        prefix=f".{path.name}.", suffix=".tmp", dir=path.parent
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        if path.exists():
+            shutil.copymode(path, tmp_name)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    return True
+
+
+def _dated_parent_order(dated_parents):
+    """Order dated nodes so every dated parent comes before its children.
+
+    Kahn's algorithm over the dated-parent DAG; ties are taken in name order
+    so the warnings come out in a stable order.
+    """
+    children = {name: [] for name in dated_parents}
+    waiting = {}
+    for name, parents in dated_parents.items():
+        waiting[name] = len(parents)
+        for parent in parents:
+            children[parent].append(name)
+    ready = [(str(name), name) for name, count in waiting.items() if not count]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        _, name = heapq.heappop(ready)
+        order.append(name)
+        for child in children[name]:
+            waiting[child] -= 1
+            if not waiting[child]:
+                heapq.heappush(ready, (str(child), child))
+    if len(order) < len(dated_parents):
+        # Every node left over still waits on a parent that is also left
+        # over, so following those parents must come back around.
+        left = {name for name, count in waiting.items() if count}
+        path = [min(left, key=lambda item: str(item))]
+        while path.count(path[-1]) < 2:
+            path.append(
+                next(
+                    parent
+                    for parent in dated_parents[path[-1]]
+                    if parent in left
+                )
+            )
+        cycle = path[path.index(path[-1]) :]
+        raise ValueError(
+            "Cannot adjust flowchart due dates because dated parent "
+            "relationships contain a cycle: "
+            + " -> ".join(str(item) for item in cycle)
         )
+    return order
 
 
-def write_dot_from_yaml(
-    yaml_path,
-    dot_path,
-    update_yaml=True,
-    wrap_width=55,
-    order_by_date=False,
-    old_data=None,
-    validate_due_dates=False,
-    filter_task=None,
-    filter_completed=False,
-    resolve_due_date_conflict=None,
+def _push_due_dates_after_parents(
+    data, resolve_due_date_conflict=None, resolve_due_date_conflicts=None
 ):
-    data = load_graph_yaml(str(yaml_path), old_data=old_data)
-    _normalize_graph_dates(data)
-    if validate_due_dates:
-        # {{{ Push child due dates after their dated parents
-        due_dates = {}
-        for name in data["nodes"]:
-            if (
-                "due" in data["nodes"][name]
-                and data["nodes"][name]["due"] is not None
-            ):
-                due_text = str(data["nodes"][name]["due"]).strip()
-                if due_text:
-                    due_dates[name] = parse_due_string(due_text).date()
-        visiting = []
-        visited = set()
-
-        def adjust_due_after_parents(name):
-            if name in visited:
-                return due_dates.get(name)
-            if name in visiting:
-                cycle = visiting[visiting.index(name) :] + [name]
-                raise ValueError(
-                    "Cannot adjust flowchart due dates because dated parent "
-                    "relationships contain a cycle: "
-                    + " -> ".join(str(item) for item in cycle)
-                )
-            visiting.append(name)
-            latest_parent = None
-            latest_parent_due = None
-            for parent in sorted(
-                data["nodes"][name].get("parents", []),
-                key=lambda item: str(item),
-            ):
-                if parent not in due_dates:
-                    continue
-                parent_due = adjust_due_after_parents(parent)
-                if parent_due is None:
-                    continue
-                if latest_parent_due is None or parent_due > latest_parent_due:
-                    latest_parent = parent
-                    latest_parent_due = parent_due
-            while (
-                latest_parent_due is not None
-                and due_dates[name] < latest_parent_due
-            ):
-                node = data["nodes"][name]
+    """Move each dated node's due date to no earlier than its dated parents.
+
+    A conflict is either resolved by moving the child's due date (the
+    default) or by breaking the dependency. ``resolve_due_date_conflict``
+    decides one conflict at a time as it is found.
+    ``resolve_due_date_conflicts`` instead receives the list of every
+    proposed move as ``(name, old_due_text, new_due_text, parent, message)``
+    tuples and returns a dict mapping names to ``"move"`` or ``"break"``;
+    it is only asked again if breaking a dependency uncovers new conflicts.
+    """
+    nodes = data["nodes"]
+    due_dates = {}
+    for name in nodes:
+        if "due" in nodes[name] and nodes[name]["due"] is not None:
+            due_text = str(nodes[name]["due"]).strip()
+            if due_text:
+                due_dates[name] = parse_due_date(due_text)
+    dated_parents = {
+        name: sorted(
+            {
+                parent
+                for parent in nodes[name].get("parents", [])
+                if parent in due_dates
+            },
+            key=lambda item: str(item),
+        )
+        for name in due_dates
+    }
+    order = _dated_parent_order(dated_parents)
+
+    def propagate(dates, decide, apply):
+        for name in order:
+            parents = dated_parents[name]
+            while True:
+                latest_parent = None
+                latest_parent_due = None
+                for parent in parents:
+                    if (
+                        latest_parent_due is None
+                        or dates[parent] > latest_parent_due
+                    ):
+                        latest_parent = parent
+                        latest_parent_due = dates[parent]
+                if (
+                    latest_parent_due is None
+                    or dates[name] >= latest_parent_due
+                ):
+                    break
+                node = nodes[name]
                 old_due_text = node["due"]
-                adjusted_due = latest_parent_due
-                new_due_text = adjusted_due.strftime("%m/%d/%y")
+                new_due_text = latest_parent_due.strftime("%m/%d/%y")
                 message = (
                     f"**WARNING!** moving due date of {name} from "
                     f"{old_due_text} to {new_due_text} because child of "
                     f"{latest_parent}"
                 )
-                action = "move"
-                if resolve_due_date_conflict is not None:
-                    action = resolve_due_date_conflict(
-                        name,
-                        old_due_text,
-                        new_due_text,
-                        latest_parent,
-                        message,
-                    )
+                action = decide(
+                    name, old_due_text, new_due_text, latest_parent, message
+                )
                 if action == "break":
-                    if latest_parent in node.get("parents", []):
-                        node["parents"].remove(latest_parent)
-                    parent_node = data["nodes"].get(latest_parent)
-                    if parent_node is not None and name in parent_node.get(
-                        "children", []
-                    ):
-                        parent_node["children"].remove(name)
-                    print(
-                        "**WARNING!** breaking dependency between "
-                        f"{latest_parent} and {name}",
-                        flush=True,
-                    )
-                    latest_parent = None
-                    latest_parent_due = None
-                    for parent in sorted(
-                        data["nodes"][name].get("parents", []),
-                        key=lambda item: str(item),
-                    ):
-                        if parent not in due_dates:
-                            continue
-                        parent_due = due_dates[parent]
+                    parents = [
+                        parent for parent in parents if parent != latest_parent
+                    ]
+                    if apply:
+                        if latest_parent in node.get("parents", []):
+                            node["parents"].remove(latest_parent)
+                        parent_node = nodes.get(latest_parent)
                         if (
-                            latest_parent_due is None
-                            or parent_due > latest_parent_due
+                            parent_node is not None
+                            and name in parent_node.get("children", [])
                         ):
-                            latest_parent = parent
-                            latest_parent_due = parent_due
+                            parent_node["children"].remove(name)
+                        print(
+                            "**WARNING!** breaking dependency between "
+                            f"{latest_parent} and {name}",
+                            flush=True,
+                        )
                     continue
                 if action != "move":
                     raise ValueError(
                         "Unknown due date conflict action "
                         f"{action!r} for {name}."
                     )
-                orig_due = node.get("orig_due")
-                if orig_due is None or not str(orig_due).strip():
-                    node["orig_due"] = old_due_text
-                node["due"] = new_due_text
-                due_dates[name] = adjusted_due
-                print(message, flush=True)
+                dates[name] = latest_parent_due
+                if apply:
+                    orig_due = node.get("orig_due")
+                    if orig_due is None or not str(orig_due).strip():
+                        node["orig_due"] = old_due_text
+                    node["due"] = new_due_text
+                    print(message, flush=True)
                 break
-            visiting.pop()
-            visited.add(name)
-            return due_dates.get(name)
 
-        for name in sorted(due_dates, key=lambda item: str(item)):
-            adjust_due_after_parents(name)
-        # }}}
+    if resolve_due_date_conflicts is not None:
+        # Dry runs collect the conflicts that have no decision yet, so the
+        # resolver sees all of them together instead of one per node.
+        decisions = {}
+        while True:
+            pending = []
+
+            def decide(name, old_due_text, new_due_text, parent, message):
+                if (name, parent) not in decisions:
+                    pending.append(
+                        (name, old_due_text, new_due_text, parent, message)
+                    )
+                return decisions.get((name, parent), "move")
+
+            propagate(dict(due_dates), decide, apply=False)
+            if not pending:
+                break
+            actions = resolve_due_date_conflicts(pending) or {}
+            for name, _, _, parent, _ in pending:
+                decisions[(name, parent)] = actions.get(name, "move")
+        propagate(
+            due_dates,
+            lambda name, old, new, parent, message: decisions[(name, parent)],
+            apply=True,
+        )
+    elif resolve_due_date_conflict is not None:
+        propagate(due_dates, resolve_due_date_conflict, apply=True)
+    else:
+        propagate(due_dates, lambda *_: "move", apply=True)
+
+
+def write_dot_from_yaml(
+    yaml_path,
+    dot_path,
+    update_yaml=True,
+    wrap_width=55,
+    order_by_date=False,
+    old_data=None,
+    validate_due_dates=False,
+    filter_task=None,
+    filter_completed=False,
+    resolve_due_date_conflict=None,
+    dot_fragments=None,
+    resolve_due_date_conflicts=None,
+    level_of_detail=False,
+    task_index=None,
+):
+    data = load_graph_yaml(str(yaml_path), old_data=old_data)
+    _normalize_graph_dates(data)
+    if validate_due_dates:
+        _push_due_dates_after_parents(
+            data, resolve_due_date_conflict, resolve_due_date_conflicts
+        )
+    if task_index is not None:
+        task_index.update(data)
     data_for_dot = data
     if filter_task is not None:
+        # Only an index the caller passed in is saved below.
+        index = task_index if task_index is not None else TaskIndex(data)
         # Limit the rendered graph to incomplete ancestors of the target task.
         if "nodes" not in data or filter_task not in data["nodes"]:
-            matches = [
-                name
-                for name in data["nodes"]
-                if name.lower() == filter_task.lower()
-            ]
+            matches = index.matches(filter_task)
             if len(matches) == 1:
                 filter_task = matches[0]
             elif len(matches) > 1:
@@ -876,20 +1877,32 @@ def write_dot_from_yaml(
                 raise ValueError(
                     f"Task '{filter_task}' not found in flowchart YAML."
                 )
-        # Include the target task alongside its ancestors in the filtered view.
-        ancestors = set([filter_task])
-        ancestors.update(trace_ancestors(data, filter_task))
-        data_for_dot = _filter_nodes_for_dot(data, ancestors)
+        if level_of_detail and node_is_endpoint(data["nodes"][filter_task]):
+            # Drilling into a project from the level-of-detail overview.
+            data_for_dot = project_detail(data, filter_task)
+        else:
+            # Include the target task alongside its ancestors in the filtered
+            # view.
+            data_for_dot = _filter_nodes_for_dot(
+                data, index.ancestors(filter_task, include_self=True)
+            )
     elif filter_completed:
         data_for_dot = _filter_nodes_for_dot(
             data,
             data.get("nodes", {}).keys(),
             include_completed_endpoint_ancestors=True,
         )
+    elif level_of_detail and not order_by_date:
+        data_for_dot = summarize_projects(data)
     dot_str = yaml_to_dot(
-        data_for_dot, wrap_width=wrap_width, order_by_date=order_by_date
+        data_for_dot,
+        wrap_width=wrap_width,
+        order_by_date=order_by_date,
+        fragments=dot_fragments,
     )
     Path(dot_path).write_text(dot_str)
     if update_yaml:
         save_graph_yaml(str(yaml_path), data)
+    if task_index is not None:
+        task_index.save(yaml_path)
     return data
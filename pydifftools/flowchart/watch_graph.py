@@ -3,11 +3,20 @@ import sys
 import time
 import shutil
 import math
+import hashlib
+import functools
+import gzip
+import html
+import json
+import queue
+import re
+import tempfile
 import threading
 import urllib.parse
 import http.server
 import xml.etree.ElementTree as ET
 import traceback
+from collections import OrderedDict
 from pathlib import Path
 
 try:
@@ -21,12 +30,41 @@ except (
         pass
 
     Observer = None  # type: ignore[assignment]
+try:
+    import pygraphviz
+except ImportError:  # pragma: no cover - falls back to the dot executable
+    pygraphviz = None
 from pydifftools.command_registry import register_command
 from pydifftools.browser_lifecycle import (
     browser_window_is_alive,
     close_browser_window,
 )
-from .graph import EmptyGraphYamlError, endpoint_projects, write_dot_from_yaml
+from .graph import (
+    DotFragments,
+    EmptyGraphYamlError,
+    TaskIndex,
+    endpoint_projects,
+    label_cache,
+    write_dot_from_yaml,
+)
+
+# {{{ changeable parameters: how many bytes of rendered SVGs (across all
+#     views and recent edits) the preview keeps so it can skip Graphviz on a
+#     repeat; wgrph on a directory splits this between its graphs
+SVG_CACHE_BYTES = 128 * 1024 * 1024
+# how many task-filter views (most recently opened first) the background
+# renderer keeps up to date next to the overview, date and plan views
+RECENT_TASK_VIEWS = 4
+# how many graphs a multi-graph preview (wgrph on a directory) re-renders in
+# the background at the same time
+RENDER_WORKERS = 2
+# seconds between keepalive messages on a preview page's event stream;
+# a closed browser window is noticed within about twice this
+PUSH_KEEPALIVE = 1.0
+# how many earlier SVG versions a preview keeps (compressed) to send a
+# page only the parts that changed since the one it shows
+SVG_PATCH_HISTORY = 4
+# }}}
 
 
 def _reload_svg(driver, svg_src) -> None:
@@ -255,29 +293,39 @@ def _watch_view_state_from_params(params):
 
 
 def _watch_footer_links(
-    order_by_date, target_task=None, filter_completed=False
+    order_by_date, target_task=None, filter_completed=False, url_prefix="/"
 ):
     links = []
     if not order_by_date:
-        links.append(("/?d=1", "date-ordered"))
+        links.append((f"{url_prefix}?d=1", "date-ordered"))
     if not filter_completed:
-        links.append(("/?p=1", "full plan"))
+        links.append((f"{url_prefix}?p=1", "full plan"))
     if order_by_date or filter_completed:
-        links.append(("/", "project overview"))
+        links.append((url_prefix, "project overview"))
     elif target_task is not None and str(target_task).strip():
-        links.append(("/", "project overview"))
+        links.append((url_prefix, "project overview"))
+    if url_prefix != "/":
+        # Served next to other graphs by watch_graphs.
+        links.append(("/", "all graphs"))
     return links
 
 
 def _watch_html(
-    svg_url, order_by_date, target_task=None, filter_completed=False
+    svg_url,
+    order_by_date,
+    target_task=None,
+    filter_completed=False,
+    url_prefix="/",
+    events_url=None,
+    version=0,
+    etag=None,
 ):
     # Keep the SVG as the page's main content so browser zoom behavior matches
     # the original watcher experience (the graph scales, not just footer text).
     footer_html = " | ".join(
         f"<a href='{footer_url}'>{footer_label}</a>"
         for footer_url, footer_label in _watch_footer_links(
-            order_by_date, target_task, filter_completed
+            order_by_date, target_task, filter_completed, url_prefix
         )
     )
     return (
@@ -287,16 +335,184 @@ def _watch_html(
         "<p style='margin:0.4em 0.8em;font-family:sans-serif;font-size:13px;'>"
         f"{footer_html}"
         "</p>"
+        f"{_watch_push_script(svg_url, events_url, version, etag)}"
         "</body></html>"
     )
 
 
-def _send_preview_response(handler, body_bytes, content_type):
+def _watch_push_script(svg_url, events_url, version, etag=None):
+    # The page swaps in the new SVG itself when the server announces one,
+    # keeping zoom and scroll the way _reload_svg does over WebDriver.
+    # Knowing the ETag of the SVG it shows, it first asks graph.svg.patch
+    # for only the node and edge groups that changed (see SvgDelivery)
+    # and reloads the whole SVG when a patch cannot be applied.
+    if events_url is None:
+        return ""
+    return (
+        "<script>(function(){"
+        "var view=document.getElementById('svg-view');"
+        f"var etag={json.dumps(etag)},pending=Promise.resolve();"
+        "function children(graph){"
+        "var found={},index=0;"
+        "for(var c=graph.firstElementChild;c;c=c.nextElementSibling,index++){"
+        "var title=null;"
+        "for(var t=c.firstElementChild;t;t=t.nextElementSibling){"
+        "if(t.localName=='title'){title=t;break;}}"
+        "var key=title?(c.getAttribute('class')||'')+':'+title.textContent"
+        ":c.localName+'#'+index;"
+        "if(key in found){var n=2;while((key+'#'+n) in found){n++;}"
+        "key=key+'#'+n;}"
+        "found[key]=c;}"
+        "return found;}"
+        "function apply(patch){"
+        "if(patch.unchanged){return true;}"
+        "var doc=view.getSVGDocument&&view.getSVGDocument();"
+        "if(patch.full||!doc){return false;}"
+        "var svg=doc.documentElement,graph=null;"
+        "for(var c=svg.firstElementChild;c;c=c.nextElementSibling){"
+        "if(c.localName=='g'){graph=c;break;}}"
+        "if(!graph||svg.getAttribute('width')!=patch.root.width"
+        "||svg.getAttribute('height')!=patch.root.height){return false;}"
+        "var have=children(graph),parser=new DOMParser(),items=[];"
+        "for(var i=0;i<patch.order.length;i++){"
+        "var key=patch.order[i],xml=patch.parts[key];"
+        "if(xml===undefined){if(!(key in have)){return false;}"
+        "items.push(have[key]);continue;}"
+        "var part=parser.parseFromString(xml,'image/svg+xml').documentElement;"
+        "if(part.localName=='parsererror'){return false;}"
+        "items.push(doc.importNode(part,true));}"
+        "for(var name in patch.root){svg.setAttribute(name,patch.root[name]);}"
+        "for(var name in patch.graph){"
+        "graph.setAttribute(name,patch.graph[name]);}"
+        "while(graph.firstChild){graph.removeChild(graph.firstChild);}"
+        "for(var i=0;i<items.length;i++){graph.appendChild(items[i]);}"
+        "return true;}"
+        f"var source=new EventSource('{events_url}?v={version}');"
+        "source.onmessage=function(event){"
+        "function reload(){"
+        "var x=window.scrollX,y=window.scrollY,z=document.body.style.zoom;"
+        "view.onload=function(){document.body.style.zoom=z;"
+        "window.scrollTo(x,y);};"
+        f"view.setAttribute('src','{svg_url}?v='+event.data);"
+        "}"
+        "if(etag===null||!window.fetch){reload();return;}"
+        "pending=pending.then(function(){"
+        f"return fetch('{svg_url}.patch?since='+encodeURIComponent(etag));"
+        "}).then(function(response){return response.json();})"
+        ".then(function(patch){"
+        "var applied=false;"
+        "try{applied=apply(patch);}catch(error){}"
+        "etag=patch.etag;if(!applied){reload();}"
+        "},reload);"
+        "};"
+        "})();</script>"
+    )
+
+
+class PreviewPush:
+    """Server-sent events that tell open preview pages to reload the SVG.
+
+    Each preview page keeps an ``EventSource`` open on its ``events`` URL
+    and :meth:`publish` announces a new version to all of them, so the
+    page swaps the SVG itself. The open streams also show whether the
+    browser window is still there (:meth:`connected`).
+    """
+
+    def __init__(self, keepalive=PUSH_KEEPALIVE):
+        self.keepalive = keepalive
+        self.version = 0
+        self.condition = threading.Condition()
+        self.clients = 0
+        self.ever_connected = False
+        self.last_disconnect = None
+        self.closed = False
+
+    def publish(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def connected(self, grace):
+        """Whether a page is listening or stopped less than ``grace`` ago."""
+        with self.condition:
+            if self.clients:
+                return True
+            return (
+                self.last_disconnect is not None
+                and time.time() - self.last_disconnect < grace
+            )
+
+    def serve(self, request, query):
+        """Stream events to ``request`` until the page goes away.
+
+        The page passes the version it was rendered with as ``v``, so an
+        SVG published in between is announced straight away.
+        """
+        params = urllib.parse.parse_qs(query)
+        try:
+            seen = int(params.get("v", ["0"])[-1])
+        except ValueError:
+            seen = 0
+        with self.condition:
+            self.clients += 1
+            self.ever_connected = True
+        try:
+            request.send_response(200)
+            request.send_header("Content-Type", "text/event-stream")
+            request.send_header("Cache-Control", "no-store")
+            request.end_headers()
+            request.wfile.write(b"retry: 500\n\n")
+            request.wfile.flush()
+            while True:
+                with self.condition:
+                    self.condition.wait_for(
+                        lambda: self.closed or self.version != seen,
+                        timeout=self.keepalive,
+                    )
+                    if self.closed:
+                        return
+                    version = self.version
+                if version != seen:
+                    seen = version
+                    message = f"data: {version}\n\n"
+                else:
+                    message = ": keepalive\n\n"
+                request.wfile.write(message.encode("ascii"))
+                request.wfile.flush()
+        except (
+            BrokenPipeError,
+            ConnectionAbortedError,
+            ConnectionResetError,
+            TimeoutError,
+        ):
+            return
+        finally:
+            with self.condition:
+                self.clients -= 1
+                self.last_disconnect = time.time()
+
+
+def _send_preview_response(
+    handler, body_bytes, content_type, etag=None, content_encoding=None
+):
     try:
         handler.send_response(200)
         handler.send_header("Content-Type", content_type)
         handler.send_header("Content-Length", str(len(body_bytes)))
-        handler.send_header("Cache-Control", "no-store")
+        if content_encoding is not None:
+            handler.send_header("Content-Encoding", content_encoding)
+        if etag is not None:
+            # Let the browser keep the SVG but ask whether it is current.
+            handler.send_header("ETag", etag)
+            handler.send_header("Cache-Control", "no-cache")
+            handler.send_header("Vary", "Accept-Encoding")
+        else:
+            handler.send_header("Cache-Control", "no-store")
         handler.end_headers()
         handler.wfile.write(body_bytes)
     except (
@@ -309,10 +525,201 @@ def _send_preview_response(handler, body_bytes, content_type):
     return True
 
 
+def _accepts_gzip(handler):
+    for coding in handler.headers.get("Accept-Encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def _etag_matches(if_none_match, etag):
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+_svg_id_re = re.compile(r' id="[^"]*"')
+
+
+def _svg_parts(svg_bytes):
+    """Split a wgrph SVG into its top-level graph items.
+
+    Returns the root and graph group attributes and an ordered mapping
+    from a stable key (class and ``<title>`` of a node or edge group, or
+    tag and position for untitled items) to the item's XML.
+    """
+    svg_root = ET.fromstring(svg_bytes)
+    graph = None
+    for child in svg_root:
+        if child.tag.endswith("}g") or child.tag == "g":
+            graph = child
+            break
+    if graph is None:
+        raise ValueError("SVG has no graph group")
+    namespace = ""
+    if graph.tag.startswith("{"):
+        namespace = graph.tag[: graph.tag.find("}") + 1]
+    parts = OrderedDict()
+    for index, child in enumerate(graph):
+        title = child.find(f"{namespace}title")
+        if title is None:
+            key = f"{child.tag[len(namespace):]}#{index}"
+        else:
+            key = f"{child.get('class', '')}:{title.text or ''}"
+        if key in parts:
+            suffix = 2
+            while f"{key}#{suffix}" in parts:
+                suffix += 1
+            key = f"{key}#{suffix}"
+        parts[key] = ET.tostring(child, encoding="unicode")
+
+    def plain(attrib):
+        return {
+            name: value
+            for name, value in attrib.items()
+            if not name.startswith("{")
+        }
+
+    return plain(svg_root.attrib), plain(graph.attrib), parts
+
+
+class SvgDelivery:
+    """Send one graph's SVG as cheaply as the browser allows.
+
+    Responses carry an ETag, so asking for an unchanged SVG costs a 304.
+    Bodies are gzip-compressed once per version when the browser accepts
+    it. :meth:`send_patch` answers with only the top-level node and edge
+    groups that changed since a version the page already shows; the last
+    few versions are kept (compressed) to diff against.
+    """
+
+    def __init__(self, history=SVG_PATCH_HISTORY):
+        self.lock = threading.Lock()
+        self.history = history
+        # etag -> gzip-compressed SVG, newest last
+        self.versions = OrderedDict()
+        # (etag, parts) of the newest version split by _svg_parts
+        self.current = (None, None)
+
+    @staticmethod
+    def etag(svg_bytes):
+        return f'"{hashlib.sha1(svg_bytes).hexdigest()}"'
+
+    def _remember(self, etag, svg_bytes):
+        with self.lock:
+            if etag in self.versions:
+                self.versions.move_to_end(etag)
+                return self.versions[etag]
+        compressed = gzip.compress(svg_bytes, compresslevel=5, mtime=0)
+        with self.lock:
+            self.versions[etag] = compressed
+            while len(self.versions) > self.history:
+                self.versions.popitem(last=False)
+        return compressed
+
+    def send(self, request, svg_bytes):
+        etag = self.etag(svg_bytes)
+        if _etag_matches(request.headers.get("If-None-Match"), etag):
+            try:
+                request.send_response(304)
+                request.send_header("ETag", etag)
+                request.send_header("Cache-Control", "no-cache")
+                request.end_headers()
+            except (
+                BrokenPipeError,
+                ConnectionAbortedError,
+                ConnectionResetError,
+                TimeoutError,
+            ):
+                return False
+            return True
+        compressed = self._remember(etag, svg_bytes)
+        if _accepts_gzip(request):
+            return _send_preview_response(
+                request,
+                compressed,
+                "image/svg+xml; charset=utf-8",
+                etag=etag,
+                content_encoding="gzip",
+            )
+        return _send_preview_response(
+            request, svg_bytes, "image/svg+xml; charset=utf-8", etag=etag
+        )
+
+    def patch(self, svg_bytes, since):
+        """The changes from version ``since`` to ``svg_bytes``, as a dict.
+
+        ``full`` is set when ``since`` is unknown or the patch would not be
+        much smaller than the SVG itself.
+        """
+        etag = self.etag(svg_bytes)
+        if since == etag:
+            return {"etag": etag, "full": False, "unchanged": True}
+        self._remember(etag, svg_bytes)
+        with self.lock:
+            base = self.versions.get(since)
+            current_etag, current = self.current
+        if base is None:
+            return {"etag": etag, "full": True}
+        if current_etag != etag:
+            current = _svg_parts(svg_bytes)
+            with self.lock:
+                self.current = (etag, current)
+        _, _, base_parts = _svg_parts(gzip.decompress(base))
+        root, graph, parts = current
+        changed = {
+            key: xml
+            for key, xml in parts.items()
+            if key not in base_parts
+            or _svg_id_re.sub("", base_parts[key]) != _svg_id_re.sub("", xml)
+        }
+        if sum(len(xml) for xml in changed.values()) * 2 > len(svg_bytes):
+            return {"etag": etag, "full": True}
+        return {
+            "etag": etag,
+            "full": False,
+            "root": root,
+            "graph": graph,
+            "order": list(parts),
+            "parts": changed,
+        }
+
+    def send_patch(self, request, svg_bytes, since):
+        body = json.dumps(self.patch(svg_bytes, since)).encode("utf-8")
+        content_encoding = None
+        if _accepts_gzip(request):
+            body = gzip.compress(body, compresslevel=5, mtime=0)
+            content_encoding = "gzip"
+        return _send_preview_response(
+            request,
+            body,
+            "application/json; charset=utf-8",
+            content_encoding=content_encoding,
+        )
+
+
 def _svg_expanded_outline(
-    shape, namespace, expand, stroke_color, stroke_width
+    shape, namespace, expand, stroke_color, stroke_width, bounds=None
 ):
-    bounds = _svg_shape_bounds(shape, namespace)
+    if bounds is None:
+        bounds = _svg_shape_bounds(shape, namespace)
     if bounds is None:
         return None
     x_min, x_max, y_min, y_max = bounds
@@ -345,15 +752,13 @@ def _svg_expanded_outline(
     )
 
 
-def _svg_add_task_links(svg_root, namespace):
+def _svg_add_task_links(node_groups, namespace, url_prefix="/"):
     # Replace marker text emitted in DOT labels with clickable links. Graphviz
     # generates one <text> item per line, so the marker occupies its own row.
     xlink_ns = "http://www.w3.org/1999/xlink"
     ET.register_namespace("xlink", xlink_ns)
     link_marker = "__WGRPH_TASK_LINK__:"
-    for group in svg_root.iter(f"{namespace}g"):
-        if "class" not in group.attrib or group.attrib["class"] != "node":
-            continue
+    for group in node_groups:
         for index, child in enumerate(list(group)):
             if child.tag != f"{namespace}text" or child.text is None:
                 continue
@@ -363,7 +768,8 @@ def _svg_add_task_links(svg_root, namespace):
             child.text = task_name
             link = ET.Element(f"{namespace}a")
             link.set(
-                f"{{{xlink_ns}}}href", f"/?t={urllib.parse.quote(task_name)}"
+                f"{{{xlink_ns}}}href",
+                f"{url_prefix}?t={urllib.parse.quote(task_name)}",
             )
             link.set("target", "_top")
             link.append(child)
@@ -371,46 +777,392 @@ def _svg_add_task_links(svg_root, namespace):
             group.insert(index, link)
 
 
-def _resolve_due_date_conflict_with_qt(
-    name, old_due_text, new_due_text, parent, message
+@functools.lru_cache(maxsize=64)
+def _endpoint_palette(color_count):
+    """Return ``color_count`` evenly spaced, equally light hex colours."""
+    # Build a high-saturation rainbow in Lab space with equal lightness and
+    # evenly spaced a/b angles so each endpoint stands out.
+    colors = []
+    for index in range(color_count):
+        angle = 2.0 * math.pi * float(index) / float(color_count)
+        lab_l = 50.0
+        lab_a = 78.0 * math.cos(angle)
+        lab_b = 78.0 * math.sin(angle)
+        y = (lab_l + 16.0) / 116.0
+        x = y + (lab_a / 500.0)
+        z = y - (lab_b / 200.0)
+        if x**3 > 0.008856:
+            x = x**3
+        else:
+            x = (x - (16.0 / 116.0)) / 7.787
+        if y**3 > 0.008856:
+            y = y**3
+        else:
+            y = (y - (16.0 / 116.0)) / 7.787
+        if z**3 > 0.008856:
+            z = z**3
+        else:
+            z = (z - (16.0 / 116.0)) / 7.787
+        x = 95.047 * x / 100.0
+        y = 100.000 * y / 100.0
+        z = 108.883 * z / 100.0
+        rgb_r = x * 3.2406 + y * -1.5372 + z * -0.4986
+        rgb_g = x * -0.9689 + y * 1.8758 + z * 0.0415
+        rgb_b = x * 0.0557 + y * -0.2040 + z * 1.0570
+        if rgb_r > 0.0031308:
+            rgb_r = 1.055 * (rgb_r ** (1.0 / 2.4)) - 0.055
+        else:
+            rgb_r = 12.92 * rgb_r
+        if rgb_g > 0.0031308:
+            rgb_g = 1.055 * (rgb_g ** (1.0 / 2.4)) - 0.055
+        else:
+            rgb_g = 12.92 * rgb_g
+        if rgb_b > 0.0031308:
+            rgb_b = 1.055 * (rgb_b ** (1.0 / 2.4)) - 0.055
+        else:
+            rgb_b = 12.92 * rgb_b
+        rgb_r = int(round(min(1.0, max(0.0, rgb_r)) * 255.0))
+        rgb_g = int(round(min(1.0, max(0.0, rgb_g)) * 255.0))
+        rgb_b = int(round(min(1.0, max(0.0, rgb_b)) * 255.0))
+        colors.append(f"#{rgb_r:02x}{rgb_g:02x}{rgb_b:02x}")
+    return tuple(colors)
+
+
+class SvgIndex:
+    """Node and edge groups of a Graphviz SVG, gathered in one pass.
+
+    ``nodes`` maps node titles to their groups, ``borders`` maps them to the
+    position of the first outline shape in the group and ``edges`` lists
+    ``(source, target, shapes)`` with the path/arrowhead shapes to recolour.
+    """
+
+    def __init__(self, svg_root, namespace):
+        self.nodes = {}
+        self.borders = {}
+        self.edges = []
+        title_tag = f"{namespace}title"
+        border_tags = (
+            f"{namespace}polygon",
+            f"{namespace}rect",
+            f"{namespace}ellipse",
+            f"{namespace}path",
+        )
+        edge_tags = (f"{namespace}path", f"{namespace}polygon")
+        for group in svg_root.iter(f"{namespace}g"):
+            kind = group.attrib.get("class")
+            if kind != "node" and kind != "edge":
+                continue
+            title = None
+            for child in group:
+                if child.tag == title_tag and child.text is not None:
+                    title = child.text.strip()
+                    break
+            if title is None:
+                continue
+            if kind == "node":
+                self.nodes[title] = group
+                for index, child in enumerate(group):
+                    if child.tag in border_tags:
+                        self.borders[title] = index
+                        break
+                continue
+            if "->" not in title:
+                continue
+            source_name, target_name = title.split("->", 1)
+            self.edges.append(
+                (
+                    source_name.strip(),
+                    target_name.strip(),
+                    [child for child in group if child.tag in edge_tags],
+                )
+            )
+
+
+def _color_projects(index, namespace, projects):
+    endpoint_colors = dict(
+        zip(sorted(projects.keys()), _endpoint_palette(len(projects)))
+    )
+
+    # Build reverse membership so we can color edges by source-side
+    # project assignment after SVG generation.
+    node_to_projects = {}
+    for endpoint in projects:
+        for node_name in projects[endpoint]:
+            if node_name not in node_to_projects:
+                node_to_projects[node_name] = []
+            node_to_projects[node_name].append(endpoint)
+
+    # Color each edge by the project of the target node (arrowhead/child
+    # side), preferring a project that both source and target share.
+    for source_name, target_name, shapes in index.edges:
+        if target_name not in node_to_projects:
+            continue
+        edge_color = None
+        if source_name in node_to_projects:
+            shared_projects = [
+                endpoint
+                for endpoint in node_to_projects[target_name]
+                if endpoint in node_to_projects[source_name]
+            ]
+            if shared_projects:
+                edge_color = endpoint_colors[min(shared_projects)]
+        if edge_color is None:
+            edge_color = endpoint_colors[min(node_to_projects[target_name])]
+        for shape in shapes:
+            _svg_set_stroke(shape, edge_color)
+            if shape.tag == f"{namespace}polygon":
+                _svg_set_fill(shape, edge_color)
+
+    # Color node borders by project membership after edge coloring. Nodes
+    # that belong to multiple projects get concentric transparent outlines.
+    for node_name, memberships in node_to_projects.items():
+        if node_name not in index.borders:
+            continue
+        colors = [
+            endpoint_colors[endpoint]
+            for endpoint in sorted(set(memberships))
+            if endpoint in endpoint_colors
+        ]
+        if not colors:
+            continue
+        group = index.nodes[node_name]
+        border_index = index.borders[node_name]
+        border_shape = group[border_index]
+        if _svg_shape_is_red(border_shape):
+            continue
+        base_stroke_width = _svg_get_float_attr(
+            border_shape, "stroke-width", 1.0
+        )
+        _svg_set_stroke(
+            border_shape, colors[0], stroke_width=base_stroke_width
+        )
+        inserts = []
+        bounds = None
+        if len(colors) > 1:
+            bounds = _svg_shape_bounds(border_shape, namespace)
+            if bounds is None:
+                colors = colors[:1]
+        for ring_index, ring_color in enumerate(colors[1:], start=1):
+            outline = _svg_expanded_outline(
+                border_shape,
+                namespace,
+                # Graphviz's emitted geometry can effectively make a
+                # one-line-width expansion render as only ~half-width
+                # visual offset, so push each added ring out by two
+                # stroke widths per ring to keep borders distinct.
+                expand=2.0 * base_stroke_width * ring_index,
+                stroke_color=ring_color,
+                stroke_width=base_stroke_width,
+                bounds=bounds,
+            )
+            inserts.append((border_index + ring_index, outline))
+        for insert_index, outline in reversed(inserts):
+            group.insert(insert_index, outline)
+
+
+def _postprocess_svg(
+    svg_root, namespace, projects, order_by_date, url_prefix="/"
 ):
+    """Add task links, project colours and padding to a Graphviz SVG."""
+    index = SvgIndex(svg_root, namespace)
+    _svg_add_task_links(index.nodes.values(), namespace, url_prefix)
+    # In dependency view mode, each endpoint style defines a project color.
+    if not order_by_date and projects:
+        _color_projects(index, namespace, projects)
+    _svg_add_canvas_padding(svg_root, padding=24.0)
+
+
+def _resolve_due_date_conflicts_with_qt(conflicts):
     # Run the tiny PySide prompt in its own process so watchdog and preview
     # server worker threads do not create Qt widgets outside the main thread.
+    # All proposed moves are listed in one dialog; unticking a row breaks
+    # that dependency instead of moving the due date.
     prompt_script = """
+import json
 import sys
-from PySide6.QtWidgets import QApplication, QMessageBox
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QApplication,
+    QDialog,
+    QDialogButtonBox,
+    QLabel,
+    QListWidget,
+    QListWidgetItem,
+    QVBoxLayout,
+)
 
+conflicts = json.loads(sys.argv[1])
 app = QApplication(sys.argv[:1])
-box = QMessageBox()
-box.setWindowTitle("wgrph due date")
-box.setIcon(QMessageBox.Icon.Warning)
-box.setText(sys.argv[1])
-box.setInformativeText("Choose how to resolve this dependency date conflict.")
-move_button = box.addButton("Move due date", QMessageBox.ButtonRole.AcceptRole)
-break_button = box.addButton(
-    "Break dependency", QMessageBox.ButtonRole.DestructiveRole
+dialog = QDialog()
+dialog.setWindowTitle("wgrph due dates")
+layout = QVBoxLayout(dialog)
+layout.addWidget(
+    QLabel(
+        "Ticked rows move the due date; unticked rows break the dependency."
+    )
 )
-box.setDefaultButton(move_button)
-box.exec()
-if box.clickedButton() is break_button:
-    sys.exit(1)
-sys.exit(0)
+rows = QListWidget()
+for name, old_due, new_due, parent, message in conflicts:
+    item = QListWidgetItem(message)
+    item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+    item.setCheckState(Qt.CheckState.Checked)
+    rows.addItem(item)
+layout.addWidget(rows)
+buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok)
+buttons.accepted.connect(dialog.accept)
+layout.addWidget(buttons)
+dialog.resize(720, 360)
+dialog.exec()
+actions = {}
+for idx, conflict in enumerate(conflicts):
+    checked = rows.item(idx).checkState() == Qt.CheckState.Checked
+    actions[conflict[0]] = "move" if checked else "break"
+print(json.dumps(actions))
 """
     result = subprocess.run(
-        [sys.executable, "-c", prompt_script, message],
+        [sys.executable, "-c", prompt_script, json.dumps(conflicts)],
         capture_output=True,
         text=True,
     )
     if result.returncode == 0:
-        return "move"
-    if result.returncode == 1:
-        return "break"
+        return json.loads(result.stdout)
     stderr = result.stderr.strip()
     if stderr:
         raise RuntimeError(f"wgrph due-date dialog failed: {stderr}")
     raise RuntimeError("wgrph due-date dialog failed.")
 
 
+def _graphviz_available():
+    return pygraphviz is not None or shutil.which("dot") is not None
+
+
+# The Graphviz C library keeps global state and is not thread-safe, while
+# builds run from the watcher, the preview server and the render pool.
+_graphviz_lock = threading.Lock()
+
+
+def _render_dot_svg(dot_text, prog="dot", args=()):
+    """Lay out ``dot_text`` with Graphviz and return the SVG bytes.
+
+    With pygraphviz installed the layout runs in-process through the
+    Graphviz C library, one layout at a time; otherwise ``prog`` is fed on
+    stdin and the SVG read from stdout, so no intermediate SVG file is
+    written either way.
+    """
+    if pygraphviz is not None:
+        with _graphviz_lock:
+            return pygraphviz.AGraph(string=dot_text).draw(
+                format="svg", prog=prog, args=" ".join(args)
+            )
+    result = subprocess.run(
+        [prog, *args, "-Tsvg"],
+        input=dot_text.encode("utf-8"),
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+    return result.stdout
+
+
+class StableLayout:
+    """Node positions from the previous render of one view.
+
+    :meth:`pin` adds ``pos="x,y!"`` to every node that was placed before and
+    is not in ``changed``, so ``neato -s`` keeps those nodes where they were
+    and only places new or edited ones. :meth:`record` reads the positions
+    back from the rendered SVG (Graphviz draws node shapes in layout points
+    with the y axis flipped).
+    """
+
+    node_line_re = re.compile(r"^(\s*)(\w+) \[label=", re.MULTILINE)
+
+    def __init__(self):
+        self.positions = {}
+
+    def pin(self, dot_text, changed=()):
+        """Return ``(dot_text, pinned_count)`` with stable nodes pinned."""
+        pinned = []
+
+        def add_pos(match):
+            name = match.group(2)
+            if name not in self.positions or name in changed:
+                return match.group(0)
+            pinned.append(name)
+            x, y = self.positions[name]
+            return f'{match.group(1)}{name} [pos="{x:.2f},{y:.2f}!", label='
+
+        return self.node_line_re.sub(add_pos, dot_text), len(pinned)
+
+    def record(self, svg_root, namespace):
+        positions = {}
+        for group in svg_root.iter(f"{namespace}g"):
+            if group.attrib.get("class") != "node":
+                continue
+            title = group.find(f"{namespace}title")
+            if title is None or title.text is None:
+                continue
+            for child in group:
+                bounds = _svg_shape_bounds(child, namespace)
+                if bounds is None:
+                    continue
+                x_min, x_max, y_min, y_max = bounds
+                positions[title.text.strip()] = (
+                    (x_min + x_max) / 2.0,
+                    -(y_min + y_max) / 2.0,
+                )
+                break
+        self.positions = positions
+
+
+class SvgRenderCache:
+    """Least-recently-used store of finished (post-processed) SVG bytes.
+
+    Keys hash the DOT text together with everything the SVG recolouring
+    reads (view mode and endpoint project membership), so switching back to
+    a view or undoing an edit reuses the SVG instead of running Graphviz.
+    Large plans render to SVGs of tens of MB, so the cache is bounded by
+    the total size of the SVGs it holds; one larger than the whole budget
+    is not kept.
+    """
+
+    def __init__(self, max_bytes=SVG_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def key(self, dot_text, order_by_date, projects):
+        recolor = json.dumps(
+            [order_by_date, sorted(projects.items())], sort_keys=True
+        )
+        return hashlib.md5(
+            (dot_text + "\0" + recolor).encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key, svg_bytes):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            if len(svg_bytes) > self.max_bytes:
+                return
+            self.entries[key] = svg_bytes
+            self.size += len(svg_bytes)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
 def build_graph(
     yaml_file,
     dot_file,
@@ -421,16 +1173,28 @@ def build_graph(
     target_task=None,
     filter_completed=False,
     resolve_due_date_conflict=None,
+    svg_cache=None,
+    update_yaml=True,
+    dot_fragments=None,
+    stable_layout=None,
+    resolve_due_date_conflicts=None,
+    level_of_detail=False,
+    url_prefix="/",
+    task_index=None,
 ):
-    # Graphviz is required for dot -> svg rendering.
-    if shutil.which("dot") is None:
+    # Graphviz is required for dot -> svg rendering (neato ships with dot).
+    if not _graphviz_available():
         raise RuntimeError(
             "Graphviz is required to render flowcharts. Install it so the"
             " 'dot' executable is available on your PATH."
         )
+    dot_kwargs = {}
+    if task_index is not None:
+        dot_kwargs["task_index"] = task_index
     data = write_dot_from_yaml(
         str(yaml_file),
         str(dot_file),
+        update_yaml=update_yaml,
         wrap_width=wrap_width,
         order_by_date=order_by_date,
         old_data=prev_data,
@@ -438,189 +1202,70 @@ def build_graph(
         filter_task=target_task,
         filter_completed=filter_completed,
         resolve_due_date_conflict=resolve_due_date_conflict,
+        dot_fragments=dot_fragments,
+        resolve_due_date_conflicts=resolve_due_date_conflicts,
+        level_of_detail=level_of_detail,
+        **dot_kwargs,
     )
-    subprocess.run(
-        ["dot", "-Tsvg", str(dot_file), "-o", str(svg_file)],
-        check=True,
-    )
-    svg_tree = ET.parse(str(svg_file))
-    svg_root = svg_tree.getroot()
+    # In dependency view mode, each endpoint style defines a project color. A
+    # project includes the endpoint plus ancestors, but stops before any
+    # ancestor that is itself an endpoint.
+    projects = {}
+    if not order_by_date:
+        projects = endpoint_projects(data)
+    dot_text = Path(dot_file).read_text()
+    prog, prog_args = "dot", ()
+    if stable_layout is not None:
+        changed = ()
+        if dot_fragments is not None:
+            changed = dot_fragments.changed
+        dot_text, pinned = stable_layout.pin(dot_text, changed)
+        if pinned:
+            # neato honours pinned positions; -s reads them as points.
+            prog, prog_args = "neato", ("-s",)
+    cache_key = None
+    if svg_cache is not None:
+        cache_key = svg_cache.key(dot_text, order_by_date, projects)
+        svg_bytes = svg_cache.get(cache_key)
+        if svg_bytes is not None:
+            Path(svg_file).write_bytes(svg_bytes)
+            if stable_layout is not None:
+                cached_root = ET.fromstring(svg_bytes)
+                namespace = ""
+                if cached_root.tag.startswith("{"):
+                    namespace = cached_root.tag[
+                        : cached_root.tag.find("}") + 1
+                    ]
+                stable_layout.record(cached_root, namespace)
+            return data
+    svg_root = ET.fromstring(_render_dot_svg(dot_text, prog, prog_args))
+    svg_tree = ET.ElementTree(svg_root)
     namespace = ""
     if svg_root.tag.startswith("{"):
         namespace = svg_root.tag[: svg_root.tag.find("}") + 1]
+    if stable_layout is not None:
+        stable_layout.record(svg_root, namespace)
 
-    _svg_add_task_links(svg_root, namespace)
+    _postprocess_svg(svg_root, namespace, projects, order_by_date, url_prefix)
+    svg_tree.write(str(svg_file), encoding="utf-8", xml_declaration=True)
+    if svg_cache is not None:
+        svg_cache.put(cache_key, Path(svg_file).read_bytes())
+    return data
 
-    if not order_by_date:
-        # In dependency view mode, each endpoint style defines a project
-        # color. A project includes the endpoint plus ancestors, but stops
-        # before any ancestor that is itself an endpoint.
-        projects = endpoint_projects(data)
 
-        title_to_group = {}
-        node_title_to_group = {}
-        for group in svg_root.iter(f"{namespace}g"):
-            for child in group:
-                if child.tag == f"{namespace}title" and child.text is not None:
-                    title = child.text.strip()
-                    title_to_group[title] = group
-                    if group.attrib.get("class") == "node":
-                        node_title_to_group[title] = group
-
-        color_count = len(projects)
-        endpoint_colors = {}
-        if color_count > 0:
-            # Build a high-saturation rainbow in Lab space with equal lightness
-            # and evenly spaced a/b angles so each endpoint stands out.
-            for index, endpoint in enumerate(sorted(projects.keys())):
-                angle = 2.0 * math.pi * float(index) / float(color_count)
-                lab_l = 50.0
-                lab_a = 78.0 * math.cos(angle)
-                lab_b = 78.0 * math.sin(angle)
-                y = (lab_l + 16.0) / 116.0
-                x = y + (lab_a / 500.0)
-                z = y - (lab_b / 200.0)
-                if x**3 > 0.008856:
-                    x = x**3
-                else:
-                    x = (x - (16.0 / 116.0)) / 7.787
-                if y**3 > 0.008856:
-                    y = y**3
-                else:
-                    y = (y - (16.0 / 116.0)) / 7.787
-                if z**3 > 0.008856:
-                    z = z**3
-                else:
-                    z = (z - (16.0 / 116.0)) / 7.787
-                x = 95.047 * x / 100.0
-                y = 100.000 * y / 100.0
-                z = 108.883 * z / 100.0
-                rgb_r = x * 3.2406 + y * -1.5372 + z * -0.4986
-                rgb_g = x * -0.9689 + y * 1.8758 + z * 0.0415
-                rgb_b = x * 0.0557 + y * -0.2040 + z * 1.0570
-                if rgb_r > 0.0031308:
-                    rgb_r = 1.055 * (rgb_r ** (1.0 / 2.4)) - 0.055
-                else:
-                    rgb_r = 12.92 * rgb_r
-                if rgb_g > 0.0031308:
-                    rgb_g = 1.055 * (rgb_g ** (1.0 / 2.4)) - 0.055
-                else:
-                    rgb_g = 12.92 * rgb_g
-                if rgb_b > 0.0031308:
-                    rgb_b = 1.055 * (rgb_b ** (1.0 / 2.4)) - 0.055
-                else:
-                    rgb_b = 12.92 * rgb_b
-                rgb_r = int(round(min(1.0, max(0.0, rgb_r)) * 255.0))
-                rgb_g = int(round(min(1.0, max(0.0, rgb_g)) * 255.0))
-                rgb_b = int(round(min(1.0, max(0.0, rgb_b)) * 255.0))
-                endpoint_colors[endpoint] = (
-                    f"#{rgb_r:02x}{rgb_g:02x}{rgb_b:02x}"
-                )
+def _file_digest(path):
+    try:
+        return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
 
-        # Build reverse membership so we can color edges by source-side
-        # project assignment after SVG generation.
-        node_to_projects = {}
-        for endpoint in projects:
-            for node_name in projects[endpoint]:
-                if node_name not in node_to_projects:
-                    node_to_projects[node_name] = []
-                node_to_projects[node_name].append(endpoint)
-
-        # Color each edge by the project of the target node (arrowhead/child
-        # side), preferring a project that both source and target share.
-        for group in svg_root.iter(f"{namespace}g"):
-            if "class" not in group.attrib or group.attrib["class"] != "edge":
-                continue
-            edge_title = None
-            for child in group:
-                if child.tag == f"{namespace}title" and child.text is not None:
-                    edge_title = child.text.strip()
-                    break
-            if edge_title is None or "->" not in edge_title:
-                continue
-            source_name = edge_title.split("->", 1)[0].strip()
-            target_name = edge_title.split("->", 1)[1].strip()
-            edge_color = None
-            if (
-                source_name in node_to_projects
-                and target_name in node_to_projects
-            ):
-                shared_projects = []
-                for endpoint in node_to_projects[target_name]:
-                    if endpoint in node_to_projects[source_name]:
-                        shared_projects.append(endpoint)
-                if shared_projects:
-                    edge_color = endpoint_colors[sorted(shared_projects)[0]]
-            if edge_color is None and target_name in node_to_projects:
-                edge_color = endpoint_colors[
-                    sorted(node_to_projects[target_name])[0]
-                ]
-            if edge_color is None:
-                continue
-            for child in group:
-                if child.tag in (f"{namespace}path", f"{namespace}polygon"):
-                    _svg_set_stroke(child, edge_color)
-                    if child.tag == f"{namespace}polygon":
-                        _svg_set_fill(child, edge_color)
-
-        # Color node borders by project membership after edge coloring. Nodes
-        # that belong to multiple projects get concentric transparent outlines.
-        for node_name, memberships in node_to_projects.items():
-            if node_name not in node_title_to_group:
-                continue
-            colors = [
-                endpoint_colors[endpoint]
-                for endpoint in sorted(set(memberships))
-                if endpoint in endpoint_colors
-            ]
-            if not colors:
-                continue
-            group = node_title_to_group[node_name]
-            border_shape = None
-            border_index = None
-            for index, child in enumerate(list(group)):
-                if child.tag not in (
-                    f"{namespace}polygon",
-                    f"{namespace}rect",
-                    f"{namespace}ellipse",
-                    f"{namespace}path",
-                ):
-                    continue
-                border_shape = child
-                border_index = index
-                break
-            if border_shape is None or border_index is None:
-                continue
-            if _svg_shape_is_red(border_shape):
-                continue
-            base_stroke_width = _svg_get_float_attr(
-                border_shape, "stroke-width", 1.0
-            )
-            _svg_set_stroke(
-                border_shape, colors[0], stroke_width=base_stroke_width
-            )
-            inserts = []
-            for ring_index, ring_color in enumerate(colors[1:], start=1):
-                outline = _svg_expanded_outline(
-                    border_shape,
-                    namespace,
-                    # Graphviz's emitted geometry can effectively make a
-                    # one-line-width expansion render as only ~half-width
-                    # visual offset, so push each added ring out by two
-                    # stroke widths per ring to keep borders distinct.
-                    expand=2.0 * base_stroke_width * ring_index,
-                    stroke_color=ring_color,
-                    stroke_width=base_stroke_width,
-                )
-                if outline is None:
-                    continue
-                inserts.append((border_index + ring_index, outline))
-            for insert_index, outline in reversed(inserts):
-                group.insert(insert_index, outline)
 
-    _svg_add_canvas_padding(svg_root, padding=24.0)
-    svg_tree.write(str(svg_file), encoding="utf-8", xml_declaration=True)
-    return data
+def _view_of(state):
+    return (
+        state["order_by_date"],
+        state["target_task"],
+        state["filter_completed"],
+    )
 
 
 class GraphEventHandler(FileSystemEventHandler):
@@ -639,6 +1284,13 @@ class GraphEventHandler(FileSystemEventHandler):
         state=None,
         resolve_due_date_conflict=None,
         debounce=0.25,
+        svg_cache=None,
+        incremental_dot=False,
+        stable_layout=False,
+        resolve_due_date_conflicts=None,
+        level_of_detail=False,
+        url_prefix="/",
+        task_index=None,
     ):
         self.yaml_file = Path(yaml_file)
         self.dot_file = Path(dot_file)
@@ -651,6 +1303,20 @@ class GraphEventHandler(FileSystemEventHandler):
         self.wrap_width = wrap_width
         self.data = data
         self.resolve_due_date_conflict = resolve_due_date_conflict
+        self.resolve_due_date_conflicts = resolve_due_date_conflicts
+        self.svg_cache = svg_cache
+        # One DotFragments per view, so switching views does not throw away
+        # the fragments of the others.
+        self.dot_fragments = {} if incremental_dot else None
+        self.layouts = {} if stable_layout else None
+        # Collapse endpoint projects in the overview; a project's own view
+        # is its task view.
+        self.level_of_detail = level_of_detail
+        # Path the preview pages of this graph live under; "/<slug>/" when
+        # one server shows several graphs.
+        self.url_prefix = url_prefix
+        # TaskIndex shared with the -t completion of the shell.
+        self.task_index = task_index
         if state is None:
             self.state = {
                 "order_by_date": False,
@@ -660,26 +1326,101 @@ class GraphEventHandler(FileSystemEventHandler):
         else:
             self.state = state
         self.debounce = debounce
+        # Set by wgrph to a BackgroundRenderer that pre-renders other views.
+        self.renderer = None
+        # Set by wgrph to the PreviewPush the preview page listens to.
+        self.push = None
+        # ETags, gzip and patches for the SVG this handler serves.
+        self.delivery = SvgDelivery()
         self._last_handled = 0.0
-        self._last_mtime = None
+        # Hash of the YAML as last built or written by us, so the events our
+        # own saves trigger are recognised and skipped.
+        self._last_digest = None
+
+    def build_kwargs(self, view):
+        """Optional ``build_graph`` arguments for rendering ``view``.
+
+        Only non-default values are included so replacement build functions
+        with the plain signature keep working.
+        """
+        build_kwargs = {}
+        if view[2]:
+            build_kwargs["filter_completed"] = True
+        if self.level_of_detail:
+            build_kwargs["level_of_detail"] = True
+        if self.url_prefix != "/":
+            build_kwargs["url_prefix"] = self.url_prefix
+        if self.task_index is not None:
+            build_kwargs["task_index"] = self.task_index
+        if self.svg_cache is not None:
+            build_kwargs["svg_cache"] = self.svg_cache
+        if self.dot_fragments is not None:
+            if view not in self.dot_fragments:
+                self.dot_fragments[view] = DotFragments()
+            build_kwargs["dot_fragments"] = self.dot_fragments[view]
+        if self.layouts is not None:
+            if view not in self.layouts:
+                self.layouts[view] = StableLayout()
+            build_kwargs["stable_layout"] = self.layouts[view]
+        return build_kwargs
+
+    def remember_yaml(self):
+        """Treat the YAML file's current content as already handled."""
+        self._last_digest = _file_digest(self.yaml_file)
+
+    def reload_preview(self):
+        """Reload the SVG in the browser if it is showing this graph."""
+        if self.push is not None:
+            # The page fetches the new SVG itself.
+            self.push.publish()
+            return
+        if self.url_prefix != "/":
+            # The browser is shared with the other graphs of the server.
+            if self.driver is None:
+                return
+            try:
+                current_url = self.driver.current_url
+            except Exception:
+                return
+            current_path = urllib.parse.urlparse(current_url).path
+            if not current_path.startswith(self.url_prefix):
+                return
+        if self.svg_url is not None:
+            _reload_svg(self.driver, self.svg_url)
+        else:
+            _reload_svg(self.driver, self.svg_file)
 
     def on_modified(self, event):
-        if Path(event.src_path) == self.yaml_file:
-            mtime = self.yaml_file.stat().st_mtime
-            if self._last_mtime is not None and mtime == self._last_mtime:
+        self.handle(event.src_path)
+
+    def on_created(self, event):
+        self.handle(event.src_path)
+
+    def on_moved(self, event):
+        # Editors (and save_graph_yaml) replace the file by renaming a
+        # temporary file over it.
+        self.handle(event.dest_path)
+
+    def handle(self, path):
+        if Path(path) == self.yaml_file:
+            digest = _file_digest(self.yaml_file)
+            if digest is not None and digest == self._last_digest:
                 return
             now = time.time()
             if now - self._last_handled < self.debounce:
                 return
             self._last_handled = now
             try:
-                build_kwargs = {}
+                build_kwargs = self.build_kwargs(_view_of(self.state))
                 if self.resolve_due_date_conflict is not None:
                     build_kwargs["resolve_due_date_conflict"] = (
                         self.resolve_due_date_conflict
                     )
-                if self.state["filter_completed"]:
-                    build_kwargs["filter_completed"] = True
+                if self.resolve_due_date_conflicts is not None:
+                    build_kwargs["resolve_due_date_conflicts"] = (
+                        self.resolve_due_date_conflicts
+                    )
+                hits_before, misses_before = label_cache.stats()
                 self.data = build_graph(
                     self.yaml_file,
                     self.dot_file,
@@ -691,6 +1432,18 @@ class GraphEventHandler(FileSystemEventHandler):
                     **build_kwargs,
                 )
             except Exception as exc:
+                if (
+                    isinstance(exc, EmptyGraphYamlError)
+                    and self.url_prefix != "/"
+                ):
+                    # Other graphs still use the browser window.
+                    print(
+                        f"Graph YAML {self.yaml_file} is empty; keeping the"
+                        " previous preview.",
+                        flush=True,
+                    )
+                    self.remember_yaml()
+                    return
                 if isinstance(exc, EmptyGraphYamlError):
                     print(
                         "Graph YAML is empty; closing preview window.",
@@ -698,7 +1451,7 @@ class GraphEventHandler(FileSystemEventHandler):
                     )
                     close_chrome(self.driver)
                     self.driver = None
-                    self._last_mtime = self.yaml_file.stat().st_mtime
+                    self.remember_yaml()
                     return
                 # Keep the preview open and log the failure so users can
                 # see why the graph didn't refresh.
@@ -710,8 +1463,26 @@ class GraphEventHandler(FileSystemEventHandler):
                 print("---------------------------")
                 print("here is the traceback:")
                 print(traceback.format_exc(), flush=True)
-                self._last_mtime = self.yaml_file.stat().st_mtime
+                self.remember_yaml()
                 return
+            hits, misses = label_cache.stats()
+            hits -= hits_before
+            misses -= misses_before
+            # Node lines reused from the DOT fragments skip the label cache,
+            # so count them as hits or the rate drops as reuse goes up.
+            fragments = build_kwargs.get("dot_fragments")
+            reused = fragments.reused if fragments is not None else 0
+            total = hits + misses + reused
+            if total:
+                rate = f"label cache hit rate {(hits + reused) / total:.0%}"
+                if fragments is not None:
+                    rate += f", {reused} reused DOT lines"
+                print(
+                    f"Reformatted {misses} of {total} node labels ({rate})",
+                    flush=True,
+                )
+            if self.renderer is not None:
+                self.renderer.invalidate()
             if self.driver is None:
                 # Restart the preview once the SVG successfully builds again.
                 if (
@@ -724,17 +1495,362 @@ class GraphEventHandler(FileSystemEventHandler):
                     )
                 else:
                     # Allow test/legacy usage where no browser driver exists.
-                    if self.svg_url is not None:
-                        _reload_svg(self.driver, self.svg_url)
-                    else:
-                        _reload_svg(self.driver, self.svg_file)
-                    self._last_mtime = self.yaml_file.stat().st_mtime
+                    self.reload_preview()
+                    self.remember_yaml()
                     return
-            if self.svg_url is not None:
-                _reload_svg(self.driver, self.svg_url)
-            else:
-                _reload_svg(self.driver, self.svg_file)
-            self._last_mtime = self.yaml_file.stat().st_mtime
+            self.reload_preview()
+            self.remember_yaml()
+
+
+class BackgroundRenderer:
+    """Keep the wgrph views rendered ahead of the browser asking for them.
+
+    Views are ``(order_by_date, target_task, filter_completed)`` tuples. After
+    every YAML change (:meth:`invalidate`) a worker thread re-renders the
+    dependency, date-ordered and full-plan views plus the most recently
+    opened task filters into a private directory, without touching the YAML.
+    Switching views (:meth:`show`) copies the newest finished render into
+    the preview SVG straight away, even if it predates the last edit; once a
+    fresher render of the view on screen lands, the browser is reloaded.
+
+    With a :class:`RenderPool` the renders run on the pool's threads, which
+    are shared with the renderers of other graphs, instead of on a thread of
+    the renderer's own.
+    """
+
+    def __init__(
+        self, event_handler, recent_tasks=RECENT_TASK_VIEWS, pool=None
+    ):
+        self.handler = event_handler
+        self.pool = pool
+        self.max_recent = recent_tasks
+        self.recent_tasks = OrderedDict()
+        # view -> (generation, svg bytes)
+        self.renders = {}
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.idle = threading.Event()
+        self.idle.set()
+        self.stopping = False
+        self.thread = None
+        self.workdir = Path(tempfile.mkdtemp(prefix="wgrph-views-"))
+
+    def start(self):
+        if self.pool is not None:
+            return
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping = True
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5.0)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def views(self):
+        """Views to keep fresh, the one on screen first."""
+        views = [
+            (False, None, False),
+            (True, None, False),
+            (False, None, True),
+        ]
+        for task in reversed(self.recent_tasks):
+            views.append((False, task, False))
+        current = _view_of(self.handler.state)
+        if current in views:
+            views.remove(current)
+        return [current] + views
+
+    def invalidate(self):
+        """Start a new generation after the YAML (and current view) changed.
+
+        The preview SVG was just rebuilt for the view on screen, so it is
+        recorded as that view's up-to-date render.
+        """
+        with self.lock:
+            self.generation += 1
+            if self.handler.svg_file.exists():
+                self.renders[_view_of(self.handler.state)] = (
+                    self.generation,
+                    self.handler.svg_file.read_bytes(),
+                )
+            self._wake()
+
+    def record(self, view, svg_bytes):
+        with self.lock:
+            self.renders[view] = (self.generation, svg_bytes)
+
+    def show(self, view):
+        """Put the latest render of ``view`` on screen.
+
+        Returns False when the view has never been rendered, in which case
+        the caller has to build it synchronously.
+        """
+        with self.lock:
+            if view[1] is not None:
+                self.recent_tasks[view[1]] = True
+                self.recent_tasks.move_to_end(view[1])
+                while len(self.recent_tasks) > self.max_recent:
+                    self.recent_tasks.popitem(last=False)
+            if view not in self.renders:
+                return False
+            generation, svg_bytes = self.renders[view]
+            self.handler.svg_file.write_bytes(svg_bytes)
+            if generation < self.generation:
+                self._wake()
+        return True
+
+    def _wake(self):
+        self.idle.clear()
+        self.wakeup.set()
+        if self.pool is not None:
+            self.pool.submit(self)
+
+    def wait_idle(self, timeout=None):
+        return self.idle.wait(timeout)
+
+    def render(self, view):
+        order_by_date, target_task, _ = view
+        slug = hashlib.md5(repr(view).encode("utf-8")).hexdigest()[:12]
+        dot_file = self.workdir / f"{slug}.dot"
+        svg_file = self.workdir / f"{slug}.svg"
+        build_kwargs = self.handler.build_kwargs(view)
+        build_kwargs["update_yaml"] = False
+        build_graph(
+            self.handler.yaml_file,
+            dot_file,
+            svg_file,
+            self.handler.wrap_width,
+            order_by_date,
+            self.handler.data,
+            target_task,
+            **build_kwargs,
+        )
+        return svg_file.read_bytes()
+
+    def refresh(self):
+        """Render every view older than the current generation once."""
+        with self.lock:
+            generation = self.generation
+            pending = [
+                view
+                for view in self.views()
+                if self.renders.get(view, (-1, None))[0] < generation
+            ]
+        for view in pending:
+            if self.stopping or generation != self.generation:
+                return
+            try:
+                svg_bytes = self.render(view)
+            except Exception as exc:
+                print(
+                    f"Background render of view {view} failed: "
+                    f"{type(exc).__name__}: {exc}",
+                    flush=True,
+                )
+                continue
+            with self.lock:
+                if generation != self.generation:
+                    return
+                self.renders[view] = (generation, svg_bytes)
+                on_screen = view == _view_of(self.handler.state)
+                if on_screen:
+                    self.handler.svg_file.write_bytes(svg_bytes)
+            if on_screen and self.handler.driver is not None:
+                self.handler.reload_preview()
+
+    def run_once(self):
+        """Bring every view up to date; wakeups meanwhile are kept."""
+        self.wakeup.clear()
+        if self.stopping:
+            return
+        self.refresh()
+        with self.lock:
+            if not self.wakeup.is_set():
+                self.idle.set()
+
+    def _run(self):
+        while not self.stopping:
+            self.wakeup.wait()
+            self.run_once()
+
+
+class RenderPool:
+    """Worker threads shared by the background renderers of several graphs.
+
+    A renderer is queued at most once and never runs on two threads at the
+    same time; one woken while it runs is queued again when it finishes.
+    """
+
+    def __init__(self, workers=RENDER_WORKERS):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.queued = set()
+        self.running = set()
+        self.stopping = False
+        self.threads = [
+            threading.Thread(target=self._work, daemon=True)
+            for _ in range(max(1, workers))
+        ]
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.stopping = True
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            if thread.is_alive():
+                thread.join(timeout=5.0)
+
+    def submit(self, renderer):
+        with self.lock:
+            if renderer in self.queued:
+                return
+            self.queued.add(renderer)
+            if renderer in self.running:
+                return
+        self.queue.put(renderer)
+
+    def _work(self):
+        while True:
+            renderer = self.queue.get()
+            if renderer is None:
+                return
+            with self.lock:
+                self.queued.discard(renderer)
+                self.running.add(renderer)
+            try:
+                if not self.stopping:
+                    renderer.run_once()
+            except Exception as exc:
+                print(
+                    "Background render failed: "
+                    f"{type(exc).__name__}: {exc}",
+                    flush=True,
+                )
+            finally:
+                with self.lock:
+                    self.running.discard(renderer)
+                    again = renderer in self.queued
+                if again:
+                    self.queue.put(renderer)
+
+
+def _serve_graph_request(request, event_handler, page, query):
+    """Answer a GET for ``page`` of one graph's preview.
+
+    ``page`` is the request path below the graph's ``url_prefix``:
+    ``graph.svg``, ``graph.svg.patch``, ``events`` or the HTML page (``""``
+    or ``index.html``).
+    """
+    svg_url = f"{event_handler.url_prefix}graph.svg"
+    push = event_handler.push
+    html_kwargs = {}
+    if push is not None:
+        html_kwargs = {
+            "events_url": f"{event_handler.url_prefix}events",
+            "version": push.version,
+        }
+    if page == "events" and push is not None:
+        push.serve(request, query)
+        return
+    if page == "graph.svg":
+        event_handler.delivery.send(
+            request, event_handler.svg_file.read_bytes()
+        )
+        return
+    if page == "graph.svg.patch":
+        params = urllib.parse.parse_qs(query)
+        event_handler.delivery.send_patch(
+            request,
+            event_handler.svg_file.read_bytes(),
+            params.get("since", [""])[-1],
+        )
+        return
+
+    if page != "" and page != "index.html":
+        request.send_error(404)
+        return
+
+    # Parse query args so GET requests control graph mode.
+    params = urllib.parse.parse_qs(query, keep_blank_values=True)
+    (
+        order_by_date,
+        target_task,
+        filter_completed,
+    ) = _watch_view_state_from_params(params)
+
+    if (
+        order_by_date != event_handler.state["order_by_date"]
+        or target_task != event_handler.state["target_task"]
+        or filter_completed != event_handler.state["filter_completed"]
+    ):
+        event_handler.state["order_by_date"] = order_by_date
+        event_handler.state["target_task"] = target_task
+        event_handler.state["filter_completed"] = filter_completed
+        renderer = event_handler.renderer
+        view = _view_of(event_handler.state)
+        if renderer is not None and renderer.show(view):
+            # Answer from the latest pre-rendered SVG; the renderer pushes a
+            # fresher one if this is stale.
+            _send_watch_page(request, event_handler, svg_url, html_kwargs)
+            return
+        build_kwargs = event_handler.build_kwargs(view)
+        if event_handler.resolve_due_date_conflict is not None:
+            build_kwargs["resolve_due_date_conflict"] = (
+                event_handler.resolve_due_date_conflict
+            )
+        if event_handler.resolve_due_date_conflicts is not None:
+            build_kwargs["resolve_due_date_conflicts"] = (
+                event_handler.resolve_due_date_conflicts
+            )
+        event_handler.data = build_graph(
+            event_handler.yaml_file,
+            event_handler.dot_file,
+            event_handler.svg_file,
+            event_handler.wrap_width,
+            event_handler.state["order_by_date"],
+            event_handler.data,
+            event_handler.state["target_task"],
+            **build_kwargs,
+        )
+        event_handler.remember_yaml()
+        if renderer is not None:
+            renderer.record(view, event_handler.svg_file.read_bytes())
+
+    _send_watch_page(request, event_handler, svg_url, html_kwargs)
+
+
+def _send_watch_page(request, event_handler, svg_url, html_kwargs):
+    if html_kwargs:
+        # The page asks for patches against the SVG it is about to embed.
+        try:
+            svg_bytes = event_handler.svg_file.read_bytes()
+        except FileNotFoundError:
+            pass
+        else:
+            html_kwargs = dict(
+                html_kwargs, etag=event_handler.delivery.etag(svg_bytes)
+            )
+    body = _watch_html(
+        svg_url,
+        event_handler.state["order_by_date"],
+        event_handler.state["target_task"],
+        event_handler.state["filter_completed"],
+        event_handler.url_prefix,
+        **html_kwargs,
+    )
+    body_bytes = body.encode("utf-8")
+    _send_preview_response(
+        request,
+        body_bytes,
+        "text/html; charset=utf-8",
+    )
 
 
 class FlowchartPreviewServer:
@@ -746,76 +1862,21 @@ class FlowchartPreviewServer:
         self.base_url = None
         self.svg_url = None
 
+    def route(self, request, parsed):
+        """Answer the GET ``request`` for the parsed URL."""
+        _serve_graph_request(
+            request,
+            self.event_handler,
+            parsed.path[1:],
+            parsed.query,
+        )
+
     def start(self):
-        event_handler = self.event_handler
+        server = self
 
         class Handler(http.server.BaseHTTPRequestHandler):
             def do_GET(self):
-                parsed = urllib.parse.urlparse(self.path)
-                if parsed.path == "/graph.svg":
-                    svg_bytes = event_handler.svg_file.read_bytes()
-                    _send_preview_response(
-                        self,
-                        svg_bytes,
-                        "image/svg+xml; charset=utf-8",
-                    )
-                    return
-
-                if parsed.path != "/" and parsed.path != "/index.html":
-                    self.send_error(404)
-                    return
-
-                # Parse query args so GET requests control graph mode.
-                params = urllib.parse.parse_qs(
-                    parsed.query, keep_blank_values=True
-                )
-                (
-                    order_by_date,
-                    target_task,
-                    filter_completed,
-                ) = _watch_view_state_from_params(params)
-
-                if (
-                    order_by_date != event_handler.state["order_by_date"]
-                    or target_task != event_handler.state["target_task"]
-                    or filter_completed
-                    != event_handler.state["filter_completed"]
-                ):
-                    event_handler.state["order_by_date"] = order_by_date
-                    event_handler.state["target_task"] = target_task
-                    event_handler.state["filter_completed"] = (
-                        filter_completed
-                    )
-                    build_kwargs = {}
-                    if event_handler.resolve_due_date_conflict is not None:
-                        build_kwargs["resolve_due_date_conflict"] = (
-                            event_handler.resolve_due_date_conflict
-                        )
-                    if event_handler.state["filter_completed"]:
-                        build_kwargs["filter_completed"] = True
-                    event_handler.data = build_graph(
-                        event_handler.yaml_file,
-                        event_handler.dot_file,
-                        event_handler.svg_file,
-                        event_handler.wrap_width,
-                        event_handler.state["order_by_date"],
-                        event_handler.data,
-                        event_handler.state["target_task"],
-                        **build_kwargs,
-                    )
-
-                body = _watch_html(
-                    "/graph.svg",
-                    event_handler.state["order_by_date"],
-                    event_handler.state["target_task"],
-                    event_handler.state["filter_completed"],
-                )
-                body_bytes = body.encode("utf-8")
-                _send_preview_response(
-                    self,
-                    body_bytes,
-                    "text/html; charset=utf-8",
-                )
+                server.route(self, urllib.parse.urlparse(self.path))
 
             def log_message(self, format, *args):
                 return
@@ -838,7 +1899,17 @@ class FlowchartPreviewServer:
         # compatibility with the watcher loop call site.
         return
 
+    def pushes(self):
+        """The event streams open pages may be listening to."""
+        if self.event_handler is None or self.event_handler.push is None:
+            return []
+        return [self.event_handler.push]
+
     def stop(self):
+        # End the event streams first; their handler threads would
+        # otherwise keep waiting for the next version.
+        for push in self.pushes():
+            push.close()
         if self.httpd is not None:
             self.httpd.shutdown()
             self.httpd.server_close()
@@ -846,19 +1917,189 @@ class FlowchartPreviewServer:
             self.server_thread.join(timeout=1.0)
 
 
+def _graph_slugs(yaml_files):
+    """URL path segments for ``yaml_files``, unique and in the same order."""
+    slugs = []
+    for yaml_file in yaml_files:
+        base = re.sub(r"[^A-Za-z0-9_.-]+", "-", Path(yaml_file).stem)
+        base = base.strip("-.") or "graph"
+        slug = base
+        suffix = 2
+        while slug in slugs:
+            slug = f"{base}-{suffix}"
+            suffix += 1
+        slugs.append(slug)
+    return slugs
+
+
+def _graph_index_html(event_handlers):
+    items = "".join(
+        f"<li><a href='{handler.url_prefix}'>"
+        f"{html.escape(handler.yaml_file.name)}</a></li>"
+        for handler in event_handlers.values()
+    )
+    return (
+        "<html><body style='font-family:sans-serif;'>"
+        f"<ul>{items}</ul>"
+        "<script>new EventSource('/events');</script>"
+        "</body></html>"
+    )
+
+
+class MultiGraphPreviewServer(FlowchartPreviewServer):
+    """Serve several graphs from one port.
+
+    ``event_handlers`` maps a URL slug to the :class:`GraphEventHandler` of
+    one graph, whose pages live under ``/<slug>/``; ``/`` lists them.
+    """
+
+    def __init__(self, event_handlers, host="127.0.0.1"):
+        super().__init__(None, host)
+        self.event_handlers = event_handlers
+        # Lets the index page count as an open window too.
+        self.push = PreviewPush()
+
+    def pushes(self):
+        return [self.push] + [
+            event_handler.push
+            for event_handler in self.event_handlers.values()
+            if event_handler.push is not None
+        ]
+
+    def route(self, request, parsed):
+        if parsed.path == "/events":
+            self.push.serve(request, parsed.query)
+            return
+        if parsed.path in ("/", "/index.html"):
+            body = _graph_index_html(self.event_handlers)
+            _send_preview_response(
+                request, body.encode("utf-8"), "text/html; charset=utf-8"
+            )
+            return
+        slug, _, page = parsed.path[1:].partition("/")
+        event_handler = self.event_handlers.get(urllib.parse.unquote(slug))
+        if event_handler is None:
+            request.send_error(404)
+            return
+        _serve_graph_request(request, event_handler, page, parsed.query)
+
+    def graph_url(self, slug, page=""):
+        return f"{self.base_url}{urllib.parse.quote(slug)}/{page}"
+
+
+class _GraphDispatcher(FileSystemEventHandler):
+    """Pass one directory's file events to every graph watched in it."""
+
+    def __init__(self, event_handlers):
+        self.event_handlers = list(event_handlers)
+
+    def on_modified(self, event):
+        for event_handler in self.event_handlers:
+            event_handler.handle(event.src_path)
+
+    def on_created(self, event):
+        for event_handler in self.event_handlers:
+            event_handler.handle(event.src_path)
+
+    def on_moved(self, event):
+        for event_handler in self.event_handlers:
+            event_handler.handle(event.dest_path)
+
+
+def _schedule_graphs(observer, event_handlers):
+    """Watch the directories of all graphs with one handler per directory."""
+    by_directory = OrderedDict()
+    for event_handler in event_handlers:
+        directory = event_handler.yaml_file.parent
+        by_directory.setdefault(directory, []).append(event_handler)
+    for directory, handlers in by_directory.items():
+        observer.schedule(
+            _GraphDispatcher(handlers), directory, recursive=False
+        )
+    return by_directory
+
+
+def _browser_is_alive(pushes, get_driver):
+    if any(push.ever_connected for push in pushes):
+        # A page reconnects its event stream right after navigating, so a
+        # short gap without listeners does not mean the window closed.
+        return any(push.connected(2 * PUSH_KEEPALIVE) for push in pushes)
+    # Until the first page has connected, ask the browser itself.
+    return browser_window_is_alive(get_driver())
+
+
+def _run_until_browser_closed(preview_server, get_driver, pushes=()):
+    dead_since = None
+    dead_reason = None
+    try:
+        while True:
+            preview_server.serve_pending_request()
+            # Exit the watcher when the browser window is really closed, but
+            # tolerate short liveness gaps during top-level navigation (for
+            # example when opening /?t=... from the links).
+            if _browser_is_alive(pushes, get_driver):
+                dead_since = None
+                dead_reason = None
+            else:
+                if dead_since is None:
+                    dead_since = time.time()
+                    dead_reason = (
+                        "no preview page is connected; likely user closed"
+                        " the window or the browser crashed."
+                    )
+                    if not any(push.ever_connected for push in pushes):
+                        dead_reason = (
+                            "browser_window_is_alive returned False; likely"
+                            " user closed the window or the browser crashed."
+                        )
+                elif time.time() - dead_since >= 1.0:
+                    print(
+                        "Stopping flowchart preview because the browser "
+                        f"window appears closed. Reason: {dead_reason}",
+                        flush=True,
+                    )
+                    break
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        print(
+            "Stopping flowchart preview due to KeyboardInterrupt.",
+            flush=True,
+        )
+        pass
+
+
 @register_command(
     "Watch a flowchart YAML file, rebuild DOT/SVG output, and open the"
     " preview",
     help={
-        "yaml": "Path to the flowchart YAML file",
+        "yaml": (
+            "Path to the flowchart YAML file, or to a directory to preview"
+            " every YAML file in it from one window"
+        ),
         "wrap_width": "Line wrap width used when generating node labels",
         "d": "Render nodes by date without showing connections",
         "t": "Task name to focus on (show incomplete ancestor tasks only)",
         "p": "Render the full plan with completed tasks filtered out",
+        "stable_layout": (
+            "Keep unchanged nodes where they were on each rebuild and only"
+            " place new or edited ones (uses neato)"
+        ),
+        "lod": (
+            "Show each endpoint project as one summary node; click a project"
+            " to open its tasks"
+        ),
     },
     filename_extensions={"yaml": (".yaml", ".yml")},
 )
-def wgrph(yaml, wrap_width=55, d=False, t=None, p=False):
+def wgrph(
+    yaml,
+    wrap_width=55,
+    d=False,
+    t=None,
+    p=False,
+    stable_layout=False,
+    lod=False,
+):
     # Selenium is only required when actually launching the watcher, so it is
     # imported here to avoid breaking the command-line tools when the optional
     # dependency is not installed.
@@ -874,6 +2115,28 @@ def wgrph(yaml, wrap_width=55, d=False, t=None, p=False):
     yaml_file = Path(yaml)
     if not yaml_file.exists():
         raise FileNotFoundError(f"YAML file not found: {yaml_file}")
+    if yaml_file.is_dir():
+        if d or p or (t is not None and str(t).strip()):
+            raise ValueError(
+                "-d, -p and -t pick the view of a single graph; open the"
+                " graph from the index page instead"
+            )
+        yaml_files = sorted(
+            path
+            for pattern in ("*.yaml", "*.yml")
+            for path in yaml_file.glob(pattern)
+        )
+        if not yaml_files:
+            raise FileNotFoundError(f"No YAML files found in {yaml_file}")
+        watch_graphs(
+            yaml_files,
+            wrap_width=wrap_width,
+            stable_layout=stable_layout,
+            lod=lod,
+            webdriver=webdriver,
+            options=Options(),
+        )
+        return
 
     dot_file = yaml_file.with_suffix(".dot")
     svg_file = yaml_file.with_suffix(".svg")
@@ -886,6 +2149,12 @@ def wgrph(yaml, wrap_width=55, d=False, t=None, p=False):
         "filter_completed": False,
     }
 
+    # One SVG cache serves every view, so flipping between the overview, the
+    # date view and task filters only runs Graphviz for views not seen yet.
+    svg_cache = SvgRenderCache()
+    # Task names and ancestor sets, kept current for ?t= views and saved for
+    # the shell's -t completion.
+    task_index = TaskIndex()
     # Build the default dependency graph first. Optional -t / -d args are then
     # applied by requesting server URLs with query parameters.
     data = build_graph(
@@ -896,7 +2165,10 @@ def wgrph(yaml, wrap_width=55, d=False, t=None, p=False):
         initial_state["order_by_date"],
         None,
         initial_state["target_task"],
-        resolve_due_date_conflict=_resolve_due_date_conflict_with_qt,
+        svg_cache=svg_cache,
+        resolve_due_date_conflicts=_resolve_due_date_conflicts_with_qt,
+        level_of_detail=lod,
+        task_index=task_index,
     )
 
     options = Options()
@@ -912,8 +2184,23 @@ def wgrph(yaml, wrap_width=55, d=False, t=None, p=False):
         wrap_width,
         data,
         initial_state,
-        _resolve_due_date_conflict_with_qt,
+        svg_cache=svg_cache,
+        incremental_dot=True,
+        stable_layout=stable_layout,
+        resolve_due_date_conflicts=_resolve_due_date_conflicts_with_qt,
+        level_of_detail=lod,
+        task_index=task_index,
     )
+    # The initial build may have normalised the YAML; that save is ours.
+    event_handler.remember_yaml()
+    # Keep the other views rendered in the background so switching between
+    # them answers at once instead of waiting for Graphviz.
+    # The preview page reloads the SVG when told to over an event stream.
+    event_handler.push = PreviewPush()
+    renderer = BackgroundRenderer(event_handler)
+    event_handler.renderer = renderer
+    renderer.start()
+    renderer.invalidate()
     preview_server = FlowchartPreviewServer(event_handler)
     preview_server.start()
     event_handler.preview_url = preview_server.base_url
@@ -936,40 +2223,117 @@ def wgrph(yaml, wrap_width=55, d=False, t=None, p=False):
     observer = Observer()
     observer.schedule(event_handler, yaml_file.parent, recursive=False)
     observer.start()
-    dead_since = None
-    dead_reason = None
     try:
-        while True:
-            preview_server.serve_pending_request()
-            # Exit the watcher when the browser window is really closed, but
-            # tolerate short Selenium liveness errors during top-level
-            # navigation (for example when opening /?t=... from the links).
-            if browser_window_is_alive(event_handler.driver):
-                dead_since = None
-                dead_reason = None
-            else:
-                if dead_since is None:
-                    dead_since = time.time()
-                    dead_reason = (
-                        "browser_window_is_alive returned False; likely user "
-                        "closed the window or the browser crashed."
-                    )
-                elif time.time() - dead_since >= 1.0:
-                    print(
-                        "Stopping flowchart preview because the browser "
-                        f"window appears closed. Reason: {dead_reason}",
-                        flush=True,
-                    )
-                    break
-            time.sleep(0.1)
-    except KeyboardInterrupt:
-        print(
-            "Stopping flowchart preview due to KeyboardInterrupt.",
-            flush=True,
+        _run_until_browser_closed(
+            preview_server,
+            lambda: event_handler.driver,
+            [event_handler.push],
         )
-        pass
     finally:
         observer.stop()
         observer.join()
         close_chrome(event_handler.driver)
+        renderer.stop()
+        preview_server.stop()
+
+
+def watch_graphs(
+    yaml_files,
+    wrap_width=55,
+    stable_layout=False,
+    lod=False,
+    webdriver=None,
+    options=None,
+):
+    """Preview several flowchart YAML files from one server and browser.
+
+    Each graph keeps its own state, SVG cache and DOT/SVG files next to its
+    YAML and is served under ``/<slug>/``; one file watcher and one
+    :class:`RenderPool` are shared by all of them.
+    """
+    initial = []
+    for yaml_file, slug in zip(yaml_files, _graph_slugs(yaml_files)):
+        yaml_file = Path(yaml_file)
+        dot_file = yaml_file.with_suffix(".dot")
+        svg_file = yaml_file.with_suffix(".svg")
+        url_prefix = f"/{urllib.parse.quote(slug)}/"
+        svg_cache = SvgRenderCache(
+            max_bytes=SVG_CACHE_BYTES // len(yaml_files)
+        )
+        task_index = TaskIndex()
+        try:
+            data = build_graph(
+                yaml_file,
+                dot_file,
+                svg_file,
+                wrap_width,
+                svg_cache=svg_cache,
+                resolve_due_date_conflicts=_resolve_due_date_conflicts_with_qt,
+                level_of_detail=lod,
+                url_prefix=url_prefix,
+                task_index=task_index,
+            )
+        except Exception as exc:
+            print(
+                f"Skipping {yaml_file}: {type(exc).__name__}: {exc}",
+                flush=True,
+            )
+            continue
+        event_handler = GraphEventHandler(
+            yaml_file,
+            dot_file,
+            svg_file,
+            options=options,
+            webdriver=webdriver,
+            wrap_width=wrap_width,
+            data=data,
+            svg_cache=svg_cache,
+            incremental_dot=True,
+            stable_layout=stable_layout,
+            resolve_due_date_conflicts=_resolve_due_date_conflicts_with_qt,
+            level_of_detail=lod,
+            url_prefix=url_prefix,
+            task_index=task_index,
+        )
+        event_handler.remember_yaml()
+        initial.append((slug, event_handler))
+    if not initial:
+        raise RuntimeError("None of the flowchart YAML files could be built")
+    event_handlers = OrderedDict(initial)
+
+    pool = RenderPool()
+    pool.start()
+    renderers = []
+    for event_handler in event_handlers.values():
+        event_handler.push = PreviewPush()
+        renderer = BackgroundRenderer(event_handler, pool=pool)
+        event_handler.renderer = renderer
+        renderers.append(renderer)
+        renderer.invalidate()
+    preview_server = MultiGraphPreviewServer(event_handlers)
+    preview_server.start()
+    for slug, event_handler in event_handlers.items():
+        event_handler.preview_url = preview_server.graph_url(slug)
+        event_handler.svg_url = preview_server.graph_url(slug, "graph.svg")
+
+    driver = None
+    if webdriver is not None:
+        driver = start_chrome(webdriver, options, preview_server.base_url)
+    for event_handler in event_handlers.values():
+        event_handler.driver = driver
+
+    observer = Observer()
+    _schedule_graphs(observer, event_handlers.values())
+    observer.start()
+    try:
+        _run_until_browser_closed(
+            preview_server, lambda: driver, preview_server.pushes()
+        )
+    finally:
+        observer.stop()
+        observer.join()
+        close_chrome(driver)
+        pool.stop()
+        for renderer in renderers:
+            renderer.stop()
         preview_server.stop()
@@ -3,11 +3,13 @@
 
 import argparse
 import hashlib
+import html as html_lib
 import inspect
 import json
 import os
 import re
 import subprocess
+import tempfile
 import time
 import traceback
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -18,6 +20,7 @@ import shutil
 import socket
 import yaml
 from pydifftools.command_registry import register_command
+from pydifftools.notebook.nbworker import pool_from_spec
 from pydifftools.browser_lifecycle import (
     browser_window_is_alive,
     close_browser_window,
@@ -48,16 +51,89 @@ CODE_DISPLAY_MODES = {
 }
 NB_CAPTURE_IMPORT = "from pydifftools.notebook.display import nb_capture"
 NB_CAPTURE_INJECTION_VERSION = "nb_capture_auto_import_v1"
+# {{{ changeable parameters for notebook stream output: a cell that prints
+#     more than the head plus tail line budget (or a line longer than the
+#     character budget) is shown truncated, with a link to the full log
+STREAM_HEAD_LINES = 200
+STREAM_TAIL_LINES = 100
+STREAM_MAX_LINE_CHARS = 2000
+# ansi2html works on one string at a time, so large outputs are converted in
+# chunks of this many lines
+ANSI_CHUNK_LINES = 1000
+# }}}
 
 
 def _ansi_to_html(text: str, *, default_style: str | None = None) -> str:
     """Return HTML for text that may contain ANSI escape codes."""
-    html = _ansi_conv.convert(text, full=False)
+    lines = text.splitlines(keepends=True)
+    chunks = []
+    carried = ""
+    for start in range(0, max(len(lines), 1), ANSI_CHUNK_LINES):
+        chunk = "".join(lines[start : start + ANSI_CHUNK_LINES])
+        # colors set in an earlier chunk are re-applied so each chunk can be
+        # converted on its own
+        chunks.append(_ansi_conv.convert(carried + chunk, full=False))
+        for code in re.findall(r"\x1b\[[0-9;]*m", chunk):
+            if code in ("\x1b[0m", "\x1b[m"):
+                carried = ""
+            else:
+                carried += code
+    html = "".join(chunks)
     if default_style and "span class" not in html:
         html = f'<span style="{default_style}">{html}</span>'
     return f"<pre>{html}</pre>"
 
 
+def _stream_to_html(text) -> str:
+    """Return HTML for a stream output, bounded by the output budget.
+
+    Long logs keep their first and last lines on the page; the complete log
+    is written to ``assets/logs`` in the display tree and linked instead.
+    """
+    text = _mime_text(text).replace("\r\n", "\n")
+    if "\r" in text:
+        # progress bars redraw a line with carriage returns; only the final
+        # state of each line is worth keeping
+        text = "\n".join(
+            line.rstrip("\r").rsplit("\r", 1)[-1] for line in text.split("\n")
+        )
+    lines = text.splitlines()
+    truncated = False
+    shown = []
+    for line in lines:
+        if len(line) > STREAM_MAX_LINE_CHARS:
+            extra = len(line) - STREAM_MAX_LINE_CHARS
+            line = (
+                line[:STREAM_MAX_LINE_CHARS]
+                + f"\x1b[0m ... [{extra} more characters]"
+            )
+            truncated = True
+        shown.append(line)
+    if len(shown) > STREAM_HEAD_LINES + STREAM_TAIL_LINES:
+        omitted = len(shown) - STREAM_HEAD_LINES - STREAM_TAIL_LINES
+        tail = shown[len(shown) - STREAM_TAIL_LINES :]
+        shown = (
+            shown[:STREAM_HEAD_LINES]
+            + [f"\x1b[0m... {omitted} lines omitted ..."]
+            + tail
+        )
+        truncated = True
+    if not truncated:
+        return _ansi_to_html(text)
+    digest = hashlib.md5(text.encode("utf-8")).hexdigest()
+    log_rel = Path("assets") / "logs" / f"{digest}.log"
+    log_path = DISPLAY_DIR / log_rel
+    if not log_path.exists():
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        log_path.write_text(text)
+    return (
+        _ansi_to_html("\n".join(shown) + "\n")
+        + '<div class="pydifft-log-link">'
+        + f'<a href="/{log_rel.as_posix()}">full output'
+        + f" ({len(lines)} lines)</a></div>"
+    )
+
+
 def _mime_text(value) -> str:
     """Normalize a Jupyter MIME payload to text."""
     if isinstance(value, list):
@@ -657,8 +733,7 @@ def outputs_to_html(
     for out in outputs:
         typ = out.get("output_type")
         if typ == "stream":
-            text = out.get("text", "")
-            parts.append(_ansi_to_html(text))
+            parts.append(_stream_to_html(out.get("text", "")))
         elif typ in {"display_data", "execute_result"}:
             data = out.get("data", {})
             if "text/html" in data:
@@ -691,13 +766,117 @@ def outputs_to_html(
 NOTEBOOK_CACHE_DIR = Path("_nbcache")
 
 
+def _notebook_groups(cells):
+    """Split ``(code, md5, noexec)`` cells into the notebooks that run them.
+
+    Returns ``(indices, codes, md5s)`` per notebook, with 1-based cell
+    indices; ``%noexec`` cells are left out.
+    """
+    groups = []
+    current_codes = []
+    current_md5s = []
+    current_indices = []
+    for idx, (code, md5, noexec) in enumerate(cells, start=1):
+        if noexec:
+            continue
+        stripped = code.lstrip()
+        # Split execution into separate notebooks whenever a cell begins
+        # with ``%reset -f`` so that changing code after a reset only reruns
+        # the affected portion instead of the entire file.
+        if current_codes and stripped.startswith("%reset -f"):
+            groups.append((current_indices, current_codes, current_md5s))
+            current_codes = []
+            current_md5s = []
+            current_indices = []
+        current_codes.append(code)
+        current_md5s.append(md5)
+        current_indices.append(idx)
+    if current_codes:
+        groups.append((current_indices, current_codes, current_md5s))
+    return groups
+
+
+def _notebook_cache_name(src, group_md5s):
+    hash_input = (
+        src
+        + ":"
+        + NB_CAPTURE_INJECTION_VERSION
+        + ":"
+        + NB_CAPTURE_IMPORT
+        + ":"
+        + "".join(group_md5s)
+    ).encode()
+    return hashlib.md5(hash_input).hexdigest() + ".ipynb"
+
+
+def _count_cell_errors(nb):
+    errors = 0
+    for cell in nb.cells:
+        for out in cell.get("outputs", []):
+            if out.get("output_type") == "error":
+                errors += 1
+    return errors
+
+
+def cached_cell_errors(sources, skip=()):
+    """Count error outputs in the cached notebooks that ``sources`` use.
+
+    Every code block of each source file is grouped the way
+    :func:`execute_code_blocks` groups it, and the cached notebook of each
+    group is read if it exists; notebooks named in ``skip`` are left out.
+    """
+    cache_dir = NOTEBOOK_CACHE_DIR
+    if not cache_dir.is_absolute():
+        cache_dir = PROJECT_ROOT / cache_dir
+    errors = 0
+    for src in sources:
+        src_path = Path(src)
+        if not src_path.is_absolute():
+            src_path = PROJECT_ROOT / src_path
+        if not src_path.exists():
+            continue
+        cells = []
+        for match in code_pattern.finditer(src_path.read_text()):
+            code = match.group(1)
+            first = next((ln for ln in code.splitlines() if ln.strip()), "")
+            cells.append(
+                (
+                    code,
+                    hashlib.md5(code.encode()).hexdigest(),
+                    first.lstrip().startswith("%noexec"),
+                )
+            )
+        for _, _, group_md5s in _notebook_groups(cells):
+            name = _notebook_cache_name(str(src), group_md5s)
+            nb_path = cache_dir / name
+            if name in skip or not nb_path.exists():
+                continue
+            errors += _count_cell_errors(
+                nbformat.read(nb_path, as_version=4)
+            )
+    return errors
+
+
 def execute_code_blocks(
     blocks,
     bibliography=None,
     csl=None,
     webtex: bool = False,
+    max_workers=None,
+    manifest=None,
+    executor=None,
 ):
-    """Run code blocks as Jupyter notebooks with caching."""
+    """Run code blocks as Jupyter notebooks with caching.
+
+    When ``manifest`` is a dict, one entry per executed notebook group is
+    appended to ``manifest["notebooks"]`` recording whether it came from the
+    cache, how long it took and how many cells raised errors.
+
+    Cache misses run in local kernels unless ``executor`` is given, in which
+    case they are handed to its ``execute`` method (see
+    :mod:`pydifftools.notebook.nbworker`) and run concurrently on all of its
+    workers.
+    """
     cache_dir = NOTEBOOK_CACHE_DIR
     if not cache_dir.is_absolute():
         cache_dir = PROJECT_ROOT / cache_dir
@@ -712,14 +891,8 @@ def execute_code_blocks(
             continue
         cells = [(*cell, False) if len(cell) == 2 else cell for cell in cells]
         codes = [c for c, _, _ in cells]
-        md5s = [m for _, m, _ in cells]
-        skip_flags = [flag for _, _, flag in cells]
-        groups = []
-        current_codes = []
-        current_md5s = []
-        current_indices = []
-        for idx, code in enumerate(codes, start=1):
-            if skip_flags[idx - 1]:
+        for idx, (code, _, noexec) in enumerate(cells, start=1):
+            if noexec:
                 # Mark %noexec cells as completed immediately so they never
                 # reach notebook execution, but still render highlighted code
                 # with an explicit skipped notice in the final HTML.
@@ -729,23 +902,7 @@ def execute_code_blocks(
                     "</div>"
                 )
                 code_map[(src, idx)] = code
-                continue
-            stripped = code.lstrip()
-            # Split execution into separate notebooks whenever a cell
-            # begins with ``%reset -f`` so that changing code after a
-            # reset only reruns the affected portion instead of the entire
-            # file.
-            if current_codes and stripped.startswith("%reset -f"):
-                groups.append((current_indices, current_codes, current_md5s))
-                current_codes = []
-                current_md5s = []
-                current_indices = []
-            current_codes.append(code)
-            current_md5s.append(md5s[idx - 1])
-            current_indices.append(idx)
-        if current_codes:
-            groups.append((current_indices, current_codes, current_md5s))
-
+        groups = _notebook_groups(cells)
         total_groups = len(groups)
         for group_idx, data in enumerate(groups, start=1):
             jobs.append((src, total_groups, group_idx, data, codes))
@@ -753,18 +910,10 @@ def execute_code_blocks(
     def run_job(job):
         src, total_groups, group_idx, group_data, codes = job
         group_indices, group_codes, group_md5s = group_data
-        hash_input = (
-            src
-            + ":"
-            + NB_CAPTURE_INJECTION_VERSION
-            + ":"
-            + NB_CAPTURE_IMPORT
-            + ":"
-            + "".join(group_md5s)
-        ).encode()
-        nb_hash = hashlib.md5(hash_input).hexdigest()
-        nb_path = cache_dir / f"{nb_hash}.ipynb"
-        if nb_path.exists():
+        nb_path = cache_dir / _notebook_cache_name(src, group_md5s)
+        start = time.time()
+        cached = nb_path.exists()
+        if cached:
             print(f"Reading cached output for {src} from {nb_path}!")
             nb = nbformat.read(nb_path, as_version=4)
         else:
@@ -773,53 +922,40 @@ def execute_code_blocks(
                 f"Generating notebook ({group_idx}/{total_groups}) "
                 f"for {src} at {nb_path}:"
             )
-            nb = nbformat.v4.new_notebook()
-            nb.cells = [
-                nbformat.v4.new_code_cell(_inject_nb_capture_import(c))
-                for c in group_codes
-            ]
-            ep = LoggingExecutePreprocessor(
-                kernel_name="python3", timeout=10800, allow_errors=True
-            )
-            try:
-                ep.preprocess(
-                    nb,
-                    {
-                        "metadata": {
-                            "path": str((PROJECT_ROOT / src).parent),
-                            "source": src,
-                            "notebook_index": group_idx,
-                            "notebook_total": total_groups,
-                        }
-                    },
+            if executor is None:
+                nb = execute_notebook_group(
+                    src, group_codes, group_idx, total_groups
                 )
-            except Exception as e:
-                tb = traceback.format_exc()
-                if nb.cells:
-                    nb.cells[0].outputs = [
-                        nbformat.v4.new_output(
-                            output_type="error",
-                            ename=type(e).__name__,
-                            evalue=str(e),
-                            traceback=tb.splitlines(),
-                        )
-                    ]
-                    for cell in nb.cells[1:]:
-                        cell.outputs = [
-                            nbformat.v4.new_output(
-                                output_type="stream",
-                                name="stderr",
-                                text="previous cell failed to execute\n",
-                            )
-                        ]
+            else:
+                nb = executor.execute(
+                    src, group_codes, group_idx, total_groups
+                )
+            # Each result lands in the cache as soon as it arrives, so a
+            # restarted build picks up whatever the workers already finished.
             nbformat.write(nb, nb_path)
 
+        if manifest is not None:
+            errors = _count_cell_errors(nb)
+            manifest.setdefault("notebooks", []).append(
+                {
+                    "source": src,
+                    "group": group_idx,
+                    "notebook": nb_path.name,
+                    "cached": cached,
+                    "seconds": round(time.time() - start, 3),
+                    "cell_errors": errors,
+                }
+            )
         return src, group_indices, nb, codes
 
     # Execute notebook chunks concurrently so long-running groups do not block.
     if jobs:
-        max_workers = max(1, min(len(jobs), 4))
-        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        if executor is not None:
+            max_workers = executor.max_workers
+        elif max_workers is None:
+            max_workers = 4
+        workers = max(1, min(len(jobs), max_workers))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
             futures = [pool.submit(run_job, job) for job in jobs]
             for future in as_completed(futures):
                 src, group_indices, nb, codes = future.result()
@@ -838,23 +974,83 @@ def execute_code_blocks(
     return outputs, code_map
 
 
+def execute_notebook_group(
+    src, codes, group_idx, total_groups, project_root=None
+):
+    """Execute one notebook group for ``src`` in a local kernel.
+
+    Exceptions raised while running the kernel are turned into error outputs
+    so callers always get a notebook back.
+    """
+    if project_root is None:
+        project_root = PROJECT_ROOT
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_code_cell(_inject_nb_capture_import(c)) for c in codes
+    ]
+    ep = LoggingExecutePreprocessor(
+        kernel_name="python3", timeout=10800, allow_errors=True
+    )
+    try:
+        ep.preprocess(
+            nb,
+            {
+                "metadata": {
+                    "path": str((Path(project_root) / src).parent),
+                    "source": src,
+                    "notebook_index": group_idx,
+                    "notebook_total": total_groups,
+                }
+            },
+        )
+    except Exception as e:
+        tb = traceback.format_exc()
+        if nb.cells:
+            nb.cells[0].outputs = [
+                nbformat.v4.new_output(
+                    output_type="error",
+                    ename=type(e).__name__,
+                    evalue=str(e),
+                    traceback=tb.splitlines(),
+                )
+            ]
+            for cell in nb.cells[1:]:
+                cell.outputs = [
+                    nbformat.v4.new_output(
+                        output_type="stream",
+                        name="stderr",
+                        text="previous cell failed to execute\n",
+                    )
+                ]
+    return nb
+
+
 def _execute_code_blocks_for_build(
-    blocks, bibliography=None, csl=None, webtex=False
+    blocks, bibliography=None, csl=None, webtex=False, **extra
 ):
-    """Call the active notebook executor with context when it supports it."""
+    """Call the active notebook executor with context when it supports it.
+
+    ``extra`` keyword arguments (worker counts, the build manifest) are only
+    forwarded when they are set and the executor accepts them.
+    """
     params = inspect.signature(execute_code_blocks).parameters
     accepts_kwargs = any(
         param.kind == inspect.Parameter.VAR_KEYWORD
         for param in params.values()
     )
+    kwargs = {}
+    for name, value in extra.items():
+        if value is not None and (accepts_kwargs or name in params):
+            kwargs[name] = value
     if accepts_kwargs or "bibliography" in params:
         return execute_code_blocks(
             blocks,
             bibliography=bibliography,
             csl=csl,
             webtex=webtex,
+            **kwargs,
         )
-    return execute_code_blocks(blocks)
+    return execute_code_blocks(blocks, **kwargs)
 
 
 def analyze_includes(render_files):
@@ -1210,6 +1406,21 @@ def qmdinit(path, force=False):
         "no_code": (
             "Hide notebook source code entirely and show only notebook output"
         ),
+        "split_sections": (
+            "Render each top-level section with its own pandoc call and reuse"
+            " the cached HTML of sections that did not change"
+        ),
+        "once": (
+            "Build everything on all cores without a browser, wait for the"
+            " notebooks, write _build/manifest.json and exit non-zero if any"
+            " cell errored or page is incomplete"
+        ),
+        "workers": (
+            "Run notebooks on worker processes instead of in-process kernels:"
+            " comma separated local[:N], tcp://host:port or"
+            " ssh://host/path/to/project entries (tcp workers need the"
+            " token from $PYDIFFTOOLS_WORKER_TOKEN)"
+        ),
     },
 )
 def qmdb(
@@ -1217,6 +1428,9 @@ def qmdb(
     webtex=False,
     always_code=False,
     no_code=False,
+    split_sections=False,
+    once=False,
+    workers=None,
 ):
     """Build and watch the current directory using the fast notebook
     builder."""
@@ -1230,11 +1444,28 @@ def qmdb(
         always_code=always_code,
         no_code=no_code,
     )
-    watch_and_serve(
-        no_browser=no_browser,
-        webtex=webtex,
-        code_display=code_display,
-    )
+    executor = None
+    if workers:
+        executor = pool_from_spec(workers, PROJECT_ROOT)
+    try:
+        if once:
+            build_once(
+                webtex=webtex,
+                code_display=code_display,
+                split_sections=split_sections,
+                executor=executor,
+            )
+        else:
+            watch_and_serve(
+                no_browser=no_browser,
+                webtex=webtex,
+                code_display=code_display,
+                split_sections=split_sections,
+                executor=executor,
+            )
+    finally:
+        if executor is not None:
+            executor.close()
 
 
 def resolve_code_display(
@@ -1426,8 +1657,13 @@ def render_file(
     bibliography=None,
     csl=None,
     webtex: bool = False,
+    split_sections: bool = False,
 ):
-    """Render ``src`` to ``dest`` using Pandoc with embedded resources."""
+    """Render ``src`` to ``dest`` using Pandoc with embedded resources.
+
+    With ``split_sections`` the page is rendered section by section through
+    :class:`SectionRenderer` so unchanged sections come from the cache.
+    """
 
     build_dir = Path(BUILD_DIR).resolve()
     staged_src = Path(src)
@@ -1487,15 +1723,354 @@ def render_file(
         flush=True,
     )
     start = time.time()
-    try:
-        subprocess.run(args, check=True, cwd=build_dir, capture_output=True)
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"{e.stderr}\nwhen trying to run:{' '.join(args)}")
+    reuse_note = ""
+    sections = None
+    if split_sections:
+        sections = SectionRenderer(build_dir, args)
+        if not sections.render(staged_src, output_path):
+            sections = None
+    if sections is None:
+        try:
+            subprocess.run(
+                args, check=True, cwd=build_dir, capture_output=True
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(
+                f"{e.stderr}\nwhen trying to run:{' '.join(args)}"
+            )
+    else:
+        reuse_note = (
+            f" (reused {sections.reused} of {sections.total} sections)"
+        )
     duration = time.time() - start
     print(
-        f"Finished pandoc on {src} in {duration:.1f}s",
+        f"Finished pandoc on {src} in {duration:.1f}s{reuse_note}",
         flush=True,
     )
+    return duration
+
+
+class SectionRenderer:
+    """Render a staged page one top-level section at a time.
+
+    Each section goes through pandoc on its own and the HTML is cached under
+    ``_build/_sections`` by a hash of the section text and the pandoc options,
+    so editing one section of a long notebook page only re-runs pandoc on
+    that section.  Because pandoc-crossref and citeproc only see one section
+    at a time, figure/table/equation numbers are renumbered over the
+    stitched page and citations are resolved in one extra citeproc pass.
+    """
+
+    placeholder = "<!-- pydifft-sections -->"
+    heading_re = re.compile(r"^(#{1,6})\s+\S")
+    fence_re = re.compile(r"^\s{0,3}(`{3,}|~{3,})")
+    # pandoc-crossref's default reference prefixes, used when a reference
+    # points into another section and was left unresolved
+    crossref_prefixes = {"fig": "fig.", "tbl": "tbl.", "eq": "eq."}
+
+    def __init__(self, build_dir: Path, args: list[str]):
+        self.build_dir = build_dir
+        self.args = args
+        self.cache_dir = build_dir / "_sections"
+        self.reused = 0
+        self.total = 0
+        # keys this render used, recorded per page so :meth:`prune` can drop
+        # section HTML that no page needs any more
+        self.used = []
+        # everything except the input/output paths determines the HTML that
+        # pandoc produces, so it is part of every cache key
+        key_args = list(args)
+        key_args[1] = ""
+        key_args[key_args.index("-o") + 1] = ""
+        self.key_prefix = "\0".join(key_args)
+
+    def split(self, text: str) -> tuple[str, list[str]]:
+        """Return the front matter and the sections of ``text``.
+
+        Sections start at the shallowest ATX heading level used in the file;
+        anything before the first heading stays with the first section.
+        Headings inside fenced code are ignored.
+        """
+        lines = text.splitlines(keepends=True)
+        start = 0
+        if lines and lines[0].strip() == "---":
+            for idx in range(1, len(lines)):
+                if lines[idx].strip() in ("---", "..."):
+                    start = idx + 1
+                    break
+        headings = []
+        fence = None
+        for idx in range(start, len(lines)):
+            fence_match = self.fence_re.match(lines[idx])
+            if fence is not None:
+                if fence_match and fence_match.group(1).startswith(fence):
+                    fence = None
+                continue
+            if fence_match:
+                fence = fence_match.group(1)
+                continue
+            heading = self.heading_re.match(lines[idx])
+            if heading:
+                headings.append((idx, len(heading.group(1))))
+        front = "".join(lines[:start])
+        if not headings:
+            return front, ["".join(lines[start:])]
+        level = min(depth for _, depth in headings)
+        cuts = [idx for idx, depth in headings if depth == level]
+        cuts[0] = start
+        sections = []
+        for first, last in zip(cuts, cuts[1:] + [len(lines)]):
+            sections.append("".join(lines[first:last]))
+        return front, sections
+
+    def run_pandoc(
+        self,
+        text: str,
+        key: str,
+        template: Path,
+        citeproc: bool = False,
+    ) -> str:
+        """Render ``text`` with the page's pandoc options, cached by
+        ``key``."""
+        html_path = self.cache_dir / f"{key}.html"
+        self.used.append(key)
+        if html_path.exists():
+            return html_path.read_text()
+        # Pages render in parallel and can share keys (the same front matter
+        # gives the same shell), so each call works on its own files and
+        # only moves the finished HTML into place.
+        src_fd, src_name = tempfile.mkstemp(
+            suffix=".qmd", prefix=f"{key}-", dir=self.cache_dir
+        )
+        out_fd, out_name = tempfile.mkstemp(
+            suffix=".tmp", prefix=f"{key}-", dir=self.cache_dir
+        )
+        os.close(out_fd)
+        src_path = Path(src_name)
+        out_path = Path(out_name)
+        with os.fdopen(src_fd, "w") as fp:
+            fp.write(text)
+        args = list(self.args)
+        args[1] = os.path.relpath(src_path, self.build_dir)
+        args[args.index("-o") + 1] = os.path.relpath(out_path, self.build_dir)
+        args[args.index("--template") + 1] = os.path.relpath(
+            template, self.build_dir
+        )
+        if not citeproc and "--citeproc" in args:
+            args.remove("--citeproc")
+        try:
+            subprocess.run(
+                args, check=True, cwd=self.build_dir, capture_output=True
+            )
+        except subprocess.CalledProcessError as e:
+            out_path.unlink(missing_ok=True)
+            raise RuntimeError(
+                f"{e.stderr}\nwhen trying to run:{' '.join(args)}"
+            )
+        finally:
+            src_path.unlink(missing_ok=True)
+        html = out_path.read_text()
+        os.replace(out_path, html_path)
+        return html
+
+    def cache_key(self, *parts: str) -> str:
+        data = "\0".join((self.key_prefix,) + parts)
+        return hashlib.md5(data.encode("utf-8")).hexdigest()
+
+    def render(self, staged_src: Path, output_path: Path) -> bool:
+        """Write ``output_path`` from per-section renders.
+
+        Returns False when the page has fewer than two sections, in which
+        case the caller should render it in one piece.
+        """
+        front, sections = self.split(staged_src.read_text())
+        keys_path = self.keys_path(output_path)
+        if len(sections) < 2:
+            keys_path.unlink(missing_ok=True)
+            return False
+        keys_path.parent.mkdir(parents=True, exist_ok=True)
+        body_template = self.cache_dir / "section-body.html"
+        if not body_template.exists():
+            fd, name = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, "w") as fp:
+                fp.write("$body$\n")
+            os.replace(name, body_template)
+        self.total = len(sections)
+        bodies = []
+        for section in sections:
+            key = self.cache_key(front, section)
+            if (self.cache_dir / f"{key}.html").exists():
+                self.reused += 1
+            bodies.append(self.run_pandoc(front + section, key, body_template))
+        # the real template is applied once, to the front matter alone, and
+        # the section bodies are dropped into it afterwards
+        template_arg = self.args[self.args.index("--template") + 1]
+        template = self.build_dir / template_arg
+        shell = self.run_pandoc(
+            front + "\n" + self.placeholder + "\n",
+            self.cache_key("shell", front, template.read_text()),
+            template,
+        )
+        body = self.renumber_crossrefs("\n".join(bodies))
+        if "--citeproc" in self.args:
+            body = self.resolve_citations(front, body, body_template)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(shell.replace(self.placeholder, body, 1))
+        keys_path.write_text(
+            json.dumps(
+                {
+                    "page": os.path.relpath(output_path, self.build_dir),
+                    "keys": self.used,
+                }
+            )
+        )
+        return True
+
+    def keys_path(self, output_path: Path) -> Path:
+        page = os.path.relpath(output_path, self.build_dir)
+        name = hashlib.md5(page.encode("utf-8")).hexdigest()
+        return self.cache_dir / "pages" / f"{name}.json"
+
+    @classmethod
+    def prune(cls, build_dir: Path) -> int:
+        """Delete cached section HTML that no rendered page uses.
+
+        Each page records the keys of its last render; pages whose HTML is
+        gone no longer count.  Call this only when no render is running.
+        Returns the number of files removed.
+        """
+        cache_dir = build_dir / "_sections"
+        if not cache_dir.is_dir():
+            return 0
+        keep = set()
+        for keys_path in (cache_dir / "pages").glob("*.json"):
+            try:
+                record = json.loads(keys_path.read_text())
+            except (OSError, ValueError):
+                keys_path.unlink(missing_ok=True)
+                continue
+            if not (build_dir / record["page"]).exists():
+                keys_path.unlink(missing_ok=True)
+                continue
+            keep.update(record["keys"])
+        removed = 0
+        for html_path in cache_dir.glob("*.html"):
+            if html_path.name == "section-body.html":
+                continue
+            if html_path.stem not in keep:
+                html_path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def renumber_crossrefs(self, body: str) -> str:
+        """Number figures, tables and equations across the whole page."""
+        label_matches = list(re.finditer(r'id="((fig|tbl|eq):[^"]+)"', body))
+        if not label_matches and "¿" not in body:
+            return body
+        numbers = {}
+        counts = {}
+        pieces = [body[: label_matches[0].start()] if label_matches else body]
+        for pos, match in enumerate(label_matches):
+            label, kind = match.group(1), match.group(2)
+            if label not in numbers:
+                counts[kind] = counts.get(kind, 0) + 1
+                numbers[label] = counts[kind]
+            if pos + 1 < len(label_matches):
+                end = label_matches[pos + 1].start()
+            else:
+                end = len(body)
+            segment = body[match.start() : end]
+            # only the caption (or equation tag) that belongs to this label
+            # is renumbered, so the replacement stops after the first hit
+            if kind == "eq":
+                segment = re.sub(
+                    r"\\qquad\(\d+\)",
+                    lambda _: rf"\qquad({numbers[label]})",
+                    segment,
+                    count=1,
+                )
+            else:
+                segment = re.sub(
+                    r"(<(?:fig)?caption[^>]*>\s*(?:<p>)?[^<\d]*?)\d+",
+                    lambda m: m.group(1) + str(numbers[label]),
+                    segment,
+                    count=1,
+                )
+            pieces.append(segment)
+        body = "".join(pieces)
+
+        def fix_link(match):
+            number = numbers.get(match.group(2))
+            if number is None:
+                return match.group(0)
+            return f"{match.group(1)}{number}{match.group(4)}"
+
+        body = re.sub(
+            r'(<a href="#((?:fig|tbl|eq):[^"]+)"[^>]*>[^<]*?)(\d+)(</a>)',
+            fix_link,
+            body,
+        )
+
+        def fix_unresolved(match):
+            label = match.group(1)
+            if label not in numbers:
+                return match.group(0)
+            prefix = self.crossref_prefixes[label.split(":", 1)[0]]
+            return f'<a href="#{label}">{prefix}&nbsp;{numbers[label]}</a>'
+
+        return re.sub(r"¿((?:fig|tbl|eq):[^?]+)\?", fix_unresolved, body)
+
+    def resolve_citations(
+        self, front: str, body: str, body_template: Path
+    ) -> str:
+        """Format every citation in one citeproc pass over the whole page."""
+        citation_re = re.compile(
+            r'(<span class="citation" data-cites="[^"]*">)(.*?)(</span>)',
+            re.DOTALL,
+        )
+        citations = []
+        for match in citation_re.finditer(body):
+            citations.append(html_lib.unescape(match.group(2)))
+        if not citations:
+            return body
+        # list the citations in page order so numeric styles count them the
+        # same way a whole-page render would
+        lines = [front]
+        for idx, citation in enumerate(citations):
+            lines += [f"::: {{#pydifft-cite-{idx}}}", citation, ":::", ""]
+        lines += ["::: {#refs}", ":::", ""]
+        rendered = self.run_pandoc(
+            "\n".join(lines),
+            self.cache_key("citations", front, *citations),
+            body_template,
+            citeproc=True,
+        )
+        formatted = dict(
+            re.findall(
+                r'<div id="pydifft-cite-(\d+)">\s*<p>(.*?)</p>\s*</div>',
+                rendered,
+                re.DOTALL,
+            )
+        )
+        counter = iter(range(len(citations)))
+
+        def substitute(match):
+            idx = str(next(counter))
+            if idx not in formatted:
+                return match.group(0)
+            return match.group(1) + formatted[idx] + match.group(3)
+
+        body = citation_re.sub(substitute, body)
+        refs = re.search(r'<div id="refs".*\Z', rendered, re.DOTALL)
+        if refs:
+            empty_refs = re.compile(r'<div id="refs"[^>]*>\s*</div>')
+            if empty_refs.search(body):
+                body = empty_refs.sub(
+                    lambda _: refs.group(0).strip(), body, count=1
+                )
+            else:
+                body += "\n" + refs.group(0).strip()
+        return body
 
 
 try:
@@ -1836,7 +2411,21 @@ def build_all(
     changed_paths=None,
     refresh_callback=None,
     code_display: str = CODE_DISPLAY_COLLAPSED,
+    split_sections: bool = False,
+    wait_for_notebooks: bool = False,
+    max_workers=None,
+    manifest=None,
+    executor=None,
 ):
+    """Render stale pages into ``_build`` and assemble ``_display``.
+
+    Notebook execution normally finishes in the background; with
+    ``wait_for_notebooks`` the call blocks until outputs are applied.  When
+    ``manifest`` is a dict, per-page pandoc timings and failures are stored
+    in ``manifest["pages"]`` and notebook results in
+    ``manifest["notebooks"]``.  ``executor`` is passed on to
+    :func:`execute_code_blocks` to run notebooks on remote workers.
+    """
     if code_display not in CODE_DISPLAY_MODES:
         raise ValueError(f"unknown code display mode: {code_display}")
     ensure_pandoc_available()
@@ -1926,6 +2515,7 @@ def build_all(
                 "render_files": render_files,
                 "tree": tree,
                 "include_map": include_map,
+                "graph": graph,
             }
     else:
         build_set = set(graph.stage_targets(None))
@@ -1995,6 +2585,9 @@ def build_all(
             bibliography,
             csl,
             webtex,
+            max_workers=max_workers,
+            manifest=manifest,
+            executor=executor,
         )
 
     order = graph.render_order()
@@ -2005,8 +2598,15 @@ def build_all(
     graph.refresh_navigation()
     graph.refresh_if_ready(refresh_callback)
     if render_targets:
-        workers = max(1, min(len(render_targets), 4))
+        if max_workers is None:
+            max_workers = 4
+        workers = max(1, min(len(render_targets), max_workers))
         future_to_target = {}
+        # Only pass the opt-in flag when it is set so render_file stand-ins
+        # with the original signature keep working.
+        render_kwargs = {}
+        if split_sections:
+            render_kwargs["split_sections"] = True
         with ThreadPoolExecutor(max_workers=workers) as pool:
             for f in render_targets:
                 fragment = f not in render_files
@@ -2018,12 +2618,22 @@ def build_all(
                     bibliography,
                     csl,
                     webtex,
+                    **render_kwargs,
                 )
                 future_to_target[future] = f
             # Use direct future-to-target mapping so completion logging stays
             # straightforward while each render finishes.
             for future in as_completed(future_to_target):
-                print(f"Pandoc finished for {future_to_target[future]}")
+                target = future_to_target[future]
+                print(f"Pandoc finished for {target}")
+                if manifest is not None:
+                    error = future.exception()
+                    manifest.setdefault("pages", {})[target] = {
+                        "seconds": None if error else future.result(),
+                        "error": None if error is None else str(error),
+                    }
+        if split_sections:
+            SectionRenderer.prune(Path(BUILD_DIR).resolve())
 
     graph.update_checksums(checksums)
     save_checksums(checksums)
@@ -2077,7 +2687,21 @@ def build_all(
     )
 
     # phase 5: keep notebook execution asynchronous and refresh once complete.
-    if notebook_future:
+    if notebook_future and wait_for_notebooks:
+        print(
+            "Notebook execution still running after phase 4; "
+            "waiting for it to finish.",
+            flush=True,
+        )
+        graph.handle_notebook_future(
+            notebook_future,
+            notebook_executor,
+            build_files,
+            display_targets,
+            refresh_callback,
+            checksums,
+        )
+    elif notebook_future:
         print(
             "Notebook execution still running after phase 4; "
             "registering async completion callback.",
@@ -2100,9 +2724,85 @@ def build_all(
         "render_files": render_files,
         "tree": tree,
         "include_map": include_map,
+        "graph": graph,
     }
 
 
+def build_once(
+    webtex: bool = False,
+    code_display: str = CODE_DISPLAY_COLLAPSED,
+    split_sections: bool = False,
+    executor=None,
+):
+    """Build the whole project headlessly and write ``_build/manifest.json``.
+
+    Pandoc renders and notebook groups use every available core, and the
+    call only returns once notebook outputs are in the pages.  Raises
+    ``SystemExit(1)`` when a page failed to render, a cell of any notebook
+    the pages use (cached or not) raised an error, or a node of the render
+    tree did not reach ``complete``.
+    """
+    workers = os.cpu_count() or 1
+    manifest = {"pages": {}, "notebooks": []}
+    start = time.time()
+    result = build_all(
+        webtex=webtex,
+        code_display=code_display,
+        split_sections=split_sections,
+        wait_for_notebooks=True,
+        max_workers=workers,
+        manifest=manifest,
+        executor=executor,
+    )
+    graph = result["graph"]
+    graph.refresh_status_tags(load_checksums())
+    incomplete = {}
+    for path, node in graph.nodes.items():
+        if node["status_tags"] != ["complete"]:
+            incomplete[path] = node["status_tags"]
+    failed_pages = sorted(
+        target
+        for target, page in manifest["pages"].items()
+        if page["error"] is not None
+    )
+    # Notebooks that were not executed in this run (cache hits in earlier
+    # runs, or pages whose sources did not change) still put their error
+    # outputs on the built pages, so they count too.
+    cell_errors = sum(nb["cell_errors"] for nb in manifest["notebooks"])
+    cell_errors += cached_cell_errors(
+        graph.nodes,
+        skip={nb.get("notebook") for nb in manifest["notebooks"]},
+    )
+    cache_hits = sum(1 for nb in manifest["notebooks"] if nb["cached"])
+    manifest.update(
+        {
+            "workers": workers,
+            "seconds": round(time.time() - start, 3),
+            "cache_hits": cache_hits,
+            "cache_misses": len(manifest["notebooks"]) - cache_hits,
+            "cell_errors": cell_errors,
+            "failed_pages": failed_pages,
+            "incomplete": incomplete,
+        }
+    )
+    manifest_path = BUILD_DIR / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    print(
+        f"Wrote {manifest_path}: {len(manifest['pages'])} page(s) rendered, "
+        f"{cache_hits} notebook cache hit(s), "
+        f"{manifest['cache_misses']} miss(es), "
+        f"{cell_errors} cell error(s) in {manifest['seconds']:.1f}s",
+        flush=True,
+    )
+    if failed_pages or cell_errors or incomplete:
+        for target in failed_pages:
+            print(f"pandoc failed for {target}", flush=True)
+        for path, tags in sorted(incomplete.items()):
+            print(f"{path} is not complete: {', '.join(tags)}", flush=True)
+        raise SystemExit(1)
+    return manifest
+
+
 class BrowserReloader:
     def __init__(self, url: str):
         self.url = url
@@ -2173,12 +2873,19 @@ def watch_and_serve(
     no_browser: bool = False,
     webtex: bool = False,
     code_display: str = CODE_DISPLAY_COLLAPSED,
+    split_sections: bool = False,
+    executor=None,
 ):
     if no_browser:
         # In headless scenarios we only need the build artifacts and can exit
         # immediately instead of launching a server loop that waits for a
         # browser connection.
-        return build_all(webtex=webtex, code_display=code_display)
+        return build_all(
+            webtex=webtex,
+            code_display=code_display,
+            split_sections=split_sections,
+            executor=executor,
+        )
     port = 8000
     render_files = load_rendered_files()
 
@@ -2211,6 +2918,8 @@ def watch_and_serve(
         webtex=webtex,
         refresh_callback=refresher.refresh,
         code_display=code_display,
+        split_sections=split_sections,
+        executor=executor,
     )
     if Observer is None:
         raise ImportError(
@@ -2243,6 +2952,8 @@ def watch_and_serve(
             changed_paths=[path],
             refresh_callback=refresher.refresh,
             code_display=code_display,
+            split_sections=split_sections,
+            executor=executor,
         )
 
     handler = ChangeHandler(rebuild, refresher)
@@ -2321,6 +3032,11 @@ if __name__ == "__main__":
         action="store_true",
         help="Hide notebook source code and show only notebook output",
     )
+    parser.add_argument(
+        "--split-sections",
+        action="store_true",
+        help="Render top-level sections separately and cache each one",
+    )
     args = parser.parse_args()
     watch_and_serve(
         no_browser=args.no_browser,
@@ -2329,4 +3045,5 @@ if __name__ == "__main__":
             always_code=args.always_code,
             no_code=args.no_code,
         ),
+        split_sections=args.split_sections,
     )
@@ -0,0 +1,369 @@
+"""Notebook workers that execute qmdb notebook groups out of process.
+
+A worker reads one JSON request per line and answers with one JSON line::
+
+    {"id": 3, "source": "a.qmd", "codes": ["..."], "group": 1, "total": 2}
+    {"id": 3, "notebook": {...nbformat JSON...}}
+
+Errors that escape the kernel come back as ``{"id": 3, "error": "..."}``.
+The same loop serves stdin/stdout (for local subprocesses and ``ssh``) and
+TCP connections (``--listen``), so a remote machine only needs pydifftools
+installed and a checkout of the project at the path given by ``--root``.
+A TCP client first sends ``{"token": "..."}`` and is only served once the
+token matches the worker's.
+
+On the qmdb side a :class:`WorkerPool` hands each cache miss to an idle
+worker; :func:`pool_from_spec` builds one from the ``--workers`` option.
+"""
+
+import argparse
+import hmac
+import itertools
+import json
+import os
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+
+import nbformat
+
+TOKEN_ENV = "PYDIFFTOOLS_WORKER_TOKEN"
+
+
+class WorkerDisconnected(RuntimeError):
+    """The worker stopped answering; its connection cannot be reused."""
+
+
+def serve_stream(reader, writer, project_root):
+    """Answer requests from ``reader`` on ``writer`` until EOF."""
+    # Imported here because fast_build imports this module for the executor
+    # and the worker only needs the execution helper.
+    from pydifftools.notebook.fast_build import execute_notebook_group
+
+    for line in reader:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        reply = {"id": request.get("id")}
+        try:
+            nb = execute_notebook_group(
+                request["source"],
+                request["codes"],
+                request.get("group", 1),
+                request.get("total", 1),
+                project_root=project_root,
+            )
+            reply["notebook"] = nbformat.writes(nb)
+        except Exception as e:
+            reply["error"] = f"{type(e).__name__}: {e}"
+        writer.write((json.dumps(reply) + "\n").encode("utf-8"))
+        writer.flush()
+
+
+def serve_client(conn, token, project_root):
+    """Serve one TCP client once it has sent the right token."""
+    with conn, conn.makefile("rwb") as stream:
+        try:
+            hello = json.loads(stream.readline() or b"{}")
+        except ValueError:
+            return
+        offered = hello.get("token") if isinstance(hello, dict) else None
+        if not isinstance(offered, str) or not hmac.compare_digest(
+            offered.encode("utf-8"), token.encode("utf-8")
+        ):
+            stream.write(b'{"ok": false}\n')
+            stream.flush()
+            return
+        stream.write(b'{"ok": true}\n')
+        stream.flush()
+        serve_stream(stream, stream, project_root)
+
+
+class WorkerConnection:
+    """One worker reachable through a pair of byte streams.
+
+    Requests on a connection are strictly sequential; the pool makes sure
+    only one thread uses a connection at a time.
+    """
+
+    def __init__(self, name, reader, writer, closer=None):
+        self.name = name
+        self.reader = reader
+        self.writer = writer
+        self.closer = closer
+        self.ids = itertools.count(1)
+
+    @classmethod
+    def spawn(cls, command, name=None):
+        """Start ``command`` and talk to it over its stdin/stdout."""
+        proc = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+
+        def close():
+            try:
+                proc.stdin.close()
+            except OSError:
+                # the worker already exited with requests unread
+                pass
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+
+        connection = cls(
+            name or " ".join(command), proc.stdout, proc.stdin, close
+        )
+        connection.process = proc
+        return connection
+
+    @classmethod
+    def connect(cls, host, port, token):
+        """Connect to a worker started with ``--listen``."""
+        sock = socket.create_connection((host, port))
+        stream = sock.makefile("rwb")
+
+        def close():
+            stream.close()
+            sock.close()
+
+        connection = cls(f"tcp://{host}:{port}", stream, stream, close)
+        stream.write((json.dumps({"token": token}) + "\n").encode("utf-8"))
+        stream.flush()
+        reply = stream.readline()
+        if not reply or not json.loads(reply).get("ok"):
+            connection.close()
+            raise RuntimeError(
+                f"notebook worker {connection.name} rejected the token"
+            )
+        return connection
+
+    def execute(self, src, codes, group_idx, total_groups):
+        request_id = next(self.ids)
+        request = {
+            "id": request_id,
+            "source": src,
+            "codes": list(codes),
+            "group": group_idx,
+            "total": total_groups,
+        }
+        try:
+            self.writer.write((json.dumps(request) + "\n").encode("utf-8"))
+            self.writer.flush()
+            line = self.reader.readline()
+        except (OSError, ValueError) as e:
+            raise WorkerDisconnected(
+                f"notebook worker {self.name} disconnected: {e}"
+            )
+        if not line:
+            raise WorkerDisconnected(
+                f"notebook worker {self.name} disconnected"
+            )
+        try:
+            reply = json.loads(line)
+        except ValueError:
+            raise WorkerDisconnected(
+                f"notebook worker {self.name} sent an unreadable reply"
+            )
+        if reply.get("id") != request_id:
+            raise WorkerDisconnected(
+                f"notebook worker {self.name} answered request"
+                f" {reply.get('id')} instead of {request_id}"
+            )
+        if "error" in reply:
+            raise RuntimeError(
+                f"notebook worker {self.name} failed on {src}:"
+                f" {reply['error']}"
+            )
+        return nbformat.reads(reply["notebook"], as_version=4)
+
+    def close(self):
+        if self.closer is not None:
+            self.closer()
+            self.closer = None
+
+
+class WorkerPool:
+    """Dispatch notebook groups to whichever worker is idle.
+
+    A worker that disconnects is closed and dropped, and its group is
+    handed to another live worker; errors the worker reports for the
+    notebook itself are raised as they are.
+    """
+
+    def __init__(self, connections):
+        if not connections:
+            raise ValueError("a worker pool needs at least one worker")
+        self.connections = list(connections)
+        self.idle = list(self.connections)
+        self.condition = threading.Condition()
+
+    @property
+    def max_workers(self):
+        return max(1, len(self.connections))
+
+    def _take(self):
+        with self.condition:
+            while not self.idle:
+                if not self.connections:
+                    raise RuntimeError("no notebook workers are left")
+                self.condition.wait()
+            return self.idle.pop()
+
+    def _drop(self, connection):
+        with self.condition:
+            if connection in self.connections:
+                self.connections.remove(connection)
+            self.condition.notify_all()
+        connection.close()
+
+    def _release(self, connection):
+        with self.condition:
+            self.idle.append(connection)
+            self.condition.notify()
+
+    def execute(self, src, codes, group_idx, total_groups):
+        while True:
+            connection = self._take()
+            try:
+                result = connection.execute(
+                    src, codes, group_idx, total_groups
+                )
+            except WorkerDisconnected as e:
+                print(f"{e}; resubmitting {src} group {group_idx}")
+                self._drop(connection)
+                continue
+            except BaseException:
+                self._release(connection)
+                raise
+            self._release(connection)
+            return result
+
+    def close(self):
+        with self.condition:
+            connections = list(self.connections)
+            self.connections = []
+            self.idle = []
+            self.condition.notify_all()
+        for connection in connections:
+            connection.close()
+
+
+def pool_from_spec(spec, project_root):
+    """Build a :class:`WorkerPool` from a comma separated ``spec``.
+
+    Each entry is one of
+
+    * ``local`` or ``local:N`` -- N worker subprocesses on this machine
+      (one per core by default),
+    * ``tcp://host:port`` -- a worker started with ``--listen``; the token
+      is read from ``$PYDIFFTOOLS_WORKER_TOKEN`` unless given as
+      ``tcp://:TOKEN@host:port``,
+    * ``ssh://host/path/to/project`` -- a worker started over ``ssh`` that
+      executes against the project checkout at that path.
+    """
+    connections = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if entry == "local" or entry.startswith("local:"):
+            count = os.cpu_count() or 1
+            if ":" in entry:
+                count = int(entry.split(":", 1)[1])
+            command = [
+                sys.executable,
+                "-m",
+                "pydifftools.notebook.nbworker",
+                "--root",
+                str(project_root),
+            ]
+            for idx in range(count):
+                connections.append(
+                    WorkerConnection.spawn(command, name=f"local-{idx + 1}")
+                )
+            continue
+        parsed = urlparse(entry)
+        if parsed.scheme == "tcp":
+            token = parsed.password or os.environ.get(TOKEN_ENV)
+            if not token:
+                raise ValueError(
+                    f"{entry} needs a token: set ${TOKEN_ENV} or use"
+                    " tcp://:TOKEN@host:port"
+                )
+            connections.append(
+                WorkerConnection.connect(parsed.hostname, parsed.port, token)
+            )
+        elif parsed.scheme == "ssh":
+            remote_root = parsed.path or "."
+            target = parsed.netloc
+            remote = (
+                "python3 -m pydifftools.notebook.nbworker --root "
+                + shlex.quote(remote_root)
+            )
+            connections.append(
+                WorkerConnection.spawn(["ssh", target, remote], name=entry)
+            )
+        else:
+            raise ValueError(f"unknown notebook worker spec: {entry}")
+    return WorkerPool(connections)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Execute qmdb notebook groups for a remote build"
+    )
+    parser.add_argument(
+        "--root",
+        default=".",
+        help="Project root that notebook paths are relative to",
+    )
+    parser.add_argument(
+        "--listen",
+        metavar="[HOST:]PORT",
+        help=(
+            "Serve over TCP instead of stdin/stdout, on 127.0.0.1 unless"
+            " HOST is given. Anyone who can connect and knows the token can"
+            " run arbitrary code as this user, so only listen on other"
+            " interfaces inside a trusted network, or prefer ssh:// workers"
+        ),
+    )
+    parser.add_argument(
+        "--token",
+        help=(
+            "Shared secret clients must send before any request (default:"
+            f" ${TOKEN_ENV}); required with --listen"
+        ),
+    )
+    args = parser.parse_args(argv)
+    project_root = Path(args.root).resolve()
+    if args.listen:
+        token = args.token or os.environ.get(TOKEN_ENV)
+        if not token:
+            parser.error(f"--listen needs --token or ${TOKEN_ENV}")
+        host, _, port = args.listen.rpartition(":")
+        host = host or "127.0.0.1"
+        server = socket.create_server((host, int(port)))
+        print(f"notebook worker listening on {host}:{port}", file=sys.stderr)
+        while True:
+            conn, _ = server.accept()
+            threading.Thread(
+                target=serve_client,
+                args=(conn, token, project_root),
+                daemon=True,
+            ).start()
+    # stdout carries the protocol, so everything else that would print there
+    # (progress messages, kernel output) is sent to stderr instead.
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    serve_stream(sys.stdin.buffer, protocol_out, project_root)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,17 @@
 """this script has been entirely vibe-coded based on the tex example included
 in the repo!"""
 
+import glob
+import hashlib
+import json
+import os
 import re
 import sys
 import subprocess
 import tempfile
+import time
 import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 from pydifftools.command_registry import register_command
@@ -245,18 +251,12 @@ def format_tags(text: str, indent_str: str = "  ") -> str:
     return re.sub(r"[ \t]+(?=\n)", "", formatted)
 
 
-@register_command(
-    "Convert LaTeX sources to Quarto Markdown (.qmd) files",
-    help={"tex": "Input .tex file to convert"},
-)
-def tex2qmd(tex):
-    """Convert ``tex`` to a .qmd file and return the output path."""
-
-    inp = Path(tex)
-    if not inp.exists():
-        print(f"File not found: {inp}", file=sys.stderr)
-        sys.exit(1)
+def _convert_tex_file(inp: Path, capture_stderr: bool = False) -> Path:
+    """Run the full LaTeX to Quarto conversion for one existing file.
 
+    With ``capture_stderr`` pandoc's error output is kept on the raised
+    :class:`subprocess.CalledProcessError` instead of going to the terminal.
+    """
     base = inp.with_suffix("")
     src = inp.read_text()
     pre_content = preprocess_latex(src)
@@ -288,7 +288,10 @@ def tex2qmd(tex):
             "-o",
             mid_path,
         ]
-        subprocess.run(cmd, check=True)
+        if capture_stderr:
+            subprocess.run(cmd, check=True, stderr=subprocess.PIPE, text=True)
+        else:
+            subprocess.run(cmd, check=True)
     finally:
         Path(pre_path).unlink(missing_ok=True)
 
@@ -304,6 +307,140 @@ def tex2qmd(tex):
     return out_path
 
 
+def _convert_batch_entry(tex_path: str) -> dict:
+    """Convert one file for the batch pool and report how it went."""
+    start = time.time()
+    result = {"input": tex_path}
+    try:
+        # pool workers run at once, so keep pandoc's messages apart
+        result["output"] = str(
+            _convert_tex_file(Path(tex_path), capture_stderr=True)
+        )
+    except Exception as e:
+        if isinstance(e, subprocess.CalledProcessError) and e.stderr:
+            result["error"] = f"{e}\n{e.stderr}"
+        else:
+            result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.time() - start, 3)
+    return result
+
+
+def tex2qmd_batch(pattern, jobs=0, force=False):
+    """Convert every .tex file matched by a directory or glob ``pattern``.
+
+    Files run in a process pool (``jobs`` workers, 0 for one per core).  A
+    file is skipped when its source hash matches the one recorded in
+    ``.tex2qmd-cache.json`` and its .qmd still exists, unless ``force`` is
+    set.  A summary of conversions, skips, failures and timings is written
+    to ``tex2qmd-summary.json`` next to the cache and returned.
+    """
+    start = time.time()
+    root = Path(pattern)
+    if root.is_dir():
+        inputs = sorted(root.rglob("*.tex"))
+    else:
+        inputs = sorted(
+            Path(match)
+            for match in glob.glob(pattern, recursive=True)
+            if match.endswith(".tex")
+        )
+        # a glob shares its cache with the directory it starts from
+        root = Path(".")
+        for part in Path(pattern).parts:
+            if any(ch in part for ch in "*?["):
+                break
+            root = root / part
+    cache_path = root / ".tex2qmd-cache.json"
+    cache = {}
+    if cache_path.exists():
+        cache = json.loads(cache_path.read_text())
+    summary = {"converted": [], "skipped": [], "failed": []}
+    pending = {}
+    for inp in inputs:
+        digest = hashlib.md5(inp.read_bytes()).hexdigest()
+        key = str(inp.resolve())
+        recorded = cache.get(key)
+        if (
+            not force
+            and recorded is not None
+            and recorded["source_md5"] == digest
+            and Path(recorded["output"]).exists()
+        ):
+            summary["skipped"].append(str(inp))
+            continue
+        pending[str(inp)] = (key, digest)
+
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1 or len(pending) < 2:
+        results = [_convert_batch_entry(path) for path in pending]
+    else:
+        results = []
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(_convert_batch_entry, path) for path in pending
+            ]
+            for future in as_completed(futures):
+                results.append(future.result())
+
+    for result in sorted(results, key=lambda item: item["input"]):
+        if "error" in result:
+            summary["failed"].append(result)
+            continue
+        summary["converted"].append(result)
+        key, digest = pending[result["input"]]
+        cache[key] = {
+            "source_md5": digest,
+            "output": str(Path(result["output"]).resolve()),
+        }
+    cache_path.write_text(json.dumps(cache, indent=2, sort_keys=True))
+    summary["seconds"] = round(time.time() - start, 3)
+    summary_path = root / "tex2qmd-summary.json"
+    summary_path.write_text(json.dumps(summary, indent=2))
+    print(
+        f"tex2qmd: {len(summary['converted'])} converted, "
+        f"{len(summary['skipped'])} unchanged, "
+        f"{len(summary['failed'])} failed in {summary['seconds']:.1f}s "
+        f"(summary in {summary_path})"
+    )
+    for failure in summary["failed"]:
+        print(
+            f"failed: {failure['input']}: {failure['error']}",
+            file=sys.stderr,
+        )
+    return summary
+
+
+@register_command(
+    "Convert LaTeX sources to Quarto Markdown (.qmd) files",
+    help={
+        "tex": (
+            "Input .tex file to convert, or a directory or glob to convert"
+            " every matching .tex file in parallel"
+        ),
+        "jobs": "Worker processes for batch conversion (0 = one per core)",
+        "force": "Reconvert batch inputs even when their source is unchanged",
+    },
+)
+def tex2qmd(tex, jobs=0, force=False):
+    """Convert ``tex`` to a .qmd file and return the output path.
+
+    Directories and glob patterns are converted with :func:`tex2qmd_batch`,
+    which exits with status 1 if any file failed.
+    """
+
+    inp = Path(tex)
+    if inp.is_dir() or any(ch in str(tex) for ch in "*?["):
+        summary = tex2qmd_batch(tex, jobs=jobs, force=force)
+        if summary["failed"]:
+            sys.exit(1)
+        return summary
+    if not inp.exists():
+        print(f"File not found: {inp}", file=sys.stderr)
+        sys.exit(1)
+    return _convert_tex_file(inp)
+
+
 def main():
     if len(sys.argv) != 2:
         print("Usage: tex_to_qmd.py file.tex", file=sys.stderr)
@@ -0,0 +1,137 @@
+import re
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from pydifftools.flowchart import watch_graph
+
+
+def fake_dot_svg(dot_text):
+    """Return a small Graphviz-like SVG for the nodes and edges in DOT."""
+    nodes = []
+    for name in re.findall(r"^\s*(\w+) \[", dot_text, re.MULTILINE):
+        if name not in ("graph", "node", "edge") and name not in nodes:
+            nodes.append(name)
+    edges = re.findall(r"^\s*(\w+) -> (\w+)", dot_text, re.MULTILINE)
+    parts = [
+        '<svg xmlns="http://www.w3.org/2000/svg" width="300pt"'
+        ' height="200pt" viewBox="0.00 0.00 300.00 200.00">',
+        '<g id="graph0" class="graph" transform="translate(4 196)">',
+    ]
+    for index, name in enumerate(nodes):
+        x = 10.0 + 40.0 * index
+        parts.append(
+            f'<g id="node{index + 1}" class="node"><title>{name}</title>'
+            f'<polygon fill="none" stroke="black" points="{x},-10'
+            f' {x + 30},-10 {x + 30},-30 {x},-30 {x},-10"/>'
+            f"<text>__WGRPH_TASK_LINK__:{name}</text></g>"
+        )
+    for index, (source, target) in enumerate(edges):
+        parts.append(
+            f'<g id="edge{index + 1}" class="edge">'
+            f"<title>{source}&#45;&gt;{target}</title>"
+            '<path fill="none" stroke="black" d="M0,0C1,1 2,2 3,3"/>'
+            '<polygon fill="black" stroke="black" points="3,3 4,4 5,3"/></g>'
+        )
+    parts.append("</g></svg>")
+    return "\n".join(parts)
+
+
+@pytest.fixture
+def fake_dot(monkeypatch):
+    """Stand in for the Graphviz ``dot`` executable; records each call."""
+    calls = []
+
+    def fake_run(cmd, check=False, **kwargs):
+        calls.append(cmd)
+        if "-o" in cmd:
+            dot_path = Path(cmd[cmd.index("-o") - 1])
+            Path(cmd[cmd.index("-o") + 1]).write_text(
+                fake_dot_svg(dot_path.read_text())
+            )
+            return subprocess.CompletedProcess(cmd, 0)
+        svg = fake_dot_svg(kwargs["input"].decode("utf-8"))
+        return subprocess.CompletedProcess(cmd, 0, stdout=svg.encode())
+
+    monkeypatch.setattr(watch_graph.shutil, "which", lambda name: name)
+    monkeypatch.setattr(watch_graph.subprocess, "run", fake_run)
+    return calls
+
+
+@pytest.fixture
+def write_graph():
+    """Write the ``a -> b -> c`` graph the watcher tests build.
+
+    ``c`` is an endpoint with its own style, and ``middle_text`` is the text
+    of ``b``, so rewriting with another text edits exactly one node.
+    """
+
+    def write(path, middle_text="Middle"):
+        path.write_text(
+            "styles:\n"
+            "  endpoint:\n"
+            "    attrs:\n"
+            "      node:\n"
+            "        shape: box\n"
+            "nodes:\n"
+            "  a:\n"
+            "    children: [b]\n"
+            "    text: Start\n"
+            "  b:\n"
+            "    children: [c]\n"
+            f"    text: {middle_text}\n"
+            "  c:\n"
+            "    style: endpoint\n"
+            "    text: Goal\n"
+        )
+
+    return write
+
+
+@pytest.fixture
+def graph_handler(tmp_path, write_graph):
+    """Build ``<name>.yaml`` in ``tmp_path`` and return its event handler.
+
+    Pass ``url_prefix`` to serve the graph below a prefix, as wgrph does
+    for a directory of graphs.
+    """
+
+    def make(name="graph", url_prefix="/"):
+        yaml_file = tmp_path / f"{name}.yaml"
+        dot_file = tmp_path / f"{name}.dot"
+        svg_file = tmp_path / f"{name}.svg"
+        write_graph(yaml_file)
+        kwargs = {}
+        if url_prefix != "/":
+            kwargs["url_prefix"] = url_prefix
+        data = watch_graph.build_graph(
+            yaml_file, dot_file, svg_file, 55, **kwargs
+        )
+        return watch_graph.GraphEventHandler(
+            yaml_file, dot_file, svg_file, data=data, **kwargs
+        )
+
+    return make
+
+
+@pytest.fixture
+def push_handler(fake_dot, graph_handler):
+    """A built graph whose preview pages are pushed new SVGs over SSE."""
+    handler = graph_handler()
+    handler.push = watch_graph.PreviewPush(keepalive=0.05)
+    return handler
+
+
+@pytest.fixture
+def dot_svg():
+    """The fake Graphviz SVG builder, for stand-ins of other backends."""
+    return fake_dot_svg
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    """Keep saved task indexes out of the real user cache directory."""
+    cache = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache))
+    return cache
@@ -0,0 +1,78 @@
+from pydifftools.flowchart import watch_graph
+
+
+def test_views_are_prerendered_without_touching_yaml(fake_dot, graph_handler):
+    handler = graph_handler()
+    renderer = watch_graph.BackgroundRenderer(handler)
+    handler.renderer = renderer
+    yaml_text = handler.yaml_file.read_text()
+    try:
+        renderer.start()
+        renderer.invalidate()
+        assert renderer.wait_idle(timeout=10)
+        assert set(renderer.renders) == {
+            (False, None, False),
+            (True, None, False),
+            (False, None, True),
+        }
+        # the overview was on screen, so only the other two needed Graphviz
+        assert len(fake_dot) == 3
+        assert handler.yaml_file.read_text() == yaml_text
+
+        handler.state["order_by_date"] = True
+        assert renderer.show((True, None, False))
+        assert (
+            handler.svg_file.read_bytes()
+            == renderer.renders[(True, None, False)][1]
+        )
+        # an unseen task filter has to be built by the caller, but is kept
+        # fresh from then on
+        assert not renderer.show((False, "b", False))
+        assert list(renderer.recent_tasks) == ["b"]
+        assert (False, "b", False) in renderer.views()
+    finally:
+        renderer.stop()
+    assert not renderer.workdir.exists()
+
+
+def test_stale_view_is_served_then_pushed(
+    fake_dot, graph_handler, write_graph, monkeypatch
+):
+    handler = graph_handler()
+    handler.driver = object()
+    reloads = []
+    monkeypatch.setattr(
+        watch_graph, "_reload_svg", lambda driver, src: reloads.append(src)
+    )
+    renderer = watch_graph.BackgroundRenderer(handler)
+    handler.renderer = renderer
+    renderer.invalidate()
+    renderer.refresh()
+    old_plan_svg = renderer.renders[(False, None, True)][1]
+    assert reloads == []
+
+    # an edit rebuilds the overview on screen and starts a new generation
+    write_graph(handler.yaml_file)
+    with handler.yaml_file.open("a") as fp:
+        fp.write("  d:\n    text: Extra\n")
+    handler.data = watch_graph.build_graph(
+        handler.yaml_file,
+        handler.dot_file,
+        handler.svg_file,
+        55,
+        prev_data=handler.data,
+    )
+    renderer.invalidate()
+
+    handler.state["filter_completed"] = True
+    assert renderer.show((False, None, True))
+    assert handler.svg_file.read_bytes() == old_plan_svg
+
+    renderer.refresh()
+    assert reloads == [handler.svg_file]
+    assert handler.svg_file.read_bytes() != old_plan_svg
+    assert (
+        handler.svg_file.read_bytes()
+        == renderer.renders[(False, None, True)][1]
+    )
+    renderer.stop()
@@ -0,0 +1,71 @@
+import json
+
+from pydifftools.flowchart import benchmark, watch_graph
+
+
+def test_svg_postprocess_benchmark_runs_on_small_plan():
+    result = benchmark.bench_svg_postprocess(
+        node_count=60, endpoint_count=4, repeat=2
+    )
+    assert result["nodes"] == 60
+    assert result["endpoints"] == 4
+    assert result["edges"] > 0
+    assert 0 < result["best_seconds"] <= result["mean_seconds"]
+
+
+def test_yaml_io_benchmark_dumps_identical_text():
+    result = benchmark.bench_yaml_io(node_count=80, endpoint_count=4, repeat=1)
+    assert result["nodes"] == 80
+    assert result["identical_output"]
+    assert result["load_libyaml_seconds"] > 0
+
+
+def test_endpoint_palette_is_cached_per_count():
+    watch_graph._endpoint_palette.cache_clear()
+    colors = watch_graph._endpoint_palette(3)
+    assert len(set(colors)) == 3
+    assert all(len(color) == 7 and color[0] == "#" for color in colors)
+    assert watch_graph._endpoint_palette(3) is colors
+    assert watch_graph._endpoint_palette.cache_info().hits == 1
+
+
+def test_random_plan_respects_fan_limits():
+    data = benchmark.random_plan(
+        300, fan_out=3, fan_in=2, date_density=0.5, endpoint_count=6, seed=1
+    )
+    nodes = data["nodes"]
+    assert len(nodes) == 300
+    assert all(len(node["children"]) <= 3 for node in nodes.values())
+    assert all(len(node["parents"]) <= 2 for node in nodes.values())
+    for name, node in nodes.items():
+        for child in node["children"]:
+            assert name in nodes[child]["parents"]
+            if "due" in node and "due" in nodes[child]:
+                assert nodes[child]["due"] > node["due"]
+    assert 100 < sum("due" in node for node in nodes.values()) < 200
+    assert sum(node.get("style") == "endpoint" for node in nodes.values()) == 6
+    assert all(len(node["text"]) >= 40 for node in nodes.values())
+
+
+def test_build_benchmark_writes_json(tmp_path, monkeypatch):
+    # The stub replaces Graphviz, so the run must not need it.
+    monkeypatch.setattr(watch_graph, "pygraphviz", None)
+    monkeypatch.setattr(watch_graph.shutil, "which", lambda name: None)
+    output = tmp_path / "results.json"
+    benchmark.main(
+        ["--nodes", "80", "--endpoints", "4", "--repeat", "2"]
+        + ["--build-only", "--output", str(output)]
+    )
+    (result,) = json.loads(output.read_text())
+    assert result["benchmark"] == "build"
+    assert result["edges"] > 0
+    assert list(result["stages"]) == [
+        "load_graph_yaml",
+        "yaml_to_dot",
+        "endpoint_projects",
+        "write_dot_from_yaml",
+        "build_graph",
+    ]
+    for timing in result["stages"].values():
+        assert 0 < timing["best_seconds"] <= timing["mean_seconds"]
+    assert watch_graph._render_dot_svg.__name__ == "_render_dot_svg"
@@ -0,0 +1,95 @@
+import copy
+
+from pydifftools.flowchart import watch_graph
+from pydifftools.flowchart.graph import DotFragments, yaml_to_dot
+
+
+def _data():
+    return {
+        "styles": {"endpoint": {"attrs": {"node": {"shape": "box"}}}},
+        "nodes": {
+            "a": {"text": "Start", "children": ["b"], "parents": []},
+            "b": {"text": "Middle", "children": ["c"], "parents": ["a"]},
+            "c": {
+                "text": "Goal",
+                "style": "endpoint",
+                "children": [],
+                "parents": ["b"],
+            },
+        },
+    }
+
+
+def test_fragments_match_full_build_and_report_changes():
+    fragments = DotFragments()
+    data = _data()
+    assert yaml_to_dot(copy.deepcopy(data), fragments=fragments) == (
+        yaml_to_dot(copy.deepcopy(data))
+    )
+    assert fragments.changed == {"a", "b", "c"}
+
+    yaml_to_dot(copy.deepcopy(data), fragments=fragments)
+    assert fragments.changed == set()
+    assert fragments.reused == 3
+
+    data["nodes"]["b"]["text"] = "Middle, edited"
+    edited = yaml_to_dot(copy.deepcopy(data), fragments=fragments)
+    assert edited == yaml_to_dot(copy.deepcopy(data))
+    assert fragments.changed == {"b"}
+    assert fragments.reused == 2
+
+    # relinking marks the parent and both the old and new child
+    data["nodes"]["d"] = {"text": "Side", "children": [], "parents": ["a"]}
+    data["nodes"]["a"]["children"] = ["d"]
+    data["nodes"]["b"]["parents"] = []
+    relinked = yaml_to_dot(copy.deepcopy(data), fragments=fragments)
+    assert relinked == yaml_to_dot(copy.deepcopy(data))
+    assert fragments.changed == {"a", "b", "d"}
+
+    del data["nodes"]["d"]
+    data["nodes"]["a"]["children"] = []
+    yaml_to_dot(copy.deepcopy(data), fragments=fragments)
+    assert fragments.removed == {"d"}
+    assert "d" not in fragments.nodes
+
+
+def test_date_view_keeps_its_own_sort_values():
+    fragments = DotFragments()
+    data = _data()
+    data["nodes"]["a"]["due"] = "06/01/30"
+    data["nodes"]["b"]["due"] = "06/02/30"
+    first = yaml_to_dot(
+        copy.deepcopy(data), order_by_date=True, fragments=fragments
+    )
+    assert "sortv=0" in first
+    # moving a ahead of b changes both sort values
+    data["nodes"]["a"]["due"] = "06/03/30"
+    second = yaml_to_dot(
+        copy.deepcopy(data), order_by_date=True, fragments=fragments
+    )
+    assert second == yaml_to_dot(copy.deepcopy(data), order_by_date=True)
+    assert fragments.changed == {"a", "b"}
+
+
+def test_hit_rate_counts_reused_lines(
+    tmp_path, monkeypatch, fake_dot, write_graph, capsys
+):
+    monkeypatch.setattr(watch_graph, "_reload_svg", lambda driver, svg: None)
+    yaml_file = tmp_path / "graph.yaml"
+    write_graph(yaml_file)
+    handler = watch_graph.GraphEventHandler(
+        yaml_file,
+        tmp_path / "graph.dot",
+        tmp_path / "graph.svg",
+        debounce=0,
+        incremental_dot=True,
+    )
+    handler.handle(str(yaml_file))
+    capsys.readouterr()
+
+    # a text no other test formats, so the label cache misses on it
+    write_graph(yaml_file, middle_text=f"Edited in {tmp_path.name}")
+    handler.handle(str(yaml_file))
+    out = capsys.readouterr().out
+    assert "Reformatted 1 of 3 node labels" in out
+    assert "(label cache hit rate 67%, 2 reused DOT lines)" in out
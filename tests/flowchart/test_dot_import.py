@@ -0,0 +1,72 @@
+import pathlib
+
+import pytest
+
+from pydifftools.flowchart import dot_to_yaml as dot_import
+from pydifftools.flowchart.graph import (
+    _dump_graph_yaml,
+    load_graph_yaml,
+    write_dot_from_yaml,
+)
+
+HERE = pathlib.Path(__file__).parent
+
+
+@pytest.mark.parametrize("name", ["magnet_setup.dot", "sample.dot"])
+def test_streaming_reader_matches_pydot(name):
+    dot_path = HERE / name
+    streamed = dot_import._dot_data_streaming(dot_path.read_text())
+    assert _dump_graph_yaml(streamed) == _dump_graph_yaml(
+        dot_import._dot_data_pydot(str(dot_path))
+    )
+
+
+def test_round_trip_through_dot(tmp_path):
+    first_dot = tmp_path / "first.dot"
+    write_dot_from_yaml(HERE / "sample.yaml", first_dot, update_yaml=False)
+    imported = tmp_path / "imported.yaml"
+    dot_import.dot_to_yaml(str(first_dot), str(imported))
+    data = load_graph_yaml(str(imported))
+    assert data["nodes"]["Start"]["style"] == "group1"
+    assert data["nodes"]["Middle"]["children"] == ["End"]
+    assert data["styles"]["group1"]["attrs"]["node"] == [
+        {"color": "blue", "fontcolor": "blue"}
+    ]
+
+
+def test_statements_cover_chains_quotes_and_comments():
+    text = (
+        "strict digraph {\n"
+        "  /* header */ rankdir=LR  # note\n"
+        '  subgraph done { node [color="gray"];\n'
+        '    "a b" [label="say \\"hi\\""] }\n'
+        "  x -> y -> z [style=invis]; { rank=same; y; z; }\n"
+        "}\n"
+    )
+    assert list(dot_import.iter_dot_statements(text)) == [
+        ("style", "done", {"color": '"gray"'}),
+        ("node", "a b", {"label": '"say \\"hi\\""'}, "done"),
+        ("edge", "x", "y"),
+        ("edge", "y", "z"),
+        ("node", "y", {}, None),
+        ("node", "z", {}, None),
+    ]
+
+
+def test_unsupported_syntax_falls_back_to_pydot(tmp_path, monkeypatch):
+    dot_path = tmp_path / "ports.dot"
+    dot_path.write_text("digraph G {\n  a:e -> b;\n}\n")
+    with pytest.raises(dot_import.DotSyntaxError):
+        list(dot_import.iter_dot_statements(dot_path.read_text()))
+    calls = []
+    monkeypatch.setattr(
+        dot_import,
+        "_dot_data_pydot",
+        lambda path: calls.append(path) or {"nodes": {"a": {}}},
+    )
+    yaml_path = tmp_path / "ports.yaml"
+    dot_import.dot_to_yaml(str(dot_path), str(yaml_path))
+    assert calls == [str(dot_path)]
+    assert load_graph_yaml(str(yaml_path))["nodes"] == {
+        "a": {"children": [], "parents": []}
+    }
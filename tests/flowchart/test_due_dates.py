@@ -314,6 +314,105 @@ def test_due_conflict_can_break_dependency(tmp_path, capsys):
     ) in capsys.readouterr().out
 
 
+def test_due_conflicts_are_resolved_in_one_batch(tmp_path, capsys):
+    yaml_path = tmp_path / "graph.yaml"
+    dot_path = tmp_path / "graph.dot"
+    yaml_path.write_text(
+        "\n".join(
+            [
+                "nodes:",
+                "  Top:",
+                "    due: 2025-10-10",
+                "    children: [Middle, Side]",
+                "  Middle:",
+                "    due: 2025-10-05",
+                "    children: [Bottom]",
+                "  Side:",
+                "    due: 2025-10-01",
+                "  Bottom:",
+                "    due: 2025-10-07",
+            ]
+        )
+        + "\n"
+    )
+    calls = []
+
+    def resolve(conflicts):
+        calls.append([(name, parent) for name, _, _, parent, _ in conflicts])
+        return {"Side": "break"}
+
+    data = graph.write_dot_from_yaml(
+        str(yaml_path),
+        str(dot_path),
+        validate_due_dates=True,
+        resolve_due_date_conflicts=resolve,
+    )
+
+    # Bottom only conflicts once Middle has moved, but is still asked about
+    # in the same batch.
+    assert calls == [
+        [("Middle", "Top"), ("Bottom", "Middle"), ("Side", "Top")]
+    ]
+    assert data["nodes"]["Middle"]["due"] == "10/10/25"
+    assert data["nodes"]["Bottom"]["due"] == "10/10/25"
+    assert data["nodes"]["Bottom"]["orig_due"] == "10/07/25"
+    assert data["nodes"]["Side"]["due"] == "10/01/25"
+    assert data["nodes"]["Side"]["parents"] == []
+    out = capsys.readouterr().out
+    assert "**WARNING!** breaking dependency between Top and Side" in out
+    assert (
+        "**WARNING!** moving due date of Bottom from 10/07/25 "
+        "to 10/10/25 because child of Middle"
+    ) in out
+
+
+def test_due_propagation_handles_long_chains(tmp_path):
+    yaml_path = tmp_path / "graph.yaml"
+    dot_path = tmp_path / "graph.dot"
+    count = 3000
+    lines = ["nodes:"]
+    for idx in range(count):
+        lines.append(f"  n{idx}:")
+        due = "2025-10-10" if idx == 0 else "2025-10-01"
+        lines.append(f"    due: {due}")
+        if idx + 1 < count:
+            lines.append(f"    children: [n{idx + 1}]")
+    yaml_path.write_text("\n".join(lines) + "\n")
+
+    data = graph.write_dot_from_yaml(
+        str(yaml_path),
+        str(dot_path),
+        update_yaml=False,
+        validate_due_dates=True,
+    )
+
+    assert data["nodes"][f"n{count - 1}"]["due"] == "10/10/25"
+
+
+def test_due_propagation_reports_cycles(tmp_path):
+    yaml_path = tmp_path / "graph.yaml"
+    dot_path = tmp_path / "graph.dot"
+    yaml_path.write_text(
+        "\n".join(
+            [
+                "nodes:",
+                "  a:",
+                "    due: 2025-10-10",
+                "    children: [b]",
+                "  b:",
+                "    due: 2025-10-01",
+                "    children: [a]",
+            ]
+        )
+        + "\n"
+    )
+
+    with pytest.raises(ValueError, match="cycle: a -> b -> a"):
+        graph.write_dot_from_yaml(
+            str(yaml_path), str(dot_path), validate_due_dates=True
+        )
+
+
 def test_due_node_warns_when_parent_has_no_due_date():
     data = {
         "nodes": {
@@ -359,3 +458,53 @@ def test_due_node_ignores_completed_parent_without_due_date():
         '<font color="red"><font point-size="12"><b>Warning! Depends '
         "on parents without due dates!</b></font></font>"
     ) not in dot
+
+
+def test_label_cache_reformats_only_changed_nodes(monkeypatch):
+    cache = graph.LabelCache()
+    monkeypatch.setattr(graph, "label_cache", cache)
+    data = {
+        "nodes": {
+            "a": {"text": "First", "due": "05/20/24", "children": ["b"]},
+            "b": {"text": "Second", "due": "05/25/24", "parents": ["a"]},
+            "c": {"text": "Third"},
+        }
+    }
+    first = yaml_to_dot(data)
+    assert cache.stats() == (0, 3)
+    assert yaml_to_dot(data) == first
+    assert cache.stats() == (3, 3)
+
+    data["nodes"]["c"]["text"] = "Third, edited"
+    yaml_to_dot(data)
+    assert cache.stats() == (5, 4)
+
+    # the TODAY/OVERDUE notices depend on the date, so a new day misses for
+    # the dated nodes only
+    class NextWeek(datetime.date):
+        @classmethod
+        def today(cls):
+            return cls(2024, 5, 20)
+
+    monkeypatch.setattr(graph, "date", NextWeek)
+    assert "TODAY" in yaml_to_dot(data)
+    assert cache.stats() == (6, 6)
+
+
+def test_due_strings_are_parsed_once(monkeypatch):
+    calls = []
+    parse = graph.parse_due_string
+
+    def counting_parse(text, **kwargs):
+        calls.append(text)
+        return parse(text, **kwargs)
+
+    monkeypatch.setattr(graph, "parse_due_string", counting_parse)
+
+    for _ in range(3):
+        assert graph.parse_due_date("10/11/25") == datetime.date(2025, 10, 11)
+        assert graph.parse_due_date(" Feb 3 2031 ") == datetime.date(
+            2031, 2, 3
+        )
+    # The canonical mm/dd/yy form never reaches dateutil.
+    assert calls == ["Feb 3 2031"]
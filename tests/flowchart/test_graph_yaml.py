@@ -1,9 +1,17 @@
+import pathlib
 import threading
 import time
 
 import pytest
+import yaml
 
-from pydifftools.flowchart.graph import EmptyGraphYamlError, load_graph_yaml
+from pydifftools.flowchart import graph
+from pydifftools.flowchart.graph import (
+    EmptyGraphYamlError,
+    IndentDumper,
+    load_graph_yaml,
+    save_graph_yaml,
+)
 
 
 def test_load_graph_yaml_raises_on_empty_after_retries(tmp_path):
@@ -29,3 +37,58 @@ def test_load_graph_yaml_retries_empty_file(tmp_path):
     writer.join()
 
     assert "task_a" in data.get("nodes", {})
+
+
+def test_save_graph_yaml_skips_unchanged_data(tmp_path):
+    yaml_path = tmp_path / "graph.yaml"
+    yaml_path.write_text("nodes:\n  task_a:\n    text: Task A\n")
+    data = load_graph_yaml(str(yaml_path))
+
+    assert save_graph_yaml(yaml_path, data)
+    saved = yaml_path.stat()
+    assert not save_graph_yaml(yaml_path, load_graph_yaml(str(yaml_path)))
+    assert yaml_path.stat().st_mtime_ns == saved.st_mtime_ns
+    assert yaml_path.stat().st_ino == saved.st_ino
+    assert list(tmp_path.iterdir()) == [yaml_path]
+
+
+def _python_dump(data):
+    return yaml.dump(
+        data,
+        Dumper=IndentDumper,
+        default_flow_style=False,
+        sort_keys=True,
+        allow_unicode=True,
+        indent=2,
+    )
+
+
+@pytest.mark.parametrize("use_libyaml", [True, False])
+def test_graph_dump_matches_indent_dumper(monkeypatch, use_libyaml):
+    if not use_libyaml:
+        monkeypatch.setattr(graph, "_CSafeDumper", None)
+    here = pathlib.Path(__file__).parent
+    samples = [
+        load_graph_yaml(str(here / "sample.yaml")),
+        load_graph_yaml(str(here / "magnet_setup.yaml")),
+        {
+            "nodes": {
+                "a": {
+                    "children": ["b", "c d"],
+                    "parents": [],
+                    "text": "Steps:\n- one\n- two\n\n",
+                },
+                "b": {
+                    "children": [],
+                    "parents": ["a"],
+                    "text": "caf\u00e9 \U0001f389 tab\there",
+                },
+                "c d": {"children": [], "parents": ["a"], "text": "x " * 60},
+                "z": {"children": [], "parents": [], "text": "kept\n\n"},
+            },
+            "styles": {"endpoint": {"attrs": {"node": [{"color": "red"}]}}},
+        },
+    ]
+    for data in samples:
+        graph._normalize_graph_dates(data)
+        assert graph._dump_graph_yaml(data) == _python_dump(data)
@@ -0,0 +1,83 @@
+import threading
+import time
+import types
+
+from pydifftools.flowchart import watch_graph
+
+
+def test_dot_runs_through_stdin_without_temp_svg(
+    tmp_path, fake_dot, write_graph, monkeypatch
+):
+    monkeypatch.setattr(watch_graph, "pygraphviz", None)
+    yaml_file = tmp_path / "graph.yaml"
+    write_graph(yaml_file)
+    watch_graph.build_graph(
+        yaml_file, tmp_path / "graph.dot", tmp_path / "graph.svg", 55
+    )
+    assert fake_dot == [["dot", "-Tsvg"]]
+    assert b'href="/?t=a"' in (tmp_path / "graph.svg").read_bytes()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "graph.dot",
+        "graph.svg",
+        "graph.yaml",
+    ]
+
+
+def test_pygraphviz_renders_in_process(
+    tmp_path, fake_dot, dot_svg, write_graph, monkeypatch
+):
+    drawn = []
+
+    class AGraph:
+        def __init__(self, string):
+            self.string = string
+
+        def draw(self, format, prog, args=""):
+            drawn.append((format, prog, args))
+            return dot_svg(self.string).encode("utf-8")
+
+    monkeypatch.setattr(
+        watch_graph, "pygraphviz", types.SimpleNamespace(AGraph=AGraph)
+    )
+    monkeypatch.setattr(watch_graph.shutil, "which", lambda name: None)
+    yaml_file = tmp_path / "graph.yaml"
+    write_graph(yaml_file)
+    watch_graph.build_graph(
+        yaml_file, tmp_path / "graph.dot", tmp_path / "graph.svg", 55
+    )
+    assert drawn == [("svg", "dot", "")]
+    assert fake_dot == []
+    assert b'href="/?t=b"' in (tmp_path / "graph.svg").read_bytes()
+
+
+def test_pygraphviz_layouts_do_not_overlap(dot_svg, monkeypatch):
+    active = []
+    overlaps = []
+
+    class AGraph:
+        def __init__(self, string):
+            self.string = string
+
+        def draw(self, format, prog, args=""):
+            active.append(self)
+            if len(active) > 1:
+                overlaps.append(len(active))
+            time.sleep(0.01)
+            active.remove(self)
+            return dot_svg(self.string).encode("utf-8")
+
+    monkeypatch.setattr(
+        watch_graph, "pygraphviz", types.SimpleNamespace(AGraph=AGraph)
+    )
+    threads = [
+        threading.Thread(
+            target=watch_graph._render_dot_svg,
+            args=("digraph G {\n  a [label=a];\n}\n",),
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlaps == []
@@ -0,0 +1,108 @@
+from pydifftools.flowchart import watch_graph
+from pydifftools.flowchart.graph import (
+    load_graph_yaml,
+    project_detail,
+    summarize_projects,
+)
+
+
+def _write_plan(path):
+    # Two projects: "ship" depends on the "design" endpoint, and "spec" is a
+    # task shared by both. "loose" feeds nothing.
+    path.write_text(
+        "nodes:\n"
+        "  build:\n"
+        "    children: [ship]\n"
+        "  design:\n"
+        "    children: [build]\n"
+        "    style: endpoint\n"
+        "    text: Design\n"
+        "  loose:\n"
+        "    children: []\n"
+        "  ship:\n"
+        "    style: endpoint\n"
+        "    text: Ship it\n"
+        "  sketch:\n"
+        "    children: [design]\n"
+        "    style: completed\n"
+        "  spec:\n"
+        "    children: [sketch, build]\n"
+    )
+
+
+def test_summary_collapses_each_project(tmp_path):
+    yaml_file = tmp_path / "graph.yaml"
+    _write_plan(yaml_file)
+    data = load_graph_yaml(str(yaml_file))
+
+    summary = summarize_projects(data)["nodes"]
+
+    assert list(summary) == ["design", "loose", "ship"]
+    assert summary["design"]["text"] == "Design\n(3 tasks, 2 open)"
+    assert summary["ship"]["text"] == "Ship it\n(3 tasks, 3 open)"
+    assert summary["design"]["children"] == ["ship"]
+    assert summary["ship"]["parents"] == ["design"]
+    assert summary["loose"]["children"] == []
+    # The full data is left alone.
+    assert data["nodes"]["design"]["text"] == "Design"
+
+
+def test_project_detail_keeps_upstream_projects_collapsed(tmp_path):
+    yaml_file = tmp_path / "graph.yaml"
+    _write_plan(yaml_file)
+    data = load_graph_yaml(str(yaml_file))
+
+    detail = project_detail(data, "ship")["nodes"]
+
+    assert sorted(detail) == ["build", "design", "ship", "spec"]
+    assert detail["design"]["text"] == "Design\n(3 tasks, 2 open)"
+    assert detail["design"]["children"] == ["build"]
+    assert sorted(detail["build"]["parents"]) == ["design", "spec"]
+    assert detail["spec"]["children"] == ["build"]
+
+
+def test_level_of_detail_views_render_separately(tmp_path, fake_dot):
+    yaml_file = tmp_path / "graph.yaml"
+    dot_file = tmp_path / "graph.dot"
+    svg_file = tmp_path / "graph.svg"
+    _write_plan(yaml_file)
+    cache = watch_graph.SvgRenderCache()
+
+    watch_graph.build_graph(
+        yaml_file,
+        dot_file,
+        svg_file,
+        55,
+        svg_cache=cache,
+        level_of_detail=True,
+    )
+    overview = svg_file.read_bytes()
+    assert b"title>ship</" in overview
+    assert b"title>build</" not in overview
+    # Summary nodes link to their project's own view.
+    assert b'href="/?t=design"' in overview
+
+    watch_graph.build_graph(
+        yaml_file,
+        dot_file,
+        svg_file,
+        55,
+        target_task="ship",
+        svg_cache=cache,
+        level_of_detail=True,
+    )
+    project = svg_file.read_bytes()
+    assert b"title>build</" in project
+    assert b"title>sketch</" not in project
+    assert len(fake_dot) == 2
+
+    watch_graph.build_graph(
+        yaml_file,
+        dot_file,
+        svg_file,
+        55,
+        svg_cache=cache,
+        level_of_detail=True,
+    )
+    assert svg_file.read_bytes() == overview
+    assert len(fake_dot) == 2
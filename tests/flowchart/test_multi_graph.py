@@ -0,0 +1,131 @@
+import types
+import urllib.error
+import urllib.request
+
+import pytest
+
+from pydifftools.flowchart import watch_graph
+
+
+def test_graph_slugs_are_unique(tmp_path):
+    assert watch_graph._graph_slugs(
+        [
+            tmp_path / "a" / "plan.yaml",
+            tmp_path / "b" / "plan.yaml",
+            tmp_path / "my plan.yml",
+            tmp_path / "...yaml",
+        ]
+    ) == ["plan", "plan-2", "my-plan", "graph"]
+
+
+def test_each_graph_is_served_under_its_prefix(fake_dot, graph_handler):
+    handlers = {
+        name: graph_handler(name, url_prefix=f"/{name}/")
+        for name in ("alpha", "beta")
+    }
+    server = watch_graph.MultiGraphPreviewServer(handlers)
+    server.start()
+    try:
+        index = urllib.request.urlopen(server.base_url).read()
+        assert b"href='/alpha/'>alpha.yaml<" in index
+        assert b"href='/beta/'>beta.yaml<" in index
+
+        svg = urllib.request.urlopen(
+            server.graph_url("alpha", "graph.svg")
+        ).read()
+        assert b'href="/alpha/?t=a"' in svg
+        assert b'href="/?t=a"' not in svg
+
+        page = urllib.request.urlopen(server.graph_url("beta") + "?d=1")
+        page = page.read()
+        assert b"src='/beta/graph.svg'" in page
+        assert b"href='/beta/'>project overview<" in page
+        assert b"href='/'>all graphs<" in page
+        assert handlers["beta"].state["order_by_date"] is True
+        assert handlers["alpha"].state["order_by_date"] is False
+
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(server.graph_url("gamma"))
+        assert excinfo.value.code == 404
+    finally:
+        server.stop()
+
+
+def test_renderers_share_one_pool(fake_dot, graph_handler):
+    pool = watch_graph.RenderPool(workers=1)
+    pool.start()
+    renderers = []
+    try:
+        for name in ("alpha", "beta"):
+            handler = graph_handler(name, url_prefix=f"/{name}/")
+            renderer = watch_graph.BackgroundRenderer(handler, pool=pool)
+            handler.renderer = renderer
+            renderer.start()
+            renderers.append(renderer)
+        for renderer in renderers:
+            renderer.invalidate()
+        for renderer in renderers:
+            assert renderer.wait_idle(timeout=10)
+            assert renderer.thread is None
+            assert len(renderer.renders) == 3
+        # each graph's full plan links back into its own pages
+        _, plan_svg = renderers[1].renders[(False, None, True)]
+        assert b'href="/beta/?t=b"' in plan_svg
+    finally:
+        pool.stop()
+        for renderer in renderers:
+            renderer.stop()
+
+
+def test_dispatcher_reloads_only_the_graph_on_screen(tmp_path, monkeypatch):
+    reloads = []
+
+    def fake_build(
+        y, d, s, w, order_by_date=False, prev=None, target=None, **kw
+    ):
+        return {"prefix": kw.get("url_prefix")}
+
+    monkeypatch.setattr(watch_graph, "build_graph", fake_build)
+    monkeypatch.setattr(
+        watch_graph, "_reload_svg", lambda driver, src: reloads.append(src)
+    )
+    driver = types.SimpleNamespace(current_url="http://127.0.0.1:1/beta/?d=1")
+    handlers = []
+    for name in ("alpha", "beta"):
+        (tmp_path / f"{name}.yaml").write_text("nodes:\n  a: {}\n")
+        handler = watch_graph.GraphEventHandler(
+            tmp_path / f"{name}.yaml",
+            tmp_path / f"{name}.dot",
+            tmp_path / f"{name}.svg",
+            svg_url=f"http://127.0.0.1:1/{name}/graph.svg",
+            driver=driver,
+            debounce=0.0,
+            url_prefix=f"/{name}/",
+        )
+        handlers.append(handler)
+
+    class FakeObserver:
+        def __init__(self):
+            self.scheduled = []
+
+        def schedule(self, handler, path, recursive=False):
+            self.scheduled.append((handler, path))
+
+    observer = FakeObserver()
+    watch_graph._schedule_graphs(observer, handlers)
+    assert len(observer.scheduled) == 1
+    dispatcher, path = observer.scheduled[0]
+    assert path == tmp_path
+
+    dispatcher.on_modified(
+        types.SimpleNamespace(src_path=str(tmp_path / "alpha.yaml"))
+    )
+    assert handlers[0].data == {"prefix": "/alpha/"}
+    assert handlers[1].data is None
+    # alpha rebuilt, but the shared browser is showing beta
+    assert reloads == []
+
+    dispatcher.on_modified(
+        types.SimpleNamespace(src_path=str(tmp_path / "beta.yaml"))
+    )
+    assert reloads == ["http://127.0.0.1:1/beta/graph.svg"]
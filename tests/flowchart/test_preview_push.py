@@ -0,0 +1,83 @@
+import http.client
+import time
+import urllib.parse
+import urllib.request
+
+from pydifftools.flowchart import watch_graph
+
+
+def _open_events(server, version):
+    url = urllib.parse.urlparse(server.base_url)
+    connection = http.client.HTTPConnection(url.hostname, url.port, timeout=5)
+    connection.request("GET", f"/events?v={version}")
+    response = connection.getresponse()
+    assert response.getheader("Content-Type") == "text/event-stream"
+    assert response.readline() == b"retry: 500\n"
+    return connection, response
+
+
+def _next_data(response):
+    while True:
+        line = response.readline()
+        if line.startswith(b"data: "):
+            return int(line[len(b"data: ") :])
+
+
+def test_page_reloads_svg_from_event_stream(push_handler, monkeypatch):
+
+    def reload_over_webdriver(driver, svg_src):
+        raise AssertionError("the page should fetch the SVG itself")
+
+    monkeypatch.setattr(watch_graph, "_reload_svg", reload_over_webdriver)
+    server = watch_graph.FlowchartPreviewServer(push_handler)
+    server.start()
+    try:
+        page = urllib.request.urlopen(server.base_url).read()
+        assert b"new EventSource('/events?v=0')" in page
+        assert b"'/graph.svg?v='+event.data" in page
+
+        connection, response = _open_events(server, 0)
+        assert push_handler.push.clients == 1
+        push_handler.reload_preview()
+        assert _next_data(response) == 1
+        response.close()
+        connection.close()
+
+        # a version published while no page listened is sent on connect
+        push_handler.reload_preview()
+        connection, response = _open_events(server, 1)
+        assert _next_data(response) == 2
+        response.close()
+        connection.close()
+    finally:
+        server.stop()
+
+
+def test_liveness_follows_the_event_streams(push_handler, monkeypatch):
+    probes = []
+    monkeypatch.setattr(
+        watch_graph,
+        "browser_window_is_alive",
+        lambda driver: probes.append(driver) or True,
+    )
+    server = watch_graph.FlowchartPreviewServer(push_handler)
+    server.start()
+    pushes = server.pushes()
+    try:
+        # before any page connects, WebDriver is the only source
+        assert watch_graph._browser_is_alive(pushes, lambda: "driver")
+        assert probes == ["driver"]
+
+        connection, response = _open_events(server, 0)
+        assert watch_graph._browser_is_alive(pushes, lambda: None)
+        response.close()
+        connection.close()
+        deadline = time.time() + 5
+        while push_handler.push.clients and time.time() < deadline:
+            time.sleep(0.02)
+        assert push_handler.push.clients == 0
+        assert push_handler.push.connected(grace=60)
+        assert not push_handler.push.connected(grace=0)
+        assert probes == ["driver"]
+    finally:
+        server.stop()
@@ -0,0 +1,150 @@
+import random
+
+from pydifftools.command_line import wgrph_task_completer
+from pydifftools.flowchart.graph import (
+    ReachabilityIndex,
+    TaskIndex,
+    endpoint_projects,
+    task_index_path,
+    trace_ancestors,
+    write_dot_from_yaml,
+)
+
+
+def _graph(edges, endpoints=()):
+    nodes = {}
+    for parent, child in edges:
+        nodes.setdefault(parent, {"parents": []})
+        nodes.setdefault(child, {"parents": []})
+        nodes[child]["parents"].append(parent)
+    for name in endpoints:
+        nodes[name]["style"] = "endpoint"
+    return {"nodes": nodes}
+
+
+def test_endpoint_projects_stop_at_upstream_endpoints():
+    # a -> b -> mid (endpoint) -> c -> goal (endpoint); d feeds both
+    data = _graph(
+        [
+            ("a", "b"),
+            ("b", "mid"),
+            ("mid", "c"),
+            ("c", "goal"),
+            ("d", "b"),
+            ("d", "c"),
+        ],
+        endpoints=["mid", "goal"],
+    )
+    assert endpoint_projects(data) == {
+        "goal": ["goal", "c", "d"],
+        "mid": ["mid", "a", "b", "d"],
+    }
+
+
+def test_endpoint_projects_handle_cycles():
+    data = _graph(
+        [("a", "b"), ("b", "a"), ("b", "goal"), ("x", "a")],
+        endpoints=["goal"],
+    )
+    assert endpoint_projects(data) == {"goal": ["goal", "a", "b", "x"]}
+
+
+def test_index_ancestors_match_trace_ancestors():
+    data = _graph(
+        [("a", "b"), ("b", "c"), ("e", "c"), ("f", "e"), ("c", "d")],
+        endpoints=["e"],
+    )
+    index = ReachabilityIndex(data)
+    assert index.names_of(index.ancestors(["d"])) == ["a", "b", "c", "e", "f"]
+    assert set(index.names_of(index.ancestors(["d"], stop=["e"]))) == set(
+        trace_ancestors(
+            data,
+            "d",
+            stop_at=lambda name, _node: name == "e",
+            include_stopped=True,
+        )
+    )
+
+
+def test_task_index_follows_edits_like_a_fresh_index():
+    rng = random.Random(3)
+    names = [f"T{number}" for number in range(40)]
+    data = {"nodes": {name: {"parents": []} for name in names}}
+    index = TaskIndex(data)
+    for _ in range(200):
+        nodes = data["nodes"]
+        name = rng.choice(names)
+        change = rng.random()
+        if change < 0.15 and name in nodes:
+            del nodes[name]
+        elif change < 0.3:
+            nodes[name] = {"parents": [], "style": "endpoint"}
+        elif name in nodes:
+            nodes[name]["parents"] = rng.sample(names, rng.randint(0, 3))
+        index.update(data)
+        query = rng.choice(list(nodes))
+        # ask a few questions so cached ancestor sets get reused
+        for asked in (query, rng.choice(list(nodes))):
+            reachability = ReachabilityIndex(data)
+            assert index.ancestors(asked) == reachability.names_of(
+                reachability.ancestors([asked])
+            )
+        assert index.endpoints == {
+            name
+            for name, node in nodes.items()
+            if node.get("style") == "endpoint"
+        }
+        assert index.matches(query.lower()) == [query]
+
+
+def test_task_index_completion_is_saved_for_the_shell(tmp_path):
+    yaml_file = tmp_path / "plan.yaml"
+    yaml_file.write_text(
+        "nodes:\n"
+        "  Build:\n    children: [Test]\n"
+        "  bake:\n    style: completed\n"
+        "  Test:\n    text: check\n"
+    )
+    index = TaskIndex()
+    write_dot_from_yaml(
+        str(yaml_file),
+        str(tmp_path / "plan.dot"),
+        filter_task="test",
+        task_index=index,
+    )
+    dot_text = (tmp_path / "plan.dot").read_text()
+    assert "Build" in dot_text and "bake" not in dot_text
+    assert task_index_path(yaml_file).exists()
+    # the saved names go to the cache directory, not next to the YAML
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "cache",
+        "plan.dot",
+        "plan.yaml",
+    ]
+
+    saved = TaskIndex.load(yaml_file)
+    assert saved.complete("b") == ["Build"]
+    assert saved.complete("b", include_completed=True) == ["bake", "Build"]
+    args = type("Args", (), {"yaml": str(yaml_file)})()
+    assert wgrph_task_completer("B", args) == ["Build"]
+    assert wgrph_task_completer("t", args) == ["test"]
+
+    # an edit makes the saved names stale until they are rebuilt
+    yaml_file.write_text(yaml_file.read_text() + "  Tidy: {}\n")
+    assert TaskIndex.load(yaml_file) is None
+    assert wgrph_task_completer("T", args) == ["Test", "Tidy"]
+    assert TaskIndex.load(yaml_file).complete("ti") == ["Tidy"]
+
+
+def test_plain_task_filter_saves_no_index(tmp_path, cache_home):
+    yaml_file = tmp_path / "g.yaml"
+    yaml_file.write_text("nodes:\n  A:\n    children: [B]\n  B: {}\n")
+    write_dot_from_yaml(
+        str(yaml_file),
+        str(tmp_path / "g.dot"),
+        update_yaml=False,
+        filter_task="b",
+    )
+    assert "A" in (tmp_path / "g.dot").read_text()
+    assert not task_index_path(yaml_file).exists()
+    assert not cache_home.exists()
@@ -1,6 +1,6 @@
 import yaml
 
-from pydifftools.flowchart.graph import write_dot_from_yaml
+from pydifftools.flowchart.graph import load_graph_yaml, write_dot_from_yaml
 
 
 def test_relationship_removal_updates_yaml(tmp_path):
@@ -67,3 +67,56 @@ nodes:
     updated = yaml.safe_load(yaml_path.read_text())
     assert "B" not in updated["nodes"]
     assert "B" not in updated["nodes"]["A"]["children"]
+
+
+def test_pruning_nodes_keeps_remaining_link_order(tmp_path):
+    yaml_path = tmp_path / "graph.yaml"
+    yaml_path.write_text("""\
+nodes:
+  Root:
+    children: [A, B, C, D]
+  A:
+    children: [Goal]
+  B:
+    children: [Goal]
+  C:
+    children: [Goal]
+  D:
+    children: [Goal]
+  Goal: {}
+""")
+    old = load_graph_yaml(str(yaml_path))
+    assert old["nodes"]["Goal"]["parents"] == ["A", "B", "C", "D"]
+    # drop B and D, and add a parent link only on Goal's side
+    yaml_path.write_text("""\
+nodes:
+  Root:
+    children: [A, B, C, D]
+  A:
+    children: [Goal]
+    parents: [Root]
+  C:
+    children: [Goal]
+    parents: [Root]
+  Goal:
+    parents: [A, C, Root]
+""")
+    data = load_graph_yaml(str(yaml_path), old_data=old)
+    assert set(data["nodes"]) == {"Root", "A", "C", "Goal"}
+    assert data["nodes"]["Root"]["children"] == ["A", "C", "Goal"]
+    assert data["nodes"]["Goal"]["parents"] == ["A", "C", "Root"]
+    assert data["nodes"]["C"]["parents"] == ["Root"]
+
+
+def test_fresh_load_ignores_undefined_parents(tmp_path):
+    yaml_path = tmp_path / "graph.yaml"
+    yaml_path.write_text("""\
+nodes:
+  A:
+    text: hi
+    parents: [Ghost]
+""")
+    data = load_graph_yaml(str(yaml_path))
+    assert data["nodes"] == {
+        "A": {"text": "hi", "children": [], "parents": []}
+    }
@@ -0,0 +1,53 @@
+import re
+
+from pydifftools.flowchart import watch_graph
+from pydifftools.flowchart.graph import DotFragments
+
+
+def test_unchanged_nodes_are_pinned_on_rebuild(
+    tmp_path, fake_dot, write_graph, monkeypatch
+):
+    monkeypatch.setattr(watch_graph, "pygraphviz", None)
+    inputs = []
+    fake_run = watch_graph.subprocess.run
+
+    def recording_run(cmd, **kwargs):
+        inputs.append(kwargs["input"].decode("utf-8"))
+        return fake_run(cmd, **kwargs)
+
+    monkeypatch.setattr(watch_graph.subprocess, "run", recording_run)
+    yaml_file = tmp_path / "graph.yaml"
+    dot_file = tmp_path / "graph.dot"
+    svg_file = tmp_path / "graph.svg"
+    write_graph(yaml_file)
+    layout = watch_graph.StableLayout()
+    fragments = DotFragments()
+
+    def build():
+        watch_graph.build_graph(
+            yaml_file,
+            dot_file,
+            svg_file,
+            55,
+            dot_fragments=fragments,
+            stable_layout=layout,
+        )
+
+    # the first layout comes from dot, and its node centres are recorded
+    # in Graphviz points (the fake SVG draws node i at x=25+40*i, y=20, and
+    # the styled endpoint c comes first in the DOT)
+    build()
+    assert fake_dot[-1] == ["dot", "-Tsvg"]
+    assert layout.positions == {
+        "c": (25.0, 20.0),
+        "a": (65.0, 20.0),
+        "b": (105.0, 20.0),
+    }
+
+    write_graph(yaml_file, middle_text="Edited")
+    build()
+    assert fake_dot[-1] == ["neato", "-s", "-Tsvg"]
+    pins = dict(re.findall(r'(\w+) \[pos="([^"]+)"', inputs[-1]))
+    assert pins == {"a": "65.00,20.00!", "c": "25.00,20.00!"}
+    # the DOT file on disk stays free of layout pins
+    assert "pos=" not in dot_file.read_text()
@@ -0,0 +1,53 @@
+from pydifftools.flowchart import watch_graph
+
+
+def test_repeat_renders_come_from_cache(tmp_path, fake_dot, write_graph):
+    yaml_file = tmp_path / "graph.yaml"
+    dot_file = tmp_path / "graph.dot"
+    svg_file = tmp_path / "graph.svg"
+    write_graph(yaml_file)
+    cache = watch_graph.SvgRenderCache()
+
+    watch_graph.build_graph(yaml_file, dot_file, svg_file, 55, svg_cache=cache)
+    first_svg = svg_file.read_bytes()
+    assert len(fake_dot) == 1
+    assert b'href="/?t=a"' in first_svg
+
+    svg_file.unlink()
+    watch_graph.build_graph(yaml_file, dot_file, svg_file, 55, svg_cache=cache)
+    assert len(fake_dot) == 1
+    assert svg_file.read_bytes() == first_svg
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # the date view recolours differently, so it is its own entry
+    watch_graph.build_graph(
+        yaml_file, dot_file, svg_file, 55, True, svg_cache=cache
+    )
+    assert len(fake_dot) == 2
+
+    write_graph(yaml_file, middle_text="Edited")
+    watch_graph.build_graph(yaml_file, dot_file, svg_file, 55, svg_cache=cache)
+    assert len(fake_dot) == 3
+
+
+def test_cache_evicts_least_recently_used():
+    cache = watch_graph.SvgRenderCache(max_bytes=4)
+    cache.put("a", b"AA")
+    cache.put("b", b"B")
+    assert cache.get("a") == b"AA"
+    cache.put("c", b"C")
+    assert cache.size == 4
+    cache.put("d", b"D")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"AA"
+    assert cache.get("c") == b"C"
+    # a bigger entry pushes out as many old ones as its size needs
+    cache.put("e", b"EEE")
+    assert cache.get("d") is None
+    assert cache.get("a") is None
+    assert cache.get("c") == b"C"
+    assert cache.size == 4
+    # an SVG larger than the whole budget is not kept
+    cache.put("f", b"FFFFF")
+    assert cache.get("f") is None
+    assert cache.get("e") == b"EEE"
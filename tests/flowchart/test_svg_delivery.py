@@ -0,0 +1,79 @@
+import gzip
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+import yaml
+
+from pydifftools.flowchart import watch_graph
+
+
+def _get(url, **headers):
+    return urllib.request.urlopen(urllib.request.Request(url, headers=headers))
+
+
+def test_svg_is_gzipped_and_revalidated(push_handler):
+    server = watch_graph.FlowchartPreviewServer(push_handler)
+    server.start()
+    try:
+        svg_bytes = push_handler.svg_file.read_bytes()
+        response = _get(server.svg_url, **{"Accept-Encoding": "gzip"})
+        assert response.getheader("Content-Encoding") == "gzip"
+        assert response.getheader("Cache-Control") == "no-cache"
+        etag = response.getheader("ETag")
+        assert gzip.decompress(response.read()) == svg_bytes
+
+        plain = _get(server.svg_url, **{"Accept-Encoding": "gzip;q=0"})
+        assert plain.getheader("Content-Encoding") is None
+        assert plain.read() == svg_bytes
+
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            _get(server.svg_url, **{"If-None-Match": f"W/{etag}"})
+        assert excinfo.value.code == 304
+
+        page = urllib.request.urlopen(server.base_url).read()
+        assert f"var etag={json.dumps(etag)}".encode() in page
+        assert b"fetch('/graph.svg.patch?since='" in page
+    finally:
+        server.stop()
+
+
+def test_patch_sends_only_changed_groups(push_handler):
+    delivery = push_handler.delivery
+    before = push_handler.svg_file.read_bytes()
+    old_etag = delivery.etag(before)
+    # serving the SVG keeps it as a base for the page's first patch
+    delivery._remember(old_etag, before)
+
+    data = yaml.safe_load(push_handler.yaml_file.read_text())
+    data["nodes"]["d"] = {"children": ["b"], "text": "Extra"}
+    push_handler.yaml_file.write_text(yaml.safe_dump(data))
+    watch_graph.build_graph(
+        push_handler.yaml_file,
+        push_handler.dot_file,
+        push_handler.svg_file,
+        55,
+    )
+    after = push_handler.svg_file.read_bytes()
+    patch = delivery.patch(after, old_etag)
+    assert patch["etag"] == delivery.etag(after)
+    assert patch["full"] is False
+    assert set(patch["order"]) == {
+        "node:a",
+        "node:b",
+        "node:c",
+        "node:d",
+        "edge:a->b",
+        "edge:b->c",
+        "edge:d->b",
+    }
+    # only the new node and edge are sent; the page keeps the other groups
+    assert set(patch["parts"]) == {"node:d", "edge:d->b"}
+    assert patch["root"]["width"] == "300pt"
+
+    assert delivery.patch(after, patch["etag"])["unchanged"] is True
+    assert delivery.patch(after, '"unknown"') == {
+        "etag": patch["etag"],
+        "full": True,
+    }
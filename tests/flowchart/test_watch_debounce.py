@@ -36,6 +36,45 @@ def test_yaml_write_does_not_loop(tmp_path, monkeypatch):
     assert calls["reload"] == 1
 
 
+def test_own_yaml_writes_are_ignored(tmp_path, monkeypatch):
+    yaml_file = tmp_path / "graph.yaml"
+    yaml_file.write_text("nodes:\n  a: {}\n")
+    calls = []
+
+    def fake_build(y, d, s, w, order_by_date=False, prev=None, target=None):
+        calls.append(y.read_text())
+        # Stand in for save_graph_yaml normalising the file.
+        y.write_text("nodes:\n  a:\n    children: []\n")
+        return {}
+
+    monkeypatch.setattr(watch_graph, "build_graph", fake_build)
+    monkeypatch.setattr(watch_graph, "_reload_svg", lambda *_: None)
+
+    handler = watch_graph.GraphEventHandler(
+        yaml_file,
+        tmp_path / "graph.dot",
+        tmp_path / "graph.svg",
+        None,
+        wrap_width=55,
+        data=None,
+        debounce=0.0,
+    )
+    handler.on_modified(types.SimpleNamespace(src_path=str(yaml_file)))
+    # The save above arrives as its own event and must not rebuild.
+    handler.on_modified(types.SimpleNamespace(src_path=str(yaml_file)))
+    assert len(calls) == 1
+
+    # An editor saving by renaming a temporary file over the YAML.
+    tmp_file = tmp_path / ".graph.yaml.swp"
+    tmp_file.write_text("nodes:\n  a: {}\n  b: {}\n")
+    tmp_file.replace(yaml_file)
+    handler.on_moved(
+        types.SimpleNamespace(src_path=str(tmp_file), dest_path=str(yaml_file))
+    )
+    assert calls[-1] == "nodes:\n  a: {}\n  b: {}\n"
+    assert len(calls) == 2
+
+
 def test_yaml_build_error_keeps_preview_open(tmp_path, monkeypatch, capsys):
     yaml_file = tmp_path / "graph.yaml"
     yaml_file.write_text("nodes:\n  task_a:\n    text: Task A\n")
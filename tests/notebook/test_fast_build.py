@@ -1,4 +1,6 @@
 import base64
+import hashlib
+import json
 import os
 import shutil
 import threading
@@ -6,6 +8,7 @@ import time
 from email.message import Message
 from pathlib import Path
 
+import nbformat
 import pytest
 import yaml
 
@@ -637,7 +640,7 @@ def test_noexec_magic_marks_block_without_execution(fb, tmp_path, monkeypatch):
     src.write_text(
         "# noexec test\n\n" "```python\n" "%noexec\n" "print('skip')\n" "```\n"
     )
-    fb.PROJECT_ROOT = tmp_path
+    monkeypatch.setattr(fb, "PROJECT_ROOT", tmp_path)
     fb.BUILD_DIR = tmp_path / "_build"
     fb.BUILD_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -743,7 +746,7 @@ def test_execute_code_blocks_uses_project_root_cache_dir(
     assert not (other_cwd / "_nbcache").exists()
 
 
-def test_async_notebook_outputs_replace_placeholder(fb):
+def test_async_notebook_outputs_replace_placeholder(fb, monkeypatch):
     # Slow notebook execution in a controlled way so the test can reliably
     # observe the red placeholder first and then the final output.
     def delayed_execute_code_blocks(blocks):
@@ -755,7 +758,9 @@ def test_async_notebook_outputs_replace_placeholder(fb):
             code_map[(src, 1)] = "import time"
         return outputs, code_map
 
-    fb.execute_code_blocks = delayed_execute_code_blocks
+    monkeypatch.setattr(
+        fb, "execute_code_blocks", delayed_execute_code_blocks
+    )
 
     qmd = Path("async_test.qmd")
     qmd.write_text(
@@ -816,7 +821,7 @@ def test_async_notebook_outputs_replace_placeholder(fb):
 
 
 def test_pending_placeholder_forces_stage_rebuild_when_stage_is_empty(
-    fb, capsys
+    fb, capsys, monkeypatch
 ):
     # Build once so checksums reflect a clean tree.
     qmd = Path("async_pending.qmd")
@@ -855,7 +860,9 @@ def test_pending_placeholder_forces_stage_rebuild_when_stage_is_empty(
             code_map[(src, 1)] = "import time"
         return outputs, code_map
 
-    fb.execute_code_blocks = delayed_execute_code_blocks
+    monkeypatch.setattr(
+        fb, "execute_code_blocks", delayed_execute_code_blocks
+    )
     fb.build_all()
 
     logs = capsys.readouterr().out
@@ -935,3 +942,166 @@ def test_render_notebook_status_tags_and_tree_output(fb):
     assert "unrun ipynb" in tree_text
     assert "waiting on include build" in tree_text
     assert "missing html" in tree_text
+
+
+def _fake_section_pandoc(calls):
+    def fake_run(cmd, check, cwd=None, capture_output=False):
+        src = Path(cwd) / cmd[1]
+        text = src.read_text()
+        calls.append(text)
+        if text.startswith("---"):
+            text = text.split("---", 2)[2]
+        out = Path(cwd) / cmd[cmd.index("-o") + 1]
+        out.write_text(f"<html><body>{text}</body></html>")
+
+    return fake_run
+
+
+def test_split_sections_reuses_unchanged_sections(fb, monkeypatch):
+    fb.BUILD_DIR.mkdir(parents=True, exist_ok=True)
+    (fb.BUILD_DIR / "obs.lua").write_text("")
+    staged = fb.BUILD_DIR / "page.qmd"
+    staged.write_text(
+        "---\ntitle: Page\n---\nIntro\n\n# One\nfirst\n\n"
+        "```\n# not a heading\n```\n\n## Sub\nmore\n\n# Two\nsecond\n"
+    )
+    calls = []
+    monkeypatch.setattr(fb.subprocess, "run", _fake_section_pandoc(calls))
+    fb.render_file(Path("page.qmd"), staged, False, split_sections=True)
+    # two sections plus the template shell
+    assert len(calls) == 3
+    html = (fb.BUILD_DIR / "page.html").read_text()
+    assert html.index("first") < html.index("# not a heading")
+    assert html.index("more") < html.index("second")
+    assert "pydifft-sections" not in html
+
+    staged.write_text(staged.read_text().replace("second", "changed"))
+    calls.clear()
+    fb.render_file(Path("page.qmd"), staged, False, split_sections=True)
+    assert len(calls) == 1
+    assert "# Two\nchanged" in calls[0]
+    html = (fb.BUILD_DIR / "page.html").read_text()
+    assert "first" in html and "changed" in html
+
+    cache_dir = fb.BUILD_DIR / "_sections"
+    # only the finished HTML is left behind by each pandoc run
+    assert not list(cache_dir.glob("*.qmd"))
+    assert not list(cache_dir.glob("*.tmp"))
+    # the section that said "second" is no longer used by any page
+    assert fb.SectionRenderer.prune(fb.BUILD_DIR) == 1
+    assert len(list(cache_dir.glob("*.html"))) == 4
+    calls.clear()
+    fb.render_file(Path("page.qmd"), staged, False, split_sections=True)
+    assert calls == []
+
+
+def test_split_sections_renumbers_crossrefs(fb):
+    sections = fb.SectionRenderer(
+        fb.BUILD_DIR, ["pandoc", "in.qmd", "--template", "t", "-o", "x"]
+    )
+    body = (
+        '<figure id="fig:a"><img/><figcaption>Figure 1: A</figcaption>'
+        "</figure>\n"
+        '<figure id="fig:b"><img/><figcaption>Figure 1: B</figcaption>'
+        "</figure>\n"
+        '<p>See <a href="#fig:b">fig.&nbsp;1</a> and ¿fig:a?</p>'
+    )
+    result = sections.renumber_crossrefs(body)
+    assert "Figure 1: A" in result
+    assert "Figure 2: B" in result
+    assert '<a href="#fig:b">fig.&nbsp;2</a>' in result
+    assert '<a href="#fig:a">fig.&nbsp;1</a>' in result
+
+
+def test_build_once_waits_for_notebooks_and_writes_manifest(fb, monkeypatch):
+    def fake_render_file(
+        src, dest, fragment, bibliography=None, csl=None, webtex=False
+    ):
+        staged = (fb.BUILD_DIR / src).read_text()
+        output = dest.with_suffix(".html")
+        output.write_text(f"<html><head></head><body>{staged}</body></html>")
+        return 0.5
+
+    def slow_execute_code_blocks(blocks, max_workers=None, manifest=None):
+        time.sleep(0.5)
+        manifest["notebooks"].append(
+            {"source": "once.qmd", "cached": False, "cell_errors": error[0]}
+        )
+        outputs = {(src, 1): "<pre>ONCE_OUTPUT</pre>" for src in blocks}
+        return outputs, {(src, 1): "print(1)" for src in blocks}
+
+    error = [0]
+    monkeypatch.setattr(fb, "ensure_pandoc_available", lambda: None)
+    monkeypatch.setattr(fb, "ensure_pandoc_crossref", lambda: None)
+    monkeypatch.setattr(fb, "render_file", fake_render_file)
+    monkeypatch.setattr(fb, "execute_code_blocks", slow_execute_code_blocks)
+    Path("once.qmd").write_text("# Once\n\n```{python}\nprint(1)\n```\n")
+    config = yaml.safe_load(Path("_quarto.yml").read_text())
+    config.setdefault("project", {})["render"] = ["once.qmd"]
+    Path("_quarto.yml").write_text(yaml.safe_dump(config))
+
+    manifest = fb.build_once()
+    assert "ONCE_OUTPUT" in Path("_display/once.html").read_text()
+    saved = json.loads(Path("_build/manifest.json").read_text())
+    assert saved["pages"]["once.qmd"] == {"seconds": 0.5, "error": None}
+    assert saved["cache_misses"] == 1
+    assert saved["incomplete"] == {}
+    assert manifest["cell_errors"] == 0
+
+    error[0] = 1
+    Path("once.qmd").write_text("# Once\n\n```{python}\nprint(2)\n```\n")
+    with pytest.raises(SystemExit):
+        fb.build_once()
+
+    # a rerun that executes nothing still fails on the errors the cached
+    # notebooks put on the pages
+    error[0] = 0
+    Path("once.qmd").write_text("# Once\n\n```{python}\nprint(3)\n```\n")
+    fb.build_once()
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [nbformat.v4.new_code_cell("print(3)\n")]
+    nb.cells[0].outputs = [
+        nbformat.v4.new_output("error", ename="E", evalue="", traceback=[])
+    ]
+    cache_dir = fb.PROJECT_ROOT / fb.NOTEBOOK_CACHE_DIR
+    cache_dir.mkdir(exist_ok=True)
+    name = fb._notebook_cache_name(
+        "once.qmd", [hashlib.md5(b"print(3)\n").hexdigest()]
+    )
+    nbformat.write(nb, cache_dir / name)
+    with pytest.raises(SystemExit):
+        fb.build_once()
+    saved = json.loads(Path("_build/manifest.json").read_text())
+    assert saved["cache_misses"] == 0
+    assert saved["cell_errors"] == 1
+
+
+def test_huge_stream_output_is_truncated_with_full_log(fb, monkeypatch):
+    monkeypatch.setattr(fb, "STREAM_HEAD_LINES", 3)
+    monkeypatch.setattr(fb, "STREAM_TAIL_LINES", 2)
+    text = "".join(f"line {i}\n" for i in range(1000))
+    html = fb.outputs_to_html(
+        [{"output_type": "stream", "name": "stdout", "text": text}]
+    )
+    assert "line 2\n" in html and "line 3\n" not in html
+    assert "line 998" in html and "line 997" not in html
+    assert "995 lines omitted" in html
+    logs = list((fb.DISPLAY_DIR / "assets" / "logs").glob("*.log"))
+    assert len(logs) == 1
+    assert logs[0].read_text() == text
+    assert f'href="/assets/logs/{logs[0].name}"' in html
+
+
+def test_stream_output_keeps_last_carriage_return_state(fb):
+    html = fb.outputs_to_html(
+        [{"output_type": "stream", "text": "10%\r50%\r100%\ndone\n"}]
+    )
+    assert "100%" in html and "50%" not in html
+    assert "pydifft-log-link" not in html
+
+
+def test_chunked_ansi_conversion_carries_colors(fb, monkeypatch):
+    monkeypatch.setattr(fb, "ANSI_CHUNK_LINES", 1)
+    html = fb._ansi_to_html("\x1b[31mred\nstill red\n\x1b[0mplain\n")
+    assert '<span style="color: #aa0000">still red' in html
+    assert html.rindex("</span>") < html.index("plain")
@@ -0,0 +1,158 @@
+import os
+import socket
+import threading
+from pathlib import Path
+
+import nbformat
+import pytest
+
+import pydifftools.notebook.fast_build as fast_build
+from pydifftools.notebook import nbworker
+
+
+def _fake_group(src, codes, group_idx, total_groups, project_root=None):
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [nbformat.v4.new_code_cell(code) for code in codes]
+    for cell in nb.cells:
+        cell.outputs = [
+            nbformat.v4.new_output(
+                output_type="stream",
+                name="stdout",
+                text=f"{src} {group_idx}/{total_groups} in {project_root}\n",
+            )
+        ]
+    return nb
+
+
+def _pipe_worker(tmp_path):
+    to_worker_r, to_worker_w = os.pipe()
+    from_worker_r, from_worker_w = os.pipe()
+    reader = os.fdopen(to_worker_r, "rb")
+    writer = os.fdopen(from_worker_w, "wb")
+
+    def serve():
+        with reader, writer:
+            nbworker.serve_stream(reader, writer, tmp_path)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    connection = nbworker.WorkerConnection(
+        "pipe",
+        os.fdopen(from_worker_r, "rb"),
+        os.fdopen(to_worker_w, "wb"),
+    )
+    connection.closer = connection.writer.close
+    return connection, thread
+
+
+def test_worker_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(fast_build, "execute_notebook_group", _fake_group)
+    connection, thread = _pipe_worker(tmp_path)
+    pool = nbworker.WorkerPool([connection])
+    nb = pool.execute("doc.qmd", ["print(1)", "print(2)"], 1, 2)
+    assert len(nb.cells) == 2
+    assert nb.cells[1].outputs[0]["text"] == f"doc.qmd 1/2 in {tmp_path}\n"
+    pool.close()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_worker_errors_are_reported(tmp_path, monkeypatch):
+    def broken(*args, **kwargs):
+        raise OSError("kernel died")
+
+    monkeypatch.setattr(fast_build, "execute_notebook_group", broken)
+    connection, _ = _pipe_worker(tmp_path)
+    with pytest.raises(RuntimeError, match="kernel died"):
+        connection.execute("doc.qmd", ["1"], 1, 1)
+    connection.close()
+
+
+def test_execute_code_blocks_streams_worker_results_into_cache(
+    tmp_path, monkeypatch
+):
+    class FakeExecutor:
+        max_workers = 3
+
+        def __init__(self):
+            self.calls = []
+
+        def execute(self, src, codes, group_idx, total_groups):
+            self.calls.append((src, group_idx))
+            return _fake_group(src, codes, group_idx, total_groups)
+
+    monkeypatch.setattr(fast_build, "PROJECT_ROOT", tmp_path)
+    executor = FakeExecutor()
+    blocks = {
+        "a.qmd": [("print('a')", "m1"), ("%reset -f\nx = 1", "m2")],
+        "b.qmd": [("print('b')", "m3")],
+    }
+    outputs, code_map = fast_build.execute_code_blocks(
+        blocks, executor=executor
+    )
+    assert sorted(executor.calls) == [
+        ("a.qmd", 1),
+        ("a.qmd", 2),
+        ("b.qmd", 1),
+    ]
+    assert "a.qmd 2/2" in outputs[("a.qmd", 2)]
+    assert code_map[("b.qmd", 1)] == "print('b')"
+    assert len(list((tmp_path / "_nbcache").glob("*.ipynb"))) == 3
+
+    executor.calls.clear()
+    fast_build.execute_code_blocks(blocks, executor=executor)
+    assert executor.calls == []
+
+
+def test_pool_from_spec_rejects_unknown_scheme(tmp_path):
+    with pytest.raises(ValueError, match="unknown notebook worker spec"):
+        nbworker.pool_from_spec("ftp://example", tmp_path)
+
+
+def test_local_pool_resubmits_groups_from_dead_workers(tmp_path, monkeypatch):
+    # the workers and their kernels import this checkout of pydifftools
+    checkout = Path(nbworker.__file__).resolve().parents[2]
+    monkeypatch.setenv("PYTHONPATH", str(checkout))
+    pool = nbworker.pool_from_spec("local:2", tmp_path)
+    try:
+        nb = pool.execute("doc.qmd", ["print(6 * 7)"], 1, 1)
+        assert nb.cells[0].outputs[0]["text"] == "42\n"
+        # the worker the next group goes to has died
+        dead = pool.idle[-1]
+        dead.process.kill()
+        dead.process.wait()
+        nb = pool.execute("doc.qmd", ["print('again')"], 1, 1)
+        assert nb.cells[0].outputs[0]["text"] == "again\n"
+        assert pool.connections == [
+            connection for connection in pool.idle if connection is not dead
+        ]
+        assert dead.closer is None
+    finally:
+        pool.close()
+
+
+def test_tcp_worker_requires_the_token(tmp_path, monkeypatch):
+    monkeypatch.setattr(fast_build, "execute_notebook_group", _fake_group)
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+
+    def accept(count):
+        for _ in range(count):
+            conn, _ = server.accept()
+            threading.Thread(
+                target=nbworker.serve_client,
+                args=(conn, "secret", tmp_path),
+                daemon=True,
+            ).start()
+
+    threading.Thread(target=accept, args=(2,), daemon=True).start()
+    try:
+        with pytest.raises(RuntimeError, match="rejected the token"):
+            nbworker.WorkerConnection.connect("127.0.0.1", port, "guess")
+        monkeypatch.setenv(nbworker.TOKEN_ENV, "secret")
+        pool = nbworker.pool_from_spec(f"tcp://127.0.0.1:{port}", tmp_path)
+        nb = pool.execute("doc.qmd", ["1"], 1, 1)
+        assert nb.cells[0].outputs[0]["text"] == f"doc.qmd 1/1 in {tmp_path}\n"
+        pool.close()
+    finally:
+        server.close()
@@ -1,3 +1,9 @@
+import json
+import sys
+
+import pytest
+
+from pydifftools.notebook import tex_to_qmd
 from pydifftools.notebook.tex_to_qmd import format_tags
 
 def test_err_block_ensures_blank_line_after_close():
@@ -11,3 +17,67 @@ def test_err_block_allows_br_after_close():
     formatted = format_tags(text)
     expected = "<err>\n  inner\n</err>\n\n<br/>\n"
     assert formatted == expected
+
+def test_batch_skips_unchanged_sources_and_records_failures(
+    tmp_path, monkeypatch
+):
+    converted = []
+
+    def fake_convert(inp, capture_stderr=False):
+        converted.append(inp.name)
+        if "broken" in inp.read_text():
+            raise ValueError("cannot parse")
+        out = inp.with_suffix(".qmd")
+        out.write_text(inp.read_text())
+        return out
+
+    monkeypatch.setattr(tex_to_qmd, "_convert_tex_file", fake_convert)
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.tex").write_text("a")
+    (tmp_path / "sub" / "b.tex").write_text("b")
+
+    summary = tex_to_qmd.tex2qmd(str(tmp_path), jobs=1)
+    assert sorted(converted) == ["a.tex", "b.tex"]
+    assert not summary["failed"]
+    assert (tmp_path / "sub" / "b.qmd").read_text() == "b"
+
+    converted.clear()
+    (tmp_path / "a.tex").write_text("a, edited")
+    summary = tex_to_qmd.tex2qmd_batch(str(tmp_path), jobs=1)
+    assert converted == ["a.tex"]
+    assert summary["skipped"] == [str(tmp_path / "sub" / "b.tex")]
+
+    converted.clear()
+    (tmp_path / "sub" / "b.tex").write_text("broken")
+    with pytest.raises(SystemExit):
+        tex_to_qmd.tex2qmd(str(tmp_path / "**" / "*.tex"), jobs=1)
+    written = json.loads((tmp_path / "tex2qmd-summary.json").read_text())
+    assert converted == ["b.tex"]
+    assert written["failed"][0]["error"] == "ValueError: cannot parse"
+
+
+def test_batch_summary_keeps_pandoc_stderr(tmp_path, monkeypatch):
+    pandoc = tmp_path / "pandoc"
+    pandoc.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        "sys.stderr.write('Error at line 3: unexpected }\\n')\n"
+        "sys.exit(64)\n"
+    )
+    pandoc.chmod(0o755)
+    monkeypatch.setattr(
+        tex_to_qmd.shutil,
+        "which",
+        lambda name: str(pandoc) if name == "pandoc" else None,
+    )
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "a.tex").write_text("\\section{A}\n")
+
+    summary = tex_to_qmd.tex2qmd_batch(str(tmp_path / "docs"), jobs=1)
+    written = json.loads(
+        (tmp_path / "docs" / "tex2qmd-summary.json").read_text()
+    )
+    assert written["failed"] == summary["failed"]
+    error = summary["failed"][0]["error"]
+    assert "returned non-zero exit status 64" in error
+    assert error.endswith("Error at line 3: unexpected }\n")